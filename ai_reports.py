@@ -0,0 +1,130 @@
+import json
+import os
+import re
+import textwrap
+from datetime import datetime
+import pandas as pd
+from report_cache import ReportStore
+from storage import data_path, atomic_write
+
+GEMINI_MODEL = 'gemini-flash-latest'
+REPORT_TTL = 86400 # 야간 배치로 만든 리포트를 하루 동안 그대로 제공
+REPORT_STORE_MAX_MB = float(os.getenv("APP_REPORT_STORE_MAX_MB", "256"))
+RECOMMENDATION_HISTORY = "recommendation_history.jsonl"
+
+def open_report_store():
+    """
+    웹 앱과 배치 작업이 함께 쓰는 AI 생성 결과 저장소를 엽니다.
+    레플리카끼리 공유하려면 APP_REPORT_DB(또는 APP_DATA_DIR)를 공유 볼륨의 경로로 지정합니다.
+    """
+    path = os.getenv("APP_REPORT_DB") or data_path("reports.sqlite3")
+    return ReportStore(path, ttl=REPORT_TTL, max_bytes=int(REPORT_STORE_MAX_MB * 2 ** 20))
+
+def save_generated(store, prompt, text, ttl=None):
+    """
+    생성 결과를 저장소에 저장하고 돌려줍니다. (웹 앱과 배치 작업 공용)
+    텍스트가 없는 응답(안전 필터 차단 등)은 같은 날짜 구간 내내 빈 리포트가 제공되지 않도록 저장하지 않고 ValueError를 냅니다.
+    """
+    if not text or not text.strip():
+        raise ValueError("AI 응답에 텍스트가 없습니다.")
+    store.set(prompt, GEMINI_MODEL, text, ttl=ttl)
+    return text
+
+def analysis_prompt(company_name, symbol, context=""):
+    """context(prompt_context.analysis_context의 데이터 블록)가 있으면 수치 분석의 근거로 함께 보냅니다."""
+    data = f"""
+    아래는 마지막 거래일 기준 이 종목의 실제 데이터야. 정량 분석의 수치는 이 데이터에서 인용하고, 데이터에 없는 수치는 추정임을 밝혀줘.
+    ```
+{textwrap.indent(context, "    ")}
+    ```
+""" if context else ""
+    return f"""
+    {company_name} ({symbol}) 기업에 대해 전문적인 주식 분석 리포트를 작성해줘. 다음 구조를 반드시 지켜줘:
+{data}
+    ### 1. 🏢 정성적 기업 분석
+    - 시장 점유율 및 경쟁력 분석
+    - 핵심 사업 모델의 지속 가능성
+    - 현재 직면한 거시적/미시적 리스크
+
+    ### 2. 📊 정량적 재무 분석
+    - 수익성 (매출 및 이익 성장성)
+    - 재무 건전성 (부채 및 현금 흐름 상황)
+    - 주요 Valuation 지표 기반 현재 주가 수준 평가
+
+    ### 3. 🏁 종합 투자 의견
+    - **최종 의견: [매수 권장 / 관망 / 주의]** 중 하나를 반드시 선택하여 명시
+    - 근거 요약 및 향후 관전 포인트 (1분기~1년 전망)
+
+    가독성을 위해 상세한 마크다운 형식을 사용하고, 전문적인 투자 용어를 적절히 활용하여 신뢰감 있게 작성해줘.
+    """
+
+def recommendations_prompt(current_date):
+    return f"""
+    오늘 날짜({current_date})를 기준으로 향후 성장세가 엿보이는 유망 종목 20개를 선정해줘.
+    - 한국 주식 15개, 미국 주식 5개로 구성할 것.
+    - 결과는 반드시 아래의 JSON 리스트 형식으로만 출력할 것 (다른 텍스트 금지):
+    [
+      {{"name": "종목이름", "symbol": "티커(한국은 .KS 또는 .KQ 포함)", "reason": "추천 사유 (한글)"}},
+      ...
+    ]
+    - 한국 주식 예시: 삼성전자 (005930.KS), 에코프로비엠 (247540.KQ)
+    - 미국 주식 예시: NVDA, AAPL 등
+    """
+
+def parse_recommendations(response_text):
+    """추천 응답에서 JSON 리스트를 꺼냅니다. 없으면 ValueError."""
+    # JSON 부분만 추출 (가끔 AI가 백틱을 포함함)
+    match = re.search(r'\[.*\]', response_text, re.DOTALL)
+    if not match:
+        # 빈 목록을 정상 값으로 캐싱하지 않도록 예외로 처리
+        raise ValueError("추천 응답에서 JSON 리스트를 찾을 수 없습니다.")
+    json_str = match.group()
+    # 종종 따옴표 문제 해결
+    json_str = json_str.replace("'", '"')
+    return json.loads(json_str)
+
+def load_saved_recommendations(current_date):
+    """current_date에 저장된 추천 목록을 돌려줍니다. 없거나 다른 날짜의 목록이면 None."""
+    path = data_path("recommendations.json")
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, encoding='utf-8') as f:
+            saved = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return saved['items'] if saved.get('date') == current_date and saved.get('items') else None
+
+def save_recommendations(current_date, items):
+    """그날의 추천 목록을 저장해 웹 앱과 배치 작업이 같은 목록을 쓰도록 하고, 성과 평가용 이력에도 남깁니다."""
+    def write(tmp):
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'date': current_date, 'items': items}, f, ensure_ascii=False)
+    atomic_write(data_path("recommendations.json"), write)
+    record_recommendation_snapshot(items)
+
+def record_recommendation_snapshot(items, timestamp=None):
+    """추천 목록 하나를 생성 시각과 함께 이력 파일(JSON Lines)에 덧붙입니다."""
+    snapshot = {
+        'timestamp': (timestamp or datetime.now()).isoformat(timespec='seconds'),
+        'items': [{'symbol': item['symbol'], 'name': item.get('name', item['symbol'])} for item in items if item.get('symbol')],
+    }
+    # 한 줄을 한 번에 덧붙이므로 여러 프로세스가 동시에 기록해도 줄이 섞이지 않음
+    with open(data_path(RECOMMENDATION_HISTORY), 'a', encoding='utf-8') as f:
+        f.write(json.dumps(snapshot, ensure_ascii=False) + "\n")
+
+def load_recommendation_history():
+    """기록된 추천 이력을 (timestamp, symbol, name) 행으로 돌려줍니다. 깨진 줄은 건너뜁니다."""
+    path = data_path(RECOMMENDATION_HISTORY)
+    rows = []
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    snapshot = json.loads(line)
+                except ValueError:
+                    continue
+                rows += [(snapshot['timestamp'], item['symbol'], item['name']) for item in snapshot.get('items', [])]
+    history = pd.DataFrame(rows, columns=['timestamp', 'symbol', 'name'])
+    history['timestamp'] = pd.to_datetime(history['timestamp'])
+    return history
@@ -1,126 +1,66 @@
 import streamlit as st
-import yfinance as yf
 import pandas as pd
 import plotly.graph_objects as go
+from plotly.subplots import make_subplots
 from datetime import datetime, timedelta
-import google.generativeai as genai
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
 import os
-import requests
-from bs4 import BeautifulSoup
+import uuid
+import textwrap
 from dotenv import load_dotenv
+from ai_reports import (GEMINI_MODEL, open_report_store, save_generated, analysis_prompt, recommendations_prompt,
+                        parse_recommendations, load_saved_recommendations, save_recommendations, load_recommendation_history)
+from backtest import run_backtest, BENCHMARKS
+from bounded_cache import BoundedCache
+from chart_decimation import decimate_candles, downsample_line, SCATTERGL_THRESHOLD, MAX_CANDLES
+from comparison import align_calendar, build_comparison
+from financials import load_statements, build_statement_view, STATEMENT_MAX_AGE
+from indicators import compute_indicators, volume_profile
+from live_quotes import QuotePoller
+from market_store import MarketDataStore, download_history, download_closes, load_closes
+from prompt_context import market_context
+from singleflight import GenerationGate
+from stock_info import QUOTE_REQUEST_TIMEOUT, load_naver_info, combine_stock_info, build_analysis_context
+from replay import install as install_replay
+from report_cache import prompt_hash
+from screener import load_snapshot, screen
+from swr_cache import SWRCache
+from symbol_index import load_symbol_index, REBUILD_INTERVAL
+from symbol_search import SymbolSearch, search_target
+import tracing
+from tracing import traced, as_miss, mark_miss, span as trace_span, figure_size
+
+CSS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets", "style.css")
 
 # 설정
 st.set_page_config(page_title="금융 분석 AI 비서", layout="wide")
-load_dotenv()
 
-# CSS 스타일 적용 (심플하고 밝은 디자인)
-st.markdown("""
-    <style>
-    /* 전역 글자색 및 배경 강제 설정 (가시성 확보 최우선) */
-    html, body, [data-testid="stAppViewContainer"] {
-        background-color: #ffffff !important;
-        color: #111111 !important;
-    }
-    
-    /* 모든 마크다운 요소(본문, 리스트, 강조 등) 색상 강제 */
-    [data-testid="stMarkdownContainer"], 
-    [data-testid="stMarkdownContainer"] * {
-        color: #111111 !important;
-        font-family: 'Pretendard', sans-serif;
-    }
+@st.cache_resource
+def setup_process():
+    """.env 읽기와 외부 호출 기록/재생 계층 설치는 스크립트 재실행마다가 아니라 프로세스당 한 번만 합니다."""
+    load_dotenv()
+    install_replay() # APP_REPLAY_MODE=record/replay 일 때만 외부 호출을 기록/재생
 
-    /* 제목 색상 별도 강조 */
-    h1, h2, h3, h4, h5, h6 {
-        color: #000000 !important;
-        font-weight: 800 !important;
-    }
+@st.cache_resource
+def load_css():
+    """스타일 파일은 한 번만 읽어 둡니다. (화면에는 실행마다 다시 넣어야 적용이 유지됨)"""
+    with open(CSS_PATH, encoding='utf-8') as f:
+        return f"<style>\n{f.read()}</style>"
 
-    /* AI 분석 리포트 영역 강조 */
-    .ai-report-area {
-        background-color: #fcfcfc !important;
-        padding: 30px !important;
-        border: 2px solid #eeeeee !important;
-        border-radius: 15px !important;
-        color: #111111 !important;
-    }
+setup_process()
 
-    .stMetric {
-        background-color: #ffffff !important;
-        border: 1px solid #eeeeee !important;
-        padding: 15px !important;
-        border-radius: 10px !important;
-    }
-    
-    [data-testid="stMetricValue"] > div { color: #000000 !important; font-weight: 700 !important; }
-    [data-testid="stMetricLabel"] > div { color: #333333 !important; }
-    
-    /* 탭 가독성 */
-    .stTabs [data-baseweb="tab"] { color: #555555 !important; }
-    .stTabs [aria-selected="true"] { color: #007bff !important; font-weight: bold !important; }
-
-    /* 버튼 스타일 (흰색 글씨로 선명하게) */
-    [data-testid="stBaseButton-secondary"], [data-testid="stBaseButton-primary"], .stButton>button {
-        background-color: #007bff !important;
-        border: none !important;
-        height: 3rem !important;
-        border-radius: 8px !important;
-    }
-    
-    /* 버튼 내부 텍스트 강제 설정 */
-    .stButton>button div p, .stButton>button div {
-        color: #ffffff !important;
-        font-weight: 900 !important;
-        font-size: 1.1rem !important;
-    }
+def admin_panel_enabled():
+    """APP_ADMIN_PANEL=1 이거나, URL의 ?admin= 값이 APP_ADMIN_TOKEN과 같으면 계측 패널을 보여줍니다."""
+    token = os.getenv("APP_ADMIN_TOKEN")
+    return os.getenv("APP_ADMIN_PANEL") == "1" or bool(token and st.query_params.get("admin") == token)
 
-    .stButton>button:hover {
-        background-color: #0056b3 !important;
-    }
-    .stButton>button:hover div p, .stButton>button:hover div {
-        color: #ffffff !important;
-    }
+# 이번 스크립트 실행의 구간 계측 시작
+trace_run = tracing.start_run(st.session_state.get("current_page", "main"), detail=admin_panel_enabled())
+# fragment만 다시 실행될 때는 위 실행이 아닌 새 실행으로 계측
+traced_fragment = tracing.fragment(st.fragment)
 
-    /* 입력창과 버튼 수직 정렬 및 높이 일치 */
-    div.row-widget.stButton {
-        margin-top: 0px !important; /* 라벨을 숨겼으므로 마진 제거 */
-    }
-    
-    /* 입력창 높이 고정 */
-    [data-testid="stTextInputRootElement"] {
-        height: 3rem !important;
-        display: flex !important;
-        align-items: center !important;
-    }
-    
-    [data-testid="stTextInputRootElement"] > div {
-        height: 100% !important;
-    }
-    .recommendation-card {
-        padding: 1.5rem;
-        border-radius: 15px;
-        background-color: white;
-        color: #333;
-        box-shadow: 0 4px 6px rgba(0,0,0,0.1);
-        margin-bottom: 1rem;
-        border-left: 5px solid #ddd;
-    }
-    .status-buy { border-left-color: #28a745; }
-    .status-hold { border-left-color: #ffc107; }
-    .status-caution { border-left-color: #dc3545; }
-    
-    .buy-badge { 
-        background-color: #00c853 !important; 
-        color: #ffffff !important; 
-        padding: 4px 10px !important; 
-        border-radius: 6px !important; 
-        font-size: 0.9rem !important; 
-        font-weight: 900 !important;
-        box-shadow: 0 2px 4px rgba(0,0,0,0.1) !important;
-    }
-    .hold-badge { background-color: #ffc107; color: black; padding: 2px 8px; border-radius: 4px; font-size: 0.8rem; }
-    .caution-badge { background-color: #dc3545; color: white; padding: 2px 8px; border-radius: 4px; font-size: 0.8rem; }
-    </style>
-    """, unsafe_allow_html=True)
+# CSS 스타일 적용 (심플하고 밝은 디자인)
+st.markdown(load_css(), unsafe_allow_html=True)
 
 # Gemini 설정
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
@@ -134,10 +74,14 @@ try:
 except:
     pass
 
-if GEMINI_API_KEY:
-    genai.configure(api_key=GEMINI_API_KEY)
-    model = genai.GenerativeModel('gemini-flash-latest')
-else:
+@st.cache_resource
+def get_gemini_model(api_key):
+    """Gemini 설정과 모델 생성은 프로세스당 한 번만 합니다. (무거운 google.generativeai import도 이때)"""
+    import google.generativeai as genai
+    genai.configure(api_key=api_key)
+    return genai.GenerativeModel(GEMINI_MODEL)
+
+if not GEMINI_API_KEY:
     st.error("⚠️ API 키를 찾을 수 없습니다.")
     
     # 디버그 정보 (배포 환경 확인용)
@@ -161,193 +105,272 @@ else:
     """)
     st.stop()
 
+# 메인 화면 주요 지수
+MARKET_INDICES = {
+    "코스피": "^KS11",
+    "코스닥": "^KQ11",
+    "S&P 500": "^GSPC",
+    "나스닥": "^IXIC"
+}
+# 지수 SWR 캐시는 TTL의 90% 시점(약 54분)에 다시 불러오므로, 그때 저장소가 1시간 기준으로 아직 새것이라
+# 이어 받기를 건너뛰지 않도록 그보다 짧은 기준을 씀 (건너뛰면 화면 지수가 최대 2시간 늦어짐)
+INDEX_STORE_MAX_AGE = 600
+
+# 시세 조회 설정
+QUOTE_FETCH_TIMEOUT = 10 # 추천 종목 전체 시세 조회 제한 시간 (초)
+QUOTE_FETCH_WORKERS = 8 # 동시 조회 수
+
+# 실시간 시세 조회 주기 (초) - 모든 세션이 폴러 하나를 공유
+LIVE_INTERVAL = float(os.getenv("APP_LIVE_INTERVAL", "5"))
+
+# 종목 비교 설정
+COMPARE_PERIODS = {"6개월": "6mo", "1년": "1y", "3년": "3y"}
+COMPARE_MAX_SYMBOLS = 100
+
+# 시장 브리핑 갱신 주기 (초). SWR 캐시는 이 주기의 90% 시점에 다시 만드는데, 그때 리포트 저장소의 항목이 남아 있으면
+# 같은 글을 돌려받아 실제로는 두 주기마다 새로 쓰게 되므로 저장소에는 그보다 짧게 보관 (레플리카끼리는 이 동안 공유)
+BRIEFING_TTL = 3600
+BRIEFING_STORE_TTL = BRIEFING_TTL // 2
+
+# Gemini 동시 요청 한도 (세션 전체 합산)
+GEMINI_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", "4"))
+
 # --- AI 생성 함수 (캐싱 적용) ---
 
-@st.cache_data(ttl=3600)
+@st.cache_resource
+def get_gemini_gate():
+    """모든 세션이 공유하는 Gemini 요청 합치기/동시성 제한 게이트입니다."""
+    return GenerationGate(GEMINI_MAX_CONCURRENCY)
+
+@traced(cached=True)
+def generate_ai_text(prompt, ttl=None):
+    """
+    저장소에 오늘 같은 프롬프트로 만든 결과가 있으면 그대로 쓰고, 없을 때만 생성해 ttl초(기본 하루) 동안 저장합니다.
+    같은 프롬프트로 동시에 들어온 생성 요청은 한 번만 보내고 결과를 나눠 받습니다.
+    """
+    store = get_report_store()
+    cached = store.get(prompt, GEMINI_MODEL)
+    if cached is not None:
+        return cached
+    mark_miss()
+
+    def generate():
+        # 순서를 기다리는 동안 다른 레플리카가 같은 결과를 저장했을 수 있음
+        text = store.get(prompt, GEMINI_MODEL, count=False)
+        if text is None:
+            text = save_generated(store, prompt, get_gemini_model(GEMINI_API_KEY).generate_content(prompt).text, ttl)
+        return text
+    return get_gemini_gate().run(prompt_hash(prompt), generate)
+
+@traced(cached=True)
+def stream_ai_text(prompt, on_chunk=None):
+    """
+    스트리밍으로 생성하며 조각이 올 때마다 on_chunk(누적 텍스트)를 호출하고, 완성된 텍스트를 돌려줍니다.
+    저장소에 같은 프롬프트의 결과가 있으면 생성 없이 그 결과로 on_chunk를 한 번 부릅니다.
+    """
+    store = get_report_store()
+    cached = store.get(prompt, GEMINI_MODEL)
+    if cached is not None:
+        if on_chunk:
+            on_chunk(cached)
+        return cached
+    mark_miss()
+
+    def generate():
+        text = store.get(prompt, GEMINI_MODEL, count=False)
+        if text is not None:
+            return text
+        parts = []
+        for chunk in get_gemini_model(GEMINI_API_KEY).generate_content(prompt, stream=True):
+            try:
+                parts.append(chunk.text)
+            except ValueError:
+                # 텍스트 없이 종료 정보만 담긴 조각
+                continue
+            if on_chunk:
+                on_chunk(''.join(parts))
+        # 모든 조각이 텍스트 없이 끝났으면(안전 필터 차단 등) 저장하지 않고 실패로 처리
+        return save_generated(store, prompt, ''.join(parts))
+
+    # 같은 프롬프트를 기다리는 다른 세션은 스트림 대신 완성된 결과를 받습니다.
+    return get_gemini_gate().run(prompt_hash(prompt), generate)
+
+@st.cache_resource
+def get_report_store():
+    """
+    AI 생성 결과를 (프롬프트 해시, 모델, 날짜)별로 저장하는 SQLite 저장소입니다.
+    재시작 후에도 남고, 같은 DB 파일을 쓰는 레플리카와 batch.py가 만든 결과를 그대로 씁니다.
+    """
+    return open_report_store()
+
+@st.cache_resource
+def get_data_cache():
+    """
+    종목별 데이터(시세, 일봉, 재무제표, 지표)를 담는 세션 공유 캐시입니다.
+    조회한 종목 수와 상관없이 APP_CACHE_MAX_MB 안에서 APP_CACHE_POLICY(lru/lfu)에 따라 오래된 항목을 내보냅니다.
+    """
+    max_mb = float(os.getenv("APP_CACHE_MAX_MB", "256"))
+    return BoundedCache(max_bytes=int(max_mb * 2 ** 20), policy=os.getenv("APP_CACHE_POLICY", "lru"))
+
+@st.cache_resource
+def get_swr_cache():
+    """지수, 추천 종목, 시장 브리핑을 만료 전에 백그라운드에서 갱신하는 공유 캐시입니다."""
+    cache = SWRCache()
+    cache.start()
+    return cache
+
+@traced()
 def get_ai_briefing(market_context=""):
     if not GEMINI_API_KEY: return None
     prompt = f"""
-    다음은 현재 주요 시장 지수 데이터입니다:
+    다음은 마지막 거래일 기준 주요 시장 지수 데이터입니다:
     {market_context}
 
-    위 데이터를 참고하여 오늘의 글로벌 핵심 경제 지표(미국 금리, 달러 환율, 국제 유가 등), 미국 3대 지수 동향, 그리고 한국 증시의 주요 섹터별 흐름과 특이 종목 이슈를 분석하여 상세하게 브리핑해줘. 
+    지수 수치는 위 데이터에서 인용하고, 위 데이터를 참고하여 오늘의 글로벌 핵심 경제 지표(미국 금리, 달러 환율, 국제 유가 등), 미국 3대 지수 동향, 그리고 한국 증시의 주요 섹터별 흐름과 특이 종목 이슈를 분석하여 상세하게 브리핑해줘. 
     전문적인 투자 뉴스레터 형식으로 섹션을 나누어 작성하고, 마지막에 오늘의 투자 인사이트 1줄 요약을 포함해줘. 
     친절하고 가독성 좋은 한글 마크다운 형식을 사용하여 500자 내외로 작성해.
     """
-    response = model.generate_content(prompt)
-    return response.text
+    # 브리핑은 지수 데이터가 같아도 한 시간마다 새로 씀 (이전과 같은 주기)
+    return generate_ai_text(prompt, ttl=BRIEFING_STORE_TTL)
 
-@st.cache_data(ttl=3600)
-def get_ai_analysis(company_name, symbol):
+@traced()
+def get_ai_analysis(company_name, symbol, context="", on_chunk=None):
+    """
+    기업 분석 리포트를 만듭니다. context는 프롬프트에 넣을 데이터 블록이며, 프롬프트가 같으면 저장된 리포트를 씁니다.
+    저장된 리포트가 없으면 스트리밍으로 생성하며 on_chunk로 중간 결과를 전달합니다.
+    """
     if not GEMINI_API_KEY: return None
-    prompt = f"""
-    {company_name} ({symbol}) 기업에 대해 전문적인 주식 분석 리포트를 작성해줘. 다음 구조를 반드시 지켜줘:
+    return stream_ai_text(analysis_prompt(company_name, symbol, context), on_chunk)
 
-    ### 1. 🏢 정성적 기업 분석
-    - 시장 점유율 및 경쟁력 분석
-    - 핵심 사업 모델의 지속 가능성
-    - 현재 직면한 거시적/미시적 리스크
+INVESTMENT_STATUSES = ("매수 권장", "관망", "주의")
 
-    ### 2. 📊 정량적 재무 분석
-    - 수익성 (매출 및 이익 성장성)
-    - 재무 건전성 (부채 및 현금 흐름 상황)
-    - 주요 Valuation 지표 기반 현재 주가 수준 평가
+def parse_verdict(text):
+    """리포트의 '최종 의견' 줄에서 투자 판단을 찾습니다. 아직 그 줄이 도착하지 않았으면 None."""
+    for line in text.splitlines():
+        if '최종 의견' in line:
+            found = [(line.find(s), s) for s in INVESTMENT_STATUSES if s in line]
+            if found:
+                return min(found)[1]
+    return None
 
-    ### 3. 🏁 종합 투자 의견
-    - **최종 의견: [매수 권장 / 관망 / 주의]** 중 하나를 반드시 선택하여 명시
-    - 근거 요약 및 향후 관전 포인트 (1분기~1년 전망)
+@traced(cache=st.cache_resource(ttl=REBUILD_INTERVAL)) # 24시간마다 디스크 저장본 확인 후 재생성
+def get_symbol_index():
+    """KRX 전체 종목의 실제 시장(KOSPI/KOSDAQ/KONEX) 정보가 담긴 티커 조회 테이블입니다."""
+    return load_symbol_index()
 
-    가독성을 위해 상세한 마크다운 형식을 사용하고, 전문적인 투자 용어를 적절히 활용하여 신뢰감 있게 작성해줘.
-    """
-    response = model.generate_content(prompt)
-    return response.text
+@st.cache_resource(ttl=REBUILD_INTERVAL)
+def get_symbol_search():
+    """종목명 접두어/초성/오타 허용 검색 인덱스입니다."""
+    return SymbolSearch(get_symbol_index().table)
 
-@st.cache_data(ttl=86400) # 24시간 캐시
-def load_krx_symbols():
-    """KRX에서 전체 종목 리스트를 가져와 {이름: 티커} 매핑을 생성합니다."""
-    try:
-        # 코스피/코스닥 종목 리스트 URL (KRX KIND - 엑셀 다운로드 형식)
-        # 종목코드 6자리 보존을 위해 파일 형식을 고려한 로직
-        base_url = 'http://kind.krx.co.kr/corpgeneral/corpList.do?method=download&searchType=13'
-        
-        headers = {'User-Agent': 'Mozilla/5.0'}
-        
-        # 코스피/코스닥 한 번에 가져오기 시도
-        res = requests.get(base_url, headers=headers)
-        res.encoding = 'cp949' # KRX는 보통 CP949 사용
-        
-        df = pd.read_html(res.text, header=0)[0]
-        
-        # 필요한 컬럼만 추출 및 정제
-        df = df[['회사명', '종목코드']]
-        df['종목코드'] = df['종목코드'].astype(str).str.zfill(6)
-        
-        # 티커 접미사 결정을 위해 마켓 정보가 필요할 수 있음
-        # 간단하게 .KS로 시도 후 실패 시 .KQ로 넘기는 것보다, yfinance 검색 효율을 위해 분리 시도
-        # 하지만 read_html 결과엔 마켓 구분이 명확치 않을 수 있으므로 우선 매핑 생성
-        
-        mapping = {}
-        for _, row in df.iterrows():
-            name = str(row['회사명']).strip()
-            code = str(row['종목코드']).strip()
-            # 국내 주식은 우선 .KS(코스피)로 매핑하고, yfinance 연동 시 보정
-            mapping[name] = code + ".KS"
-            # 소문자 대응 등
-            mapping[name.lower()] = code + ".KS"
-            
-        return mapping
-    except Exception as e:
-        print(f"Error loading KRX symbols: {e}")
-        return {}
+@traced(cached=True)
+def get_market_briefing():
+    """주요 지수 요약으로 시장 브리핑을 만듭니다. 1시간마다 백그라운드에서 미리 갱신됩니다."""
+    return get_swr_cache().get(("market_briefing",), as_miss(lambda: get_ai_briefing(build_market_context())), ttl=BRIEFING_TTL, hot=True)
 
-@st.cache_data(ttl=3600) # 오류 시 빠른 회복을 위해 1시간으로 단축
+@traced(cached=True)
 def get_dynamic_recommendations():
-    if not GEMINI_API_KEY: return []
-    current_date = datetime.now().strftime("%Y-%m-%d")
-    prompt = f"""
-    오늘 날짜({current_date})를 기준으로 향후 성장세가 엿보이는 유망 종목 20개를 선정해줘.
-    - 한국 주식 15개, 미국 주식 5개로 구성할 것.
-    - 결과는 반드시 아래의 JSON 리스트 형식으로만 출력할 것 (다른 텍스트 금지):
-    [
-      {{"name": "종목이름", "symbol": "티커(한국은 .KS 또는 .KQ 포함)", "reason": "추천 사유 (한글)"}},
-      ...
-    ]
-    - 한국 주식 예시: 삼성전자 (005930.KS), 에코프로비엠 (247540.KQ)
-    - 미국 주식 예시: NVDA, AAPL 등
     """
+    오늘의 추천 종목. 목록은 하루에 한 번 만들어 저장하고(batch.py --recommendations와 공유),
+    1시간마다의 백그라운드 갱신은 저장된 목록을 다시 읽을 뿐입니다. 실패 시 마지막 정상 목록을 유지합니다.
+    """
+    if not GEMINI_API_KEY: return []
     try:
-        response = model.generate_content(prompt)
-        import json
-        import re
-        # JSON 부분만 추출 (가끔 AI가 백틱을 포함함)
-        match = re.search(r'\[.*\]', response.text, re.DOTALL)
-        if match:
-            json_str = match.group()
-            # 종종 따옴표 문제 해결
-            json_str = json_str.replace("'", '"')
-            return json.loads(json_str)
-        return []
+        return get_swr_cache().get(("recommendations",), as_miss(fetch_dynamic_recommendations), ttl=3600, hot=True)
     except Exception as e:
         print(f"Error in dynamic recommendations: {e}")
         return []
 
-@st.cache_data(ttl=600) # 10분 캐싱
+def fetch_dynamic_recommendations():
+    """오늘 날짜의 추천 목록. 배치 작업이나 다른 프로세스가 이미 만들어 저장했으면 그 목록을 씁니다."""
+    current_date = datetime.now().strftime("%Y-%m-%d")
+    saved = load_saved_recommendations(current_date)
+    if saved:
+        return saved
+    items = parse_recommendations(generate_ai_text(recommendations_prompt(current_date)))
+    save_recommendations(current_date, items)
+    return items
+
+@traced(cache=get_data_cache().memoize(ttl=600)) # 10분 캐싱 (실패는 캐싱하지 않도록 예외는 바깥에서 처리)
+def fetch_naver_finance_info(symbol):
+    return load_naver_info(symbol, QUOTE_REQUEST_TIMEOUT)
+
 def get_naver_finance_info(symbol):
     """네이버 증시에서 국내 주식 정보를 긁어옵니다."""
     try:
-        # 티커에서 숫자만 추출 (예: 005930.KS -> 005930)
-        code = ''.join(filter(str.isdigit, symbol))
-        if not code or len(code) != 6: return None
-        
-        url = f"https://finance.naver.com/item/main.naver?code={code}"
-        headers = {'User-Agent': 'Mozilla/5.0'}
-        res = requests.get(url, headers=headers)
-        soup = BeautifulSoup(res.text, 'html.parser')
-        
-        # 주가
-        price_tag = soup.select_one(".no_today .blind")
-        price = int(price_tag.text.replace(',', '')) if price_tag else 0
-        
-        # 전일비
-        diff_tag = soup.select_one(".no_exday .blind")
-        diff = int(diff_tag.text.replace(',', '')) if diff_tag else 0
-        ico = soup.select_one(".no_exday em span")
-        if ico and '상승' not in ico.text and '상한' not in ico.text:
-            diff = -diff
-            
-        # 시가총액 파싱 보강
-        mkt_cap_tag = soup.select_one("#_market_sum")
-        mkt_cap = 0
-        if mkt_cap_tag:
-            mkt_cap_str = mkt_cap_tag.text.replace(',', '').replace('억원', '').replace('원', '').strip()
-            # "419조 723" 또는 "8,500" 등의 형식 처리
-            if '조' in mkt_cap_str:
-                parts = mkt_cap_str.split('조')
-                mkt_cap += int(parts[0].strip()) * 1e12
-                if parts[1].strip():
-                    mkt_cap += int(parts[1].strip()) * 1e8
-            else:
-                mkt_cap = int(mkt_cap_str.strip()) * 1e8
-            
-        # PER 파싱 보강
-        per_tag = soup.select_one("#_per")
-        per = per_tag.text.replace('배', '').replace(',', '').strip() if per_tag else 'N/A'
-        
-        return {
-            'currentPrice': price,
-            'priceDiff': diff,
-            'marketCap': mkt_cap,
-            'trailingPE': per,
-            'currency': 'KRW',
-            'source': 'naver'
-        }
+        return fetch_naver_finance_info(symbol)
     except Exception as e:
         print(f"Naver Scrape Error for {symbol}: {e}")
         return None
 
+@traced()
 def get_combined_stock_info(symbol):
-    """네이버를 우선하고, 실패하거나 해외 주식이면 yfinance를 사용합니다."""
-    # 국내 주식 여부 확인 (.KS, .KQ)
-    if '.KS' in symbol or '.KQ' in symbol:
-        naver = get_naver_finance_info(symbol)
-        if naver:
-            # yfinance는 회사명 등을 위해 보조적으로 사용
-            yf_info = get_stock_info(symbol)
-            if yf_info:
-                naver['longName'] = yf_info.get('longName', symbol)
-                naver['sector'] = yf_info.get('sector', 'N/A')
-                naver['previousClose'] = yf_info.get('previousClose', naver['currentPrice'] - naver['priceDiff'])
-            return naver
-            
-    return get_stock_info(symbol)
+    """네이버를 우선하고, 실패하거나 해외 주식이면 yfinance를 사용합니다. (batch.py와 같은 규칙)"""
+    return combine_stock_info(symbol, get_naver_finance_info, get_stock_info)
 
 # --- 데이터 페칭 함수 ---
 
-@st.cache_data(ttl=3600)
+@st.cache_resource
+def get_market_store():
+    return MarketDataStore()
+
+@traced()
+def load_daily_history(symbol, max_age=3600):
+    """디스크 저장소의 일봉을 읽고, max_age초(기본 1시간) 이상 지났으면 마지막 저장일 이후만 이어 받습니다."""
+    return get_market_store().refresh(symbol, lambda **kw: download_history(symbol, **kw), period="5y", max_age=max_age)
+
+@traced(cached=True)
 def get_index_data(symbol):
-    ticker = yf.Ticker(symbol)
-    df = ticker.history(period="1y")
-    return df
+    """지수의 최근 1년 일봉. 1시간마다 백그라운드에서 미리 갱신됩니다."""
+    return get_swr_cache().get(("index", symbol), as_miss(lambda: slice_history(load_daily_history(symbol, INDEX_STORE_MAX_AGE), 12)), ttl=3600, hot=True)
+
+def build_market_context():
+    """
+    AI 브리핑에 전달할 주요 지수 요약(종가, 기간 수익률, 변동성, 52주 고가 대비)을 토큰 예산 안에서 만듭니다.
+    화면용 1년 구간(get_index_data)은 오늘 봉을 빼면 1년 수익률을 낼 수 없어 저장된 전체 일봉을 씁니다.
+    """
+    return market_context({name: load_daily_history(sym, INDEX_STORE_MAX_AGE) for name, sym in MARKET_INDICES.items()})
+
+@traced(cache=get_data_cache().memoize(ttl=3600))
+def get_daily_history(symbol):
+    """저장소의 전체 일봉을 종목별로 한 번만 불러옵니다. (시작일이 고정되어 지표를 이어 계산하는 기준이 됨)"""
+    return load_daily_history(symbol)
+
+@traced()
+def get_price_history(symbol):
+    """차트에 쓰는 가장 긴 구간(5년)의 일봉입니다."""
+    return slice_history(get_daily_history(symbol), 60)
+
+def slice_history(hist, months=None):
+    """캐싱된 일봉에서 최근 months개월 구간을 복사 없이 잘라냅니다. (None이면 전체)"""
+    if months is None or hist.empty:
+        return hist
+    start = hist.index[-1] - pd.DateOffset(months=months)
+    return hist.iloc[hist.index.searchsorted(start):]
+
+@traced(cached=True)
+def get_indicators(symbol, hist):
+    """
+    hist(get_price_history 구간)의 지표. 매일 시작일이 바뀌는 hist 대신 저장소 전체 일봉으로 (종목, 마지막 봉)별로 한 번만 계산하고,
+    새 봉이 붙으면 그 구간만 이어서 계산한 뒤 hist 구간으로 자릅니다. 배당/분할로 전체를 다시 받았으면(adjusted_at) 처음부터 계산합니다.
+    """
+    full = get_daily_history(symbol)
+    cache = get_data_cache()
+    prev = cache.get(("indicators", symbol))
+    if prev is not None and prev.attrs.get('adjusted_at') != full.attrs.get('adjusted_at'):
+        prev = None
+    if prev is not None and len(prev) == len(full) and not full.empty and prev.index[-1] == full.index[-1] \
+            and prev.attrs.get('last_close') == full['Close'].iloc[-1]:
+        ind = prev
+    else:
+        mark_miss()
+        ind = compute_indicators(full, prev)
+        if not full.empty:
+            ind.attrs = {'last_close': full['Close'].iloc[-1], 'adjusted_at': full.attrs.get('adjusted_at')}
+        cache.set(("indicators", symbol), ind)
+    if hist.empty:
+        return ind.iloc[:0]
+    return ind.iloc[ind.index.searchsorted(hist.index[0]):]
 
 def format_currency(value):
     if value >= 1e12:
@@ -356,19 +379,82 @@ def format_currency(value):
         return f"{value / 1e8:.1f}억"
     return str(value)
 
+@traced(cache=get_data_cache().memoize(ttl=STATEMENT_MAX_AGE)) # 재무제표는 하루 단위로 캐싱
+def get_financial_view(symbol):
+    """종목의 재무제표 표와 재무 비율 표를 만들어 둡니다. (원본은 디스크에 하루 동안 보관)"""
+    return build_statement_view(load_statements(symbol))
+
+@traced(cache=get_data_cache().memoize(ttl=600)) # 10분 캐싱 (실패는 캐싱하지 않도록 예외는 바깥에서 처리)
+def fetch_yf_info(symbol):
+    import yfinance as yf # import가 무거워 첫 시세 조회 때 불러옴
+    return yf.Ticker(symbol).info
+
 def get_stock_info(symbol):
     try:
-        ticker = yf.Ticker(symbol)
-        info = ticker.info
-        return info
+        return fetch_yf_info(symbol)
     except:
         return None
 
+@st.cache_resource
+def get_quote_executor():
+    """시세 병렬 조회에 모든 세션이 공유하는 스레드 풀을 만듭니다."""
+    return ThreadPoolExecutor(max_workers=QUOTE_FETCH_WORKERS, thread_name_prefix="quote")
+
+@st.cache_resource
+def get_quote_poller():
+    """모든 세션이 보고 있는 종목의 장중 시세를 함께 조회하는 폴러 (프로세스당 하나)"""
+    return QuotePoller(interval=LIVE_INTERVAL)
+
+def live_quote_updates(region, symbols):
+    """
+    화면 영역(region)이 보여주는 종목을 폴러에 등록하고, (그 영역의 전체 시세, 마지막으로 받은 뒤 바뀐 시세)를 돌려줍니다.
+    폴러에서는 바뀐 값만 가져오며, 종목 구성이 바뀌면 처음부터 다시 받습니다.
+    """
+    state = st.session_state
+    if 'live_session_id' not in state:
+        state.live_session_id = uuid.uuid4().hex
+    symbols = tuple(dict.fromkeys(symbols))
+    poller = get_quote_poller()
+    poller.watch((state.live_session_id, region), symbols)
+
+    seen = state.setdefault('live_seen', {}) # 영역 -> (종목, 받은 버전, 시세)
+    prev_symbols, version, quotes = seen.get(region, ((), 0, {}))
+    if prev_symbols != symbols:
+        version, quotes = 0, {}
+    changed, version = poller.changes(version, symbols)
+    quotes = {**quotes, **changed}
+    seen[region] = (symbols, version, quotes)
+    return quotes, changed
+
+def live_fragment(fn, live):
+    """실시간 모드이면 fn을 LIVE_INTERVAL마다 그 영역만 다시 실행되는 fragment로 감쌉니다."""
+    return traced_fragment(fn, run_every=LIVE_INTERVAL) if live else fn
+
+def iter_combined_stock_info(symbols, timeout=QUOTE_FETCH_TIMEOUT):
+    """여러 종목의 시세를 동시에 조회하고, 제한 시간 안에 끝난 순서대로 (티커, 정보)를 돌려줍니다."""
+    executor = get_quote_executor()
+    futures = {executor.submit(tracing.bind(get_combined_stock_info), sym): sym for sym in dict.fromkeys(symbols)}
+    try:
+        for future in as_completed(futures, timeout=timeout):
+            try:
+                yield futures[future], future.result()
+            except Exception as e:
+                print(f"Quote fetch error for {futures[future]}: {e}")
+                yield futures[future], None
+    except FuturesTimeoutError:
+        # 늦은 종목은 건너뛰고 화면을 먼저 그립니다. 작업은 백그라운드에서 계속 돌아 다음 실행 때 캐시로 쓰입니다.
+        pending = [sym for future, sym in futures.items() if not future.done()]
+        print(f"Quote fetch timed out for: {pending}")
+
 # --- UI 컴포넌트 ---
 
+@traced()
 def draw_index_chart(df, title):
+    # 긴 구간은 LTTB로 점을 줄이고, 그래도 많으면 WebGL로 그림
+    view = downsample_line(df, 'Close')
+    scatter = go.Scattergl if len(view) > SCATTERGL_THRESHOLD else go.Scatter
     fig = go.Figure()
-    fig.add_trace(go.Scatter(x=df.index, y=df['Close'], mode='lines', name=title, line=dict(color='#007bff')))
+    fig.add_trace(scatter(x=view.index, y=view['Close'], mode='lines', name=title, line=dict(color='#007bff')))
     fig.update_layout(
         title=f"{title} 1년 추이",
         xaxis_title="날짜",
@@ -393,43 +479,162 @@ def draw_index_chart(df, title):
         plot_bgcolor='white',
         paper_bgcolor='white'
     )
-    st.plotly_chart(fig, use_container_width=True)
+    with trace_span("plotly_chart") as s:
+        st.plotly_chart(fig, use_container_width=True)
+        s.size = figure_size(fig)
+
+@traced()
+def draw_price_chart(hist, ind, key):
+    """
+    구간 길이에 맞춰 일/주/월봉으로 묶어 그립니다.
+    긴 구간은 '구간 확대' 슬라이더로 좁히면 다시 일봉 해상도로 내려갑니다.
+    """
+    if len(hist) > MAX_CANDLES:
+        first, last = hist.index[0].date(), hist.index[-1].date()
+        start, end = st.slider("구간 확대", min_value=first, max_value=last, value=(first, last), format="YYYY-MM-DD", key=f"zoom_{key}")
+        dates = hist.index.date
+        in_range = (dates >= start) & (dates <= end)
+        hist, ind = hist[in_range], ind[in_range]
+
+    candles, label = decimate_candles(hist)
+    if len(candles) < len(hist):
+        st.caption(f"{len(hist):,}일 → {label} {len(candles):,}개로 표시 중 (구간을 좁히면 일봉으로 표시)")
+    # 지표는 일봉 기준 값을 각 봉의 마지막 거래일에서 가져오고, 매물대는 원본 일봉으로 계산
+    draw_candlestick_chart(candles, ind.loc[candles.index], profile_source=hist)
+
+@traced()
+def draw_candlestick_chart(hist, ind=None, profile_source=None):
+    """캔들 차트에 이동평균/볼린저 밴드/매물대를 겹치고, 아래에 RSI와 MACD를 그립니다."""
+    rows = 3 if ind is not None else 1
+    fig = make_subplots(rows=rows, cols=1, shared_xaxes=True, vertical_spacing=0.03,
+                        row_heights=[0.6, 0.2, 0.2] if rows == 3 else [1.0])
+    fig.add_trace(go.Candlestick(
+        x=hist.index,
+        open=hist['Open'],
+        high=hist['High'],
+        low=hist['Low'],
+        close=hist['Close'],
+        increasing_line_color='red', # 한국 스타일
+        decreasing_line_color='blue',
+        name='주가',
+        # 한글 툴팁 표시는 Plotly의 위 속성으로 기본 제공되나, 명시적으로 hovertemplate 설정 가능
+        hovertemplate="날짜: %{x}<br>시가: %{open:,.0f}<br>고가: %{high:,.0f}<br>저가: %{low:,.0f}<br>종가: %{close:,.0f}"
+    ), row=1, col=1)
+
+    if ind is not None:
+        # 볼린저 밴드 (상단-하단 사이 음영)
+        fig.add_trace(go.Scatter(x=ind.index, y=ind['bb_upper'], line=dict(color='rgba(150,150,150,0.6)', width=1), name='볼린저 상단'), row=1, col=1)
+        fig.add_trace(go.Scatter(x=ind.index, y=ind['bb_lower'], line=dict(color='rgba(150,150,150,0.6)', width=1), fill='tonexty', fillcolor='rgba(200,200,200,0.15)', name='볼린저 하단'), row=1, col=1)
+        for col, color in (('sma20', '#ff9800'), ('sma60', '#4caf50'), ('sma120', '#9c27b0')):
+            fig.add_trace(go.Scatter(x=ind.index, y=ind[col], line=dict(color=color, width=1.2), name=col.upper().replace('SMA', 'MA')), row=1, col=1)
 
+        # 매물대 (가격대별 거래량) - 가격 축을 공유하는 보조 x축에 가로 막대로 표시
+        profile = volume_profile(profile_source if profile_source is not None else hist)
+        fig.add_trace(go.Bar(x=profile['volume'], y=profile['price'], orientation='h', xaxis='x4', yaxis='y',
+                             marker_color='rgba(0,123,255,0.18)', name='매물대', hovertemplate="가격대: %{y:,.0f}<br>거래량: %{x:,.0f}"))
+        fig.update_layout(xaxis4=dict(overlaying='x', anchor='y', side='top', visible=False,
+                                      range=[0, max(profile['volume'].max(), 1) * 4]))
+
+        fig.add_trace(go.Scatter(x=ind.index, y=ind['rsi'], line=dict(color='#007bff', width=1.2), name='RSI(14)'), row=2, col=1)
+        fig.add_hline(y=70, line=dict(color='#dc3545', width=1, dash='dot'), row=2, col=1)
+        fig.add_hline(y=30, line=dict(color='#28a745', width=1, dash='dot'), row=2, col=1)
+
+        fig.add_trace(go.Bar(x=ind.index, y=ind['macd_hist'], marker_color='rgba(120,120,120,0.5)', name='MACD 히스토그램'), row=3, col=1)
+        fig.add_trace(go.Scatter(x=ind.index, y=ind['macd'], line=dict(color='#e91e63', width=1.2), name='MACD'), row=3, col=1)
+        fig.add_trace(go.Scatter(x=ind.index, y=ind['macd_signal'], line=dict(color='#3f51b5', width=1.2), name='시그널'), row=3, col=1)
+        fig.update_yaxes(title_text="RSI", range=[0, 100], row=2, col=1)
+        fig.update_yaxes(title_text="MACD", row=3, col=1)
+
+    fig.update_xaxes(
+        tickformat='%Y-%m-%d',
+        tickfont=dict(color='#000000', size=12, family="Arial Black"),
+        title_font=dict(color='#000000', size=14),
+        tickangle=-45,
+        showgrid=True,
+        gridcolor='#eeeeee',
+        rangeslider_visible=False
+    )
+    fig.update_yaxes(
+        tickfont=dict(color='#000000', size=12),
+        title_font=dict(color='#000000', size=14),
+        showgrid=True,
+        gridcolor='#eeeeee'
+    )
+    fig.update_xaxes(title_text="날짜", row=rows, col=1)
+    fig.update_yaxes(title_text="가격", row=1, col=1)
+    fig.update_layout(
+        height=500 if rows == 1 else 800,
+        showlegend=True,
+        legend=dict(orientation='h', y=1.02, x=0),
+        plot_bgcolor='white',
+        paper_bgcolor='white'
+    )
+    with trace_span("plotly_chart") as s:
+        st.plotly_chart(fig, use_container_width=True)
+        s.size = figure_size(fig)
+
+def go_to(page, symbol=None):
+    """화면을 전환합니다. 버튼의 on_click으로 쓰면 클릭 직후 실행이 곧바로 새 화면만 그립니다."""
+    st.session_state.current_page = page
+    if symbol is not None:
+        st.session_state.search_symbol = symbol
+
+@traced_fragment
+@traced()
+def render_search_box():
+    """
+    종목 검색창과 후보 버튼. 글자를 입력할 때마다 이 영역만 다시 실행되고,
+    종목이 정해지면 화면을 바꾸기 위해 앱 전체를 다시 실행합니다.
+    """
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        search_query = st.text_input("", placeholder="분석할 국내 종목명을 입력하세요 (예: 삼성전자, SK하이닉스)", label_visibility="collapsed")
+    with col2:
+        start_clicked = st.button("분석 시작", use_container_width=True)
+
+    # 정확히 일치하는 종목이 없으면 접두어/초성/오타 허용 후보를 제안
+    resolved = get_symbol_index().resolve(search_query) if search_query else None
+    suggestions = get_symbol_search().search(search_query, limit=5) if search_query and not resolved else []
+
+    if start_clicked and search_query:
+        # 종목표에 없는 티커 모양의 입력(해외 티커 등)은 오타 후보가 있어도 그대로 넘김
+        target = search_target(search_query, resolved, suggestions)
+        if target:
+            go_to("analysis", target)
+            st.rerun(scope="app")
+        st.warning(f"'{search_query}'와 정확히 일치하는 종목이 없습니다. 아래 후보 중에서 선택해 주세요.")
+
+    if suggestions:
+        st.caption("🔎 혹시 이 종목을 찾으시나요?")
+        sug_cols = st.columns(len(suggestions))
+        for sug_col, cand in zip(sug_cols, suggestions):
+            if sug_col.button(cand['name'], key=f"suggest_{cand['symbol']}", use_container_width=True):
+                go_to("analysis", cand['symbol'])
+                st.rerun(scope="app")
+
+@traced()
 def render_main_screen():
     st.title("💰 오늘의 증시 분석 및 인공지능 추천")
 
-    # 1) 종목명 입력 단추
+    # 1) 종목명 입력 단추 (입력/후보 선택은 이 영역만 다시 실행)
     with st.container():
-        col1, col2 = st.columns([3, 1])
-        with col1:
-            search_query = st.text_input("", placeholder="분석할 국내 종목명을 입력하세요 (예: 삼성전자, SK하이닉스)", label_visibility="collapsed")
-        with col2:
-            if st.button("분석 시작", use_container_width=True):
-                if search_query:
-                    st.session_state.current_page = "analysis"
-                    st.session_state.search_symbol = search_query # 실제 티커 변환 필요
-                    st.rerun()
+        render_search_box()
+        st.button("📊 전체 종목 스크리너", on_click=go_to, args=("screener",))
+        st.button("📈 여러 종목 비교", on_click=go_to, args=("compare",))
+        st.button("🧪 추천 종목 성과 백테스트", on_click=go_to, args=("backtest",))
 
     st.markdown("---")
 
     # 2) 글로벌 주요 지수 현황
     st.subheader("🌐 글로벌 주요 지수 현황")
-    indices = {
-        "코스피": "^KS11",
-        "코스닥": "^KQ11",
-        "S&P 500": "^GSPC",
-        "나스닥": "^IXIC"
-    }
-    
-    idx_tabs = st.tabs(list(indices.keys()))
-    for tab, (name, symbol) in zip(idx_tabs, indices.items()):
+    live = st.toggle("⚡ 실시간 시세", key="live_mode", help=f"지수와 추천 종목 시세를 {LIVE_INTERVAL:g}초마다 바뀐 값만 갱신합니다.")
+    idx_tabs = st.tabs(list(MARKET_INDICES.keys()))
+    for tab, (name, symbol) in zip(idx_tabs, MARKET_INDICES.items()):
         with tab:
             data = get_index_data(symbol)
             if not data.empty:
-                current_val = data['Close'].iloc[-1]
-                prev_val = data['Close'].iloc[-2]
-                delta = current_val - prev_val
-                st.metric(label=f"{name} 현재 지수", value=f"{current_val:,.2f}", delta=f"{delta:,.2f} ({delta/prev_val*100:.2f}%)")
+                # 실시간 모드에서는 지수 값만 주기적으로 다시 그리고 차트는 그대로 둠
+                live_fragment(render_index_metric, live)(name, symbol, data, live)
                 draw_index_chart(data, name)
             else:
                 st.error(f"{name} 데이터를 불러올 수 없습니다.")
@@ -440,19 +645,8 @@ def render_main_screen():
     st.subheader("💡 오늘의 시장 브리핑 (AI 분석)")
     if GEMINI_API_KEY:
         try:
-            # AI에게 전달할 시장 데이터 요약
-            context_list = []
-            for name, sym in indices.items():
-                d = get_index_data(sym)
-                if not d.empty:
-                    c = d['Close'].iloc[-1]
-                    p = d['Close'].iloc[-2]
-                    ch = c - p
-                    pc = (ch/p)*100
-                    context_list.append(f"{name}: {c:,.2f} ({ch:+.2f}, {pc:+.2f}%)")
-            
-            market_context = "\n".join(context_list)
-            briefing = get_ai_briefing(market_context)
+            # 지수 요약을 담아 생성한 브리핑 (백그라운드에서 미리 갱신됨)
+            briefing = get_market_briefing()
             if briefing:
                 st.markdown(f'''
                 <div class="ai-report-area">
@@ -495,61 +689,127 @@ def render_main_screen():
             {"name": "Amazon", "symbol": "AMZN", "reason": "AWS 클라우드 성장 및 물류망 효율화"}
         ]
 
+    # 최대 20개까지만 표시 (데이터 안정성 위해)
+    recommendations = recommendations[:20]
+
+    if live:
+        # 시세 정보(회사명, 시총, PER)는 이번 실행에서 한 번만 받고, 주기적으로 다시 실행되는 fragment는 장중 가격만 반영
+        infos = dict(iter_combined_stock_info([rec['symbol'] for rec in recommendations]))
+        st.session_state.live_card_html = {}
+        live_fragment(render_live_recommendation_grid, live)(recommendations, infos)
+    else:
+        render_recommendation_grid(recommendations)
+
+def render_index_metric(name, symbol, data, live=False):
+    """지수 현재 값. 실시간 모드이면 폴러가 받은 장중 값을 씁니다."""
+    quote = live_quote_updates("index", list(MARKET_INDICES.values()))[0].get(symbol) if live else None
+    if quote:
+        current_val, delta, delta_pct = quote['price'], quote['change'], quote['change_pct']
+    else:
+        current_val = data['Close'].iloc[-1]
+        prev_val = data['Close'].iloc[-2]
+        delta = current_val - prev_val
+        delta_pct = delta / prev_val * 100
+    st.metric(label=f"{name} 현재 지수", value=f"{current_val:,.2f}", delta=f"{delta:,.2f} ({delta_pct:.2f}%)")
+
+def render_recommendation_button(rec, i):
+    # on_click에서 화면을 바꾸므로 클릭 직후 실행은 메인 화면을 다시 그리지 않고 바로 분석 화면을 그림
+    # (실시간 모드의 fragment 안에서는 그 영역만 다시 실행되므로 앱 전체 재실행을 요청)
+    if st.button(f"{rec['name']} 상세 분석", key=f"btn_{rec['symbol']}_{i}", on_click=go_to, args=("analysis", rec['symbol'])):
+        st.rerun(scope="app")
+
+def render_recommendation_grid(recommendations):
+    """추천 종목 카드 목록."""
+    # 카드 자리를 먼저 그려두고, 시세가 도착하는 대로 채웁니다.
     cols = st.columns(2)
-    display_count = 0
+    card_slots = {}
     for i, rec in enumerate(recommendations):
-        # 최대 20개까지만 표시 (데이터 안정성 위해)
-        if display_count >= 20: break
-        
-        col_idx = display_count % 2
-        with cols[col_idx]:
-            try:
-                # 데이터를 가져오되 실패해도 기본 정보는 표시
-                info = get_combined_stock_info(rec['symbol'])
-                price = 0
-                mkt_cap = 0
-                per = "N/A"
-                currency = "KRW"
-                
-                if info:
-                    price = info.get('currentPrice', info.get('regularMarketPrice', 0))
-                    mkt_cap = info.get('marketCap', 0)
-                    per = info.get('trailingPE', 'N/A')
-                    currency = info.get('currency', 'KRW')
-                
-                status = "매수 권장"
-                status_class = "status-buy"
-                badge_class = "buy-badge"
-
-                st.markdown(f"""
-                <div class="recommendation-card {status_class}">
-                    <h4 style="margin-top:0;">{rec['name']} ({rec['symbol']}) <span class="{badge_class}">{status}</span></h4>
-                    <p style="font-size: 0.9rem; color: #666; margin-bottom: 10px;">{rec['reason']}</p>
-                    <div style="display: flex; justify-content: space-between; font-size: 0.85rem;">
-                        <span><b>현재가:</b> {f"{price:,.0f}" if price > 0 else "데이터 준비중"} {currency}</span>
-                        <span><b>시총:</b> {format_currency(mkt_cap) if mkt_cap > 0 else "추세 확인중"}</span>
-                        <span><b>PER:</b> {per if isinstance(per, str) else f"{per:.1f}"}</span>
-                    </div>
-                </div>
-                """, unsafe_allow_html=True)
-                if st.button(f"{rec['name']} 상세 분석", key=f"btn_{rec['symbol']}_{i}"):
-                    st.session_state.current_page = "analysis"
-                    st.session_state.search_symbol = rec['symbol']
-                    st.rerun()
-                display_count += 1
-            except:
-                # 예외 시에도 최소한 명칭은 출력 시도
-                st.write(f"⚠️ {rec['name']} 로딩 중...")
-                display_count += 1
+        with cols[i % 2]:
+            slot = st.empty()
+            render_recommendation_card(slot, rec, None)
+            card_slots.setdefault(rec['symbol'], []).append((slot, rec))
+            render_recommendation_button(rec, i)
+
+    for symbol, info in iter_combined_stock_info(list(card_slots)):
+        for slot, rec in card_slots[symbol]:
+            render_recommendation_card(slot, rec, info)
+
+def render_live_recommendation_grid(recommendations, infos):
+    """
+    실시간 모드의 추천 종목 카드 목록. LIVE_INTERVAL마다 이 영역만 다시 실행되며,
+    폴러가 받은 시세 중 바뀐 종목의 카드만 새로 만들고 나머지는 이전에 만든 카드를 그대로 씁니다.
+    """
+    quotes, changed = live_quote_updates("recommendations", [rec['symbol'] for rec in recommendations])
+    cards = st.session_state.live_card_html
+    cols = st.columns(2)
+    for i, rec in enumerate(recommendations):
+        with cols[i % 2]:
+            if i not in cards or rec['symbol'] in changed:
+                cards[i] = recommendation_card_html(rec, infos.get(rec['symbol']), quotes.get(rec['symbol']))
+            st.markdown(cards[i], unsafe_allow_html=True)
+            render_recommendation_button(rec, i)
+
+def render_recommendation_card(slot, rec, info, live=None):
+    """추천 종목 카드를 그립니다. info가 없으면 데이터 준비중 상태로, live(장중 시세)가 있으면 그 가격으로 표시합니다."""
+    slot.markdown(recommendation_card_html(rec, info, live), unsafe_allow_html=True)
+
+def recommendation_card_html(rec, info, live=None):
+    """추천 종목 카드의 HTML을 만듭니다."""
+    try:
+        price = 0
+        mkt_cap = 0
+        per = "N/A"
+        currency = "KRW"
+
+        if info:
+            price = info.get('currentPrice', info.get('regularMarketPrice', 0))
+            mkt_cap = info.get('marketCap', 0)
+            per = info.get('trailingPE') or 'N/A'
+            currency = info.get('currency', 'KRW')
+        change = ""
+        if live:
+            price = live['price']
+            change = f" ({live['change_pct']:+.2f}%)"
+
+        status = "매수 권장"
+        status_class = "status-buy"
+        badge_class = "buy-badge"
 
+        return f"""
+        <div class="recommendation-card {status_class}">
+            <h4 style="margin-top:0;">{rec['name']} ({rec['symbol']}) <span class="{badge_class}">{status}</span></h4>
+            <p style="font-size: 0.9rem; color: #666; margin-bottom: 10px;">{rec['reason']}</p>
+            <div style="display: flex; justify-content: space-between; font-size: 0.85rem;">
+                <span><b>현재가:</b> {f"{price:,.0f}" if price > 0 else "데이터 준비중"} {currency}{change}</span>
+                <span><b>시총:</b> {format_currency(mkt_cap) if mkt_cap > 0 else "추세 확인중"}</span>
+                <span><b>PER:</b> {per if isinstance(per, str) else f"{per:.1f}"}</span>
+            </div>
+        </div>
+        """
+    except:
+        # 예외 시에도 최소한 명칭은 출력 시도
+        return f"⚠️ {rec['name']} 로딩 중..."
+
+@traced_fragment
+@traced()
+def render_price_tab(full_hist, full_ind, months, key):
+    """차트 탭 하나를 그립니다. '구간 확대' 슬라이더를 움직이면 이 탭만 다시 실행됩니다."""
+    hist = slice_history(full_hist, months)
+    if hist.empty:
+        return
+    # 지표는 전체 구간에서 한 번 계산한 결과를 같은 위치로 잘라 사용
+    ind = full_ind.iloc[len(full_ind) - len(hist):]
+    draw_price_chart(hist, ind, key=key)
+    st.caption(f"ATR(14): {ind['atr'].iloc[-1]:,.2f}  ·  RSI(14): {ind['rsi'].iloc[-1]:.1f}")
+
+@traced()
 def render_analysis_screen(symbol):
     # 실제 티커 검색 로직 (한글 -> 티커)
     # 여기서는 간단히 맵핑 테이블을 사용하거나, 사용자가 입력한 게 티커라고 가정
     # 프로젝트를 위해 간단한 매핑 테이블 추가 필요 시 추가
     
-    st.button("🔙 메인 화면으로 돌아가기", on_click=lambda: st.session_state.update(current_page="main"))
+    st.button("🔙 메인 화면으로 돌아가기", on_click=go_to, args=("main",))
     
-    ticker = yf.Ticker(symbol)
     info = get_combined_stock_info(symbol)
     
     if not info or ('longName' not in info and 'source' not in info):
@@ -577,132 +837,88 @@ def render_analysis_screen(symbol):
     m3.metric("시가총액", format_currency(info.get('marketCap', 0)))
     m4.metric("PER", per_display)
 
+    pbr_val = info.get('priceToBook')
+    high_52w = info.get('fiftyTwoWeekHigh') or 0
+    low_52w = info.get('fiftyTwoWeekLow') or 0
+    volume = info.get('volume') or 0
+    n1, n2, n3, n4 = st.columns(4)
+    n1.metric("PBR", f"{pbr_val:.2f}" if isinstance(pbr_val, (int, float)) else (str(pbr_val) if pbr_val else "N/A"))
+    n2.metric("52주 최고", f"{high_52w:,.0f}" if high_52w else "N/A")
+    n3.metric("52주 최저", f"{low_52w:,.0f}" if low_52w else "N/A")
+    n4.metric("거래량", f"{volume:,.0f}" if volume else "N/A")
+
     # 2) 차트 탭
     st.subheader("📈 주가 차트")
-    periods = {"20일": "1mo", "1년": "1y", "3년": "3y", "5년": "5y"}
+    periods = {"20일": 1, "1년": 12, "3년": 36, "5년": None}
     chart_tabs = st.tabs(list(periods.keys()))
+    full_hist = get_price_history(symbol)
+    
+    full_ind = get_indicators(symbol, full_hist)
     
-    for tab, (p_name, p_val) in zip(chart_tabs, periods.items()):
+    for tab, (p_name, months) in zip(chart_tabs, periods.items()):
         with tab:
-            hist = ticker.history(period=p_val)
-            if not hist.empty:
-                fig = go.Figure(data=[go.Candlestick(
-                    x=hist.index,
-                    open=hist['Open'],
-                    high=hist['High'],
-                    low=hist['Low'],
-                    close=hist['Close'],
-                    increasing_line_color='red', # 한국 스타일
-                    decreasing_line_color='blue',
-                    name='주가'
-                )])
-                # 한글 툴팁 표시는 Plotly의 위 속성으로 기본 제공되나, 명시적으로 hovertemplate 설정 가능
-                fig.update_traces(
-                    hovertemplate="날짜: %{x}<br>시가: %{open:,.0f}<br>고가: %{high:,.0f}<br>저가: %{low:,.0f}<br>종가: %{close:,.0f}"
-                )
-                fig.update_layout(
-                    xaxis_title="날짜",
-                    yaxis_title="가격",
-                    xaxis=dict(
-                        tickformat='%Y-%m-%d',
-                        tickfont=dict(color='#000000', size=12, family="Arial Black"),
-                        title_font=dict(color='#000000', size=14),
-                        tickangle=-45,
-                        showgrid=True,
-                        gridcolor='#eeeeee'
-                    ),
-                    yaxis=dict(
-                        tickfont=dict(color='#000000', size=12),
-                        title_font=dict(color='#000000', size=14),
-                        showgrid=True,
-                        gridcolor='#eeeeee'
-                    ),
-                    xaxis_rangeslider_visible=False,
-                    height=500,
-                    plot_bgcolor='white',
-                    paper_bgcolor='white'
-                )
-                st.plotly_chart(fig, use_container_width=True)
+            render_price_tab(full_hist, full_ind, months, key=f"{symbol}_{p_name}")
 
     # 3) 재무제표 탭
     st.subheader("📑 재무제표")
-    stmt_tabs = st.tabs(["손익계산서", "대차대조표"])
-    
-    def process_df(df):
-        # 최신 연월일이 우측으로 오도록 컬럼 순서 반전
-        df = df[df.columns[::-1]]
-        
-        # 한글 매핑 (항목 확장)
-        kor_map = {
-            "Total Revenue": "총 매출",
-            "Operating Revenue": "영업 수익",
-            "Cost Of Revenue": "매출 원가",
-            "Gross Profit": "매출 총이익",
-            "Operating Expense": "영업 비용",
-            "Operating Income": "영업 이익",
-            "Net Income": "당기 순이익",
-            "Net Income Common Stockholders": "당기 순이익(보통주)",
-            "EBITDA": "EBITDA",
-            "EBIT": "EBIT",
-            "Total Assets": "총 자산",
-            "Total Liabilities Net Minority Interest": "총 부채",
-            "Total Equity Gross Minority Interest": "총 자본",
-            "Total Stockholders Equity": "주주 지분",
-            "Retained Earnings": "이익 잉여금",
-            "Common Stock": "보통주",
-            "Cash And Cash Equivalents": "현금 및 현금성 자산",
-            "Inventory": "재고 자산",
-            "Total Current Assets": "유동 자산",
-            "Total Non Current Assets": "비유동 자산",
-            "Total Current Liabilities": "유동 부채",
-            "Total Non Current Liabilities": "비유동 부채",
-            "Long Term Debt": "장기 부채",
-            "Short Term Debt": "단기 부채",
-            "Research And Development": "연구 개발비",
-            "Selling General And Administrative": "판매비 및 관리비"
-        }
-        df.index = [kor_map.get(idx, idx) for idx in df.index]
-        # 단위 변환 및 포맷
-        return df.applymap(lambda x: format_currency(x) if isinstance(x, (int, float)) else x)
-
-    with stmt_tabs[0]:
-        st.write("연간 손익계산서")
-        st.dataframe(process_df(ticker.financials), use_container_width=True)
-        st.write("분기별 손익계산서")
-        st.dataframe(process_df(ticker.quarterly_financials), use_container_width=True)
-
-    with stmt_tabs[1]:
-        st.write("연간 대차대조표")
-        st.dataframe(process_df(ticker.balance_sheet), use_container_width=True)
-        st.write("분기별 대차대조표")
-        st.dataframe(process_df(ticker.quarterly_balance_sheet), use_container_width=True)
+    try:
+        statements = get_financial_view(symbol)
+    except Exception as e:
+        statements = None
+        st.warning(f"재무제표를 불러올 수 없습니다: {e}")
+
+    if statements is not None:
+        stmt_tabs = st.tabs(["손익계산서", "대차대조표", "재무 비율"])
+        with stmt_tabs[0]:
+            st.write("연간 손익계산서")
+            st.dataframe(statements["income"], use_container_width=True)
+            st.write("분기별 손익계산서")
+            st.dataframe(statements["quarterly_income"], use_container_width=True)
+
+        with stmt_tabs[1]:
+            st.write("연간 대차대조표")
+            st.dataframe(statements["balance"], use_container_width=True)
+            st.write("분기별 대차대조표")
+            st.dataframe(statements["quarterly_balance"], use_container_width=True)
+
+        with stmt_tabs[2]:
+            st.write("연간 재무 비율")
+            st.dataframe(statements["ratios"], use_container_width=True)
+            st.write("분기별 재무 비율 (성장률은 전년 동기 대비)")
+            st.dataframe(statements["quarterly_ratios"], use_container_width=True)
 
     # 4) Gemini AI 분석 & 5) 투자 판단 가이드
     st.markdown("---")
     st.subheader("🤖 Gemini AI 심층 분석")
     
     if GEMINI_API_KEY:
+        verdict_slot = st.empty()
+        st.info("💡 AI 정밀 분석 결과")
+        report_slot = st.empty()
+        verdict_shown = []
+
+        def on_chunk(text):
+            # 리포트는 도착하는 대로 그리고, 투자 판단은 '최종 의견' 줄이 완성되면 바로 표시
+            render_ai_report(report_slot, text)
+            if not verdict_shown and '\n' in text:
+                status = parse_verdict(text[:text.rfind('\n')])
+                if status:
+                    render_verdict(verdict_slot, status)
+                    verdict_shown.append(status)
+
         with st.spinner("AI 분석 리포트 생성 중..."):
             try:
-                res_text = get_ai_analysis(info.get('longName'), symbol)
+                context = build_analysis_context(full_hist, statements, info)
+                res_text = get_ai_analysis(info.get('longName'), symbol, context, on_chunk=on_chunk)
                 
-                # 투자 판단 가이드 시각화
-                status = "관망"
-                if "매수 권장" in res_text: status = "매수 권장"
-                elif "주의" in res_text: status = "주의"
-                
-                status_color = "#28a745" if status == "매수 권장" else ("#ffc107" if status == "관망" else "#dc3545")
-                
-                st.markdown(f"""
-                <div style="padding: 20px; border-radius: 10px; background-color: {status_color}; color: white; text-align: center; margin-bottom: 20px;">
-                    <h2 style="margin:0; color: white !important;">투자 판단 가이드: {status}</h2>
-                </div>
-                """, unsafe_allow_html=True)
-                
-                st.info("💡 AI 정밀 분석 결과")
-                st.markdown(f'<div class="ai-report-area">', unsafe_allow_html=True)
-                st.markdown(res_text)
-                st.markdown('</div>', unsafe_allow_html=True)
+                # 투자 판단 가이드 시각화 (최종 의견 줄을 못 찾으면 본문 전체에서 판단)
+                status = parse_verdict(res_text)
+                if not status:
+                    status = "관망"
+                    if "매수 권장" in res_text: status = "매수 권장"
+                    elif "주의" in res_text: status = "주의"
+                render_verdict(verdict_slot, status)
+                render_ai_report(report_slot, res_text)
             except Exception as e:
                 st.warning("AI 분석 서버와 통신이 원활하지 않아 간이 분석 리포트를 제공합니다.")
                 # 폴백 분석 리포트
@@ -721,9 +937,361 @@ def render_analysis_screen(symbol):
                 - **투자 판단: 관망**
                 - 실시간 데이터 수집은 정상이나, AI 심층 분석 기능은 API 점검 후 재시도해 주시기 바랍니다.
                 """
-                st.markdown(f'<div class="ai-report-area">', unsafe_allow_html=True)
-                st.markdown(fallback_report)
-                st.markdown('</div>', unsafe_allow_html=True)
+                verdict_slot.empty()
+                render_ai_report(report_slot, fallback_report)
+
+def render_ai_report(slot, text):
+    slot.markdown(f'<div class="ai-report-area">\n\n{textwrap.dedent(text)}\n\n</div>', unsafe_allow_html=True)
+
+def render_verdict(slot, status):
+    status_color = "#28a745" if status == "매수 권장" else ("#ffc107" if status == "관망" else "#dc3545")
+    slot.markdown(f"""
+    <div style="padding: 20px; border-radius: 10px; background-color: {status_color}; color: white; text-align: center; margin-bottom: 20px;">
+        <h2 style="margin:0; color: white !important;">투자 판단 가이드: {status}</h2>
+    </div>
+    """, unsafe_allow_html=True)
+
+@traced(cached=True)
+def get_screener_snapshot():
+    """코스피/코스닥 전 종목의 시세·밸류에이션·수익률 스냅샷. 하루마다 백그라운드에서 갱신됩니다."""
+    return get_swr_cache().get(("screener_snapshot",), as_miss(load_snapshot), ttl=86400)
+
+@traced()
+def render_screener_screen():
+    st.button("🔙 메인 화면으로 돌아가기", on_click=go_to, args=("main",))
+    st.title("📊 전체 종목 스크리너")
+
+    with st.spinner("전 종목 스냅샷을 불러오는 중... (하루 한 번 생성)"):
+        try:
+            snapshot = get_screener_snapshot()
+        except Exception as e:
+            st.error(f"전 종목 데이터를 불러올 수 없습니다: {e}")
+            return
+    render_screener_results(snapshot)
+
+@traced_fragment
+@traced()
+def render_screener_results(snapshot):
+    """필터와 결과 표. 조건을 바꾸거나 행을 고르면 스냅샷을 다시 읽지 않고 이 영역만 다시 실행됩니다."""
+    # 시가총액 구간 (원)
+    cap_bands = {
+        "전체": (None, None),
+        "1천억 미만": (None, 1e11),
+        "1천억 ~ 1조": (1e11, 1e12),
+        "1조 ~ 10조": (1e12, 1e13),
+        "10조 이상": (1e13, None),
+    }
+    sort_options = {"시가총액": "market_cap", "PER": "per", "1년 수익률": "return_1y", "변동성": "volatility", "등락률": "change_pct"}
+
+    f1, f2, f3 = st.columns(3)
+    markets = f1.multiselect("시장", ["KOSPI", "KOSDAQ"], default=["KOSPI", "KOSDAQ"])
+    cap_band = f2.selectbox("시가총액", list(cap_bands.keys()))
+    sort_label = f3.selectbox("정렬 기준", list(sort_options.keys()))
+    f4, f5, f6 = st.columns(3)
+    per_max = f4.number_input("PER 최대 (0 = 제한 없음)", min_value=0.0, value=0.0, step=1.0)
+    return_min = f5.number_input("1년 수익률 최소 (%)", value=-100.0, step=5.0)
+    vol_max = f6.number_input("연 변동성 최대 (%) (0 = 제한 없음)", min_value=0.0, value=0.0, step=5.0)
+    ascending = st.toggle("오름차순 정렬", value=sort_label == "PER")
+
+    cap_min, cap_max = cap_bands[cap_band]
+    started = datetime.now()
+    result = screen(
+        snapshot,
+        per_min=0 if per_max else None,
+        per_max=per_max or None,
+        cap_min=cap_min,
+        cap_max=cap_max,
+        return_min=return_min / 100 if return_min > -100 else None,
+        volatility_max=vol_max / 100 if vol_max else None,
+        markets=markets,
+        sort_by=sort_options[sort_label],
+        ascending=ascending,
+    )
+    elapsed_ms = (datetime.now() - started).total_seconds() * 1000
+    st.caption(f"전체 {len(snapshot):,}종목 중 {len(result):,}종목 · 조회 {elapsed_ms:.1f}ms")
+
+    view = pd.DataFrame({
+        "종목명": result['name'],
+        "티커": result['symbol'],
+        "시장": result['market'],
+        "현재가": result['price'],
+        "등락률(%)": result['change_pct'],
+        "시가총액(억)": result['market_cap'] / 1e8,
+        "PER": result['per'],
+        "ROE(%)": result['roe'],
+        "1년 수익률(%)": result['return_1y'] * 100,
+        "연 변동성(%)": result['volatility'] * 100,
+    })
+    event = st.dataframe(
+        view.head(500),
+        use_container_width=True,
+        hide_index=True,
+        on_select="rerun",
+        selection_mode="single-row",
+        column_config={
+            "현재가": st.column_config.NumberColumn(format="%,.0f"),
+            "시가총액(억)": st.column_config.NumberColumn(format="%,.0f"),
+            "등락률(%)": st.column_config.NumberColumn(format="%.2f"),
+            "PER": st.column_config.NumberColumn(format="%.2f"),
+            "ROE(%)": st.column_config.NumberColumn(format="%.2f"),
+            "1년 수익률(%)": st.column_config.NumberColumn(format="%.1f"),
+            "연 변동성(%)": st.column_config.NumberColumn(format="%.1f"),
+        },
+    )
+    if event.selection.rows:
+        picked = view.iloc[event.selection.rows[0]]
+        if st.button(f"{picked['종목명']} 상세 분석"):
+            go_to("analysis", picked['티커'])
+            st.rerun(scope="app")
+
+@traced(cache=get_data_cache().memoize(ttl=3600)) # 1시간 캐싱
+def get_comparison_prices(symbols, period):
+    """비교할 종목들의 종가를 묶음 다운로드 한 번으로 받아 공통 달력에 맞춥니다."""
+    return align_calendar(download_closes(list(symbols), period=period))
+
+def resolve_symbol(query):
+    """종목명/6자리 코드/티커 입력을 실제 시장 티커로 바꿉니다. (네트워크 조회 없음)"""
+    symbol = get_symbol_index().resolve(query) or query
+    # 종목표에 없는 숫자 티커 처리 (예: 005930)
+    if symbol.isdigit() and len(symbol) == 6:
+        symbol += ".KS"
+    return symbol
+
+@traced()
+def render_compare_screen():
+    st.button("🔙 메인 화면으로 돌아가기", on_click=go_to, args=("main",))
+    st.title("📈 여러 종목 비교")
+
+    recommendations = get_dynamic_recommendations()
+    c1, c2, c3 = st.columns(3)
+    with_indices = c1.checkbox("주요 지수", value=True)
+    with_recs = c2.checkbox(f"오늘의 추천 종목 ({len(recommendations)}개)", value=bool(recommendations), disabled=not recommendations)
+    period_label = c3.selectbox("기간", list(COMPARE_PERIODS.keys()), index=1)
+    query = st.text_input("직접 추가 (종목명, 6자리 코드, 티커를 쉼표로 구분)", placeholder="삼성전자, 000660, NVDA")
+
+    # {티커: 표시 이름}
+    labels = {}
+    if with_indices:
+        labels.update({sym: name for name, sym in MARKET_INDICES.items()})
+    if with_recs:
+        labels.update({rec['symbol']: rec['name'] for rec in recommendations})
+    for q in filter(None, (q.strip() for q in query.split(','))):
+        sym = resolve_symbol(q)
+        labels.setdefault(sym, get_symbol_index().name_of(sym) or q)
+
+    if len(labels) > COMPARE_MAX_SYMBOLS:
+        st.warning(f"한 번에 {COMPARE_MAX_SYMBOLS}개 종목까지 비교할 수 있어 앞쪽 {COMPARE_MAX_SYMBOLS}개만 표시합니다.")
+    symbols = list(labels)[:COMPARE_MAX_SYMBOLS]
+    if len(symbols) < 2:
+        st.info("비교할 종목을 두 개 이상 선택해 주세요.")
+        return
+
+    with st.spinner(f"{len(symbols)}개 종목 시세를 한 번에 받는 중..."):
+        try:
+            close = get_comparison_prices(tuple(symbols), COMPARE_PERIODS[period_label])
+        except Exception as e:
+            st.error(f"시세를 불러올 수 없습니다: {e}")
+            return
+
+    missing = [labels[sym] for sym in symbols if sym not in close.columns or close[sym].isna().all()]
+    if missing:
+        st.caption(f"시세를 받지 못한 종목: {', '.join(missing)}")
+    close = close.dropna(axis=1, how='all')
+    if close.shape[1] < 2:
+        st.warning("시세가 있는 종목이 두 개 이상이어야 비교할 수 있습니다.")
+        return
+
+    # 이름이 겹치면 티커를 붙여 구분
+    names = list(labels.values())
+    display = {sym: name if names.count(name) == 1 else f"{name} ({sym})" for sym, name in labels.items()}
+    render_comparison(close.rename(columns=display))
+
+@traced_fragment
+@traced()
+def render_comparison(close):
+    """비교 결과. 기준 종목이나 이동 구간을 바꾸면 시세를 다시 받지 않고 이 영역만 다시 계산합니다."""
+    r1, r2 = st.columns(2)
+    reference = r1.selectbox("상관계수 기준 종목", list(close.columns))
+    window = r2.select_slider("이동 상관계수 구간 (거래일)", options=[20, 60, 120], value=60)
+    view = build_comparison(close, reference, window)
+
+    tabs = st.tabs(["수익률 추이", "상관계수", "이동 상관계수", "공분산"])
+    with tabs[0]:
+        draw_comparison_lines(view["normalized"], "기준화 가격 (시작일 = 100)", "기준화 가격")
+        summary = view["summary"]
+        st.dataframe(pd.DataFrame({
+            "기간 수익률(%)": summary['return'] * 100,
+            "연 변동성(%)": summary['volatility'] * 100,
+            "거래일": summary['days'],
+        }).sort_values("기간 수익률(%)", ascending=False), use_container_width=True, column_config={
+            "기간 수익률(%)": st.column_config.NumberColumn(format="%.1f"),
+            "연 변동성(%)": st.column_config.NumberColumn(format="%.1f"),
+        })
+    with tabs[1]:
+        draw_correlation_heatmap(view["correlation"])
+    with tabs[2]:
+        draw_comparison_lines(view["rolling_correlation"], f"{view['reference']} 대비 {window}일 이동 상관계수", "상관계수")
+    with tabs[3]:
+        st.caption("일간 로그수익률의 연율화 공분산 (두 종목이 모두 거래된 날 기준)")
+        st.dataframe(view["covariance"].round(4), use_container_width=True)
+
+@traced()
+def draw_comparison_lines(df, title, yaxis_title):
+    # 선이 많으면 점 수가 금방 늘어나므로 전체 점 수 기준으로 WebGL 사용
+    scatter = go.Scattergl if df.size > SCATTERGL_THRESHOLD else go.Scatter
+    fig = go.Figure([scatter(x=df.index, y=df[col], mode='lines', name=str(col)) for col in df.columns])
+    fig.update_layout(
+        title=title,
+        yaxis_title=yaxis_title,
+        xaxis=dict(tickformat='%Y-%m-%d', showgrid=True, gridcolor='#eeeeee'),
+        yaxis=dict(showgrid=True, gridcolor='#eeeeee'),
+        hovermode="x unified" if len(df.columns) <= 10 else "closest",
+        margin=dict(l=20, r=20, t=40, b=20),
+        height=500,
+        plot_bgcolor='white',
+        paper_bgcolor='white'
+    )
+    with trace_span("plotly_chart") as s:
+        st.plotly_chart(fig, use_container_width=True)
+        s.size = figure_size(fig)
+
+@traced()
+def draw_correlation_heatmap(corr):
+    fig = go.Figure(go.Heatmap(
+        z=corr.to_numpy(), x=list(corr.columns), y=list(corr.index),
+        zmin=-1, zmax=1, colorscale="RdBu_r",
+        hovertemplate="%{y} / %{x}: %{z:.2f}<extra></extra>",
+    ))
+    fig.update_layout(
+        title="일간 수익률 상관계수",
+        yaxis=dict(autorange="reversed"),
+        margin=dict(l=20, r=20, t=40, b=20),
+        height=max(400, 18 * len(corr) + 150),
+        plot_bgcolor='white',
+        paper_bgcolor='white'
+    )
+    with trace_span("plotly_chart") as s:
+        st.plotly_chart(fig, use_container_width=True)
+        s.size = figure_size(fig)
+
+@traced(cache=get_data_cache().memoize(ttl=3600)) # 1시간 캐싱
+def get_backtest_prices(symbols, start):
+    """추천 이력 종목과 벤치마크의 종가. 일봉 저장소에 있는 종목은 그대로 쓰고 나머지만 묶음으로 받습니다."""
+    return load_closes(list(symbols), start, store=get_market_store())
+
+@traced()
+def render_backtest_screen():
+    st.button("🔙 메인 화면으로 돌아가기", on_click=go_to, args=("main",))
+    st.title("🧪 추천 종목 성과 백테스트")
+    st.caption("기록된 추천 목록마다 다음 거래일 종가에 편입해 다음 추천 목록이 편입될 때까지 보유했다고 가정합니다.")
+
+    history = load_recommendation_history()
+    if history.empty:
+        st.info("아직 기록된 추천 이력이 없습니다. 추천 목록이 새로 만들어질 때마다 자동으로 기록됩니다.")
+        return
+
+    symbols = tuple(dict.fromkeys([*history['symbol'], *BENCHMARKS.values()]))
+    start = (history['timestamp'].min() - timedelta(days=7)).strftime('%Y-%m-%d')
+    with st.spinner(f"{len(symbols)}개 종목 일봉을 불러오는 중..."):
+        try:
+            close = get_backtest_prices(symbols, start)
+        except Exception as e:
+            st.error(f"시세를 불러올 수 없습니다: {e}")
+            return
+    render_backtest_results(history, close)
+
+@traced_fragment
+@traced()
+def render_backtest_results(history, close):
+    """백테스트 결과. 가중 방식을 바꾸면 시세를 다시 읽지 않고 이 영역만 다시 계산합니다."""
+    weighting = st.radio("편입 비중", ["동일 가중", "시가총액 가중"], horizontal=True)
+    market_caps = None
+    if weighting == "시가총액 가중":
+        # 현재 시가총액을 편입일 주가 비율로 되돌려 그 시점 시가총액으로 추정
+        with st.spinner("시가총액을 조회하는 중..."):
+            quotes = dict(iter_combined_stock_info(list(dict.fromkeys(history['symbol']))))
+        market_caps = pd.Series({sym: (info or {}).get('marketCap') for sym, info in quotes.items()}, dtype=float)
+
+    result = run_backtest(history, close, "cap" if market_caps is not None else "equal", market_caps)
+    if result is None:
+        st.info("아직 편입일(추천 다음 거래일)이 지난 추천 목록이 없습니다.")
+        return
+
+    m1, m2, m3, m4 = st.columns(4)
+    m1.metric("추천 목록 수", f"{result['snapshots']:,}")
+    m2.metric("편입 종목 수", f"{result['symbols']:,}")
+    m3.metric("누적 수익률", f"{result['performance']['total_return'].iloc[0] * 100:.1f}%")
+    m4.metric("벤치마크 대비 적중률", f"{result['hit_rate'] * 100:.0f}%" if pd.notna(result['hit_rate']) else "N/A")
+
+    draw_comparison_lines(result["equity"], "누적 수익 (시작일 = 1)", "누적 수익")
+    draw_comparison_lines(result["drawdown"] * 100, "고점 대비 낙폭 (%)", "낙폭(%)")
+
+    perf = result["performance"]
+    st.dataframe(pd.DataFrame({
+        "누적 수익률(%)": perf['total_return'] * 100,
+        "연 환산 수익률(%)": perf['annual_return'] * 100,
+        "연 변동성(%)": perf['volatility'] * 100,
+        "최대 낙폭(%)": perf['max_drawdown'] * 100,
+    }).round(2), use_container_width=True)
+
+    with st.expander("추천별 보유 구간 수익률"):
+        trades = result["trades"]
+        st.dataframe(pd.DataFrame({
+            "추천 시각": trades['snapshot'],
+            "편입일": trades['entry_date'].dt.strftime('%Y-%m-%d'),
+            "청산일": trades['exit_date'].dt.strftime('%Y-%m-%d'),
+            "종목명": trades['name'],
+            "티커": trades['symbol'],
+            "수익률(%)": trades['return'] * 100,
+            "벤치마크": trades['benchmark'],
+            "벤치마크 수익률(%)": trades['benchmark_return'] * 100,
+            "적중": trades['hit'],
+        }).sort_values("추천 시각", ascending=False), use_container_width=True, hide_index=True, column_config={
+            "수익률(%)": st.column_config.NumberColumn(format="%.2f"),
+            "벤치마크 수익률(%)": st.column_config.NumberColumn(format="%.2f"),
+        })
+
+def render_trace_panel(run):
+    """이번 실행의 구간별 소요 시간/캐시 적중/결과 크기를 사이드바에 보여주고 JSON·Prometheus로 내보냅니다."""
+    data = run.to_dict()
+    with st.sidebar:
+        st.header("⏱️ 실행 계측")
+        st.caption(f"실행 #{data['run_id']} · {data['label']} · 전체 {data['elapsed_ms']:,.0f}ms")
+        spans = pd.DataFrame(data['spans'])
+        if spans.empty:
+            st.write("계측된 구간이 없습니다.")
+        else:
+            summary = spans.groupby('name').agg(호출=('name', 'size'), 합계ms=('duration_ms', 'sum'),
+                                                 미스=('cache', lambda c: (c == 'miss').sum()))
+            st.write("구간별 합계")
+            st.dataframe(summary.sort_values('합계ms', ascending=False).round(1), use_container_width=True)
+            st.write("호출 순서")
+            st.dataframe(pd.DataFrame({
+                "구간": ["· " * d + n for d, n in zip(spans['depth'], spans['name'])],
+                "시작ms": spans['start_ms'],
+                "소요ms": spans['duration_ms'],
+                "캐시": spans['cache'].fillna(''),
+                "크기KB": (spans['size'].astype(float) / 1024).round(1),
+                "스레드": spans['thread'],
+            }), use_container_width=True, hide_index=True)
+        st.download_button("JSON 내보내기", tracing.run_to_json(run), file_name=f"trace_{data['run_id']}.json", mime="application/json")
+        cache_stats = get_data_cache().stats()
+        lookups = cache_stats['hits'] + cache_stats['misses']
+        st.caption(f"데이터 캐시: {cache_stats['entries']}개 · {cache_stats['bytes'] / 2 ** 20:,.1f} / {cache_stats['max_bytes'] / 2 ** 20:,.0f}MB · "
+                   f"적중률 {cache_stats['hits'] / lookups if lookups else 0:.0%} · 퇴출 {cache_stats['evictions']}")
+        reports = get_report_store().stats()
+        st.caption(f"AI 리포트 저장소: {reports['entries']}개 · {reports['bytes'] / 2 ** 20:,.1f} / {reports['max_bytes'] / 2 ** 20:,.0f}MB · "
+                   f"적중 {reports['hits']} · 생성 {reports['writes']} · 퇴출 {reports['evictions']}")
+        poll = get_quote_poller().stats
+        if poll["polls"]:
+            st.caption(f"실시간 시세: 폴링 {poll['polls']:,}회 · 종목 {poll['symbols']}개 · 평균 {poll['seconds'] / poll['polls'] * 1e3:,.0f}ms")
+        st.download_button("Prometheus 내보내기", tracing.registry.prometheus_text() + get_data_cache().prometheus_text(),
+                           file_name="metrics.prom", mime="text/plain")
+        with st.expander("최근 실행"):
+            st.dataframe(pd.DataFrame([
+                {"실행": r.id, "화면": r.label, "시각": datetime.fromtimestamp(r.started_at).strftime('%H:%M:%S'), "구간 수": len(r.spans)}
+                for r in reversed(tracing.registry.runs)
+            ]), use_container_width=True, hide_index=True)
 
 # --- 메인 실행 로직 ---
 
@@ -732,35 +1300,15 @@ if 'current_page' not in st.session_state:
 
 if st.session_state.current_page == "main":
     render_main_screen()
+elif st.session_state.current_page == "screener":
+    render_screener_screen()
+elif st.session_state.current_page == "compare":
+    render_compare_screen()
+elif st.session_state.current_page == "backtest":
+    render_backtest_screen()
 elif st.session_state.current_page == "analysis":
-    input_sym = st.session_state.search_symbol.strip()
-    
-    # 1. KRX 매핑 시도
-    krx_mapping = load_krx_symbols()
-    target_sym = krx_mapping.get(input_sym, krx_mapping.get(input_sym.lower(), input_sym))
-    
-    # 2. 숫자로만 된 티커 처리 (예: 005930)
-    if target_sym.isdigit() and len(target_sym) == 6:
-        # 국내 주식 코드로 판단하여 .KS 추가 (KRX 매핑에 없을 경우 대비)
-        target_sym += ".KS"
-        
-    # 3. 데이터가 있는지 확인하고, .KS로 안 나올 경우 .KQ 시도 (보정 로직)
-    def validate_ticker(symbol):
-        ticker = yf.Ticker(symbol)
-        try:
-            # 실시간 가격이 있으면 유효한 티커로 간주
-            if ticker.info.get('currentPrice') or ticker.info.get('regularMarketPrice'):
-                return symbol
-        except:
-            pass
-        return None
-
-    # 국내 주식인데 정보가 안 나오면 마켓 접미사 교체 시도 (.KS <-> .KQ)
-    fixed_sym = target_sym
-    if target_sym.endswith(".KS") or target_sym.endswith(".KQ"):
-        if not validate_ticker(target_sym):
-            alt_sym = target_sym.replace(".KS", ".KQ") if ".KS" in target_sym else target_sym.replace(".KQ", ".KS")
-            if validate_ticker(alt_sym):
-                fixed_sym = alt_sym
+    # KRX 종목표에서 이름/코드를 실제 시장 티커로 변환
+    render_analysis_screen(resolve_symbol(st.session_state.search_symbol.strip()))
 
-    render_analysis_screen(fixed_sym)
+if trace_run.detail:
+    render_trace_panel(trace_run)
@@ -0,0 +1,150 @@
+"""
+추천 종목 이력 백테스트.
+
+기록된 추천 목록(스냅샷)마다 다음 거래일 종가에 편입해 다음 스냅샷이 편입될 때까지 보유(매수 후 보유)한 것으로 보고,
+포트폴리오 수익률, 낙폭, 벤치마크(코스피 ^KS11, S&P 500 ^GSPC) 대비 적중률을 계산합니다.
+날짜별 반복 없이 (스냅샷 x 종목), (날짜 x 종목) 배열 연산으로 계산하므로 수개월치 스냅샷, 수백 종목도 바로 계산됩니다.
+"""
+import numpy as np
+import pandas as pd
+
+TRADING_DAYS = 252
+BENCHMARKS = {"코스피": "^KS11", "S&P 500": "^GSPC"}
+
+def benchmark_of(symbols):
+    """국내 종목(.KS/.KQ)은 코스피, 그 밖의 종목은 S&P 500과 비교합니다."""
+    symbols = pd.Index(symbols).astype(str)
+    return np.where(symbols.str.endswith(('.KS', '.KQ')), BENCHMARKS["코스피"], BENCHMARKS["S&P 500"])
+
+def pick_matrix(history, calendar, symbols):
+    """
+    스냅샷별 편입일 위치(entries)와 편입 여부 행렬(picks: 스냅샷 x 종목)을 만듭니다.
+    편입일은 스냅샷 날짜 다음 거래일이고, 같은 날 편입되는 스냅샷은 마지막 것만 남깁니다.
+    """
+    dates = history['timestamp'].dt.normalize().to_numpy()
+    entry = np.searchsorted(calendar.to_numpy(), dates, side='right')
+    keep = entry < len(calendar)
+    entry, rows = entry[keep], history[keep]
+    snapshot_ts = rows['timestamp'].to_numpy()
+
+    # 편입일별 마지막 스냅샷만 사용
+    last_ts = pd.Series(snapshot_ts).groupby(entry).transform('max').to_numpy()
+    entry, rows = entry[snapshot_ts == last_ts], rows[snapshot_ts == last_ts]
+    entries, k = np.unique(entry, return_inverse=True)
+    picks = np.zeros((len(entries), len(symbols)), dtype=bool)
+    col = pd.Index(symbols).get_indexer(rows['symbol'])
+    picks[k[col >= 0], col[col >= 0]] = True
+    snapshots = pd.Series(rows['timestamp'].to_numpy()).groupby(k).max().to_numpy()
+    return entries, picks, snapshots
+
+def entry_weights(picks, entry_prices, weighting="equal", market_caps=None, last_prices=None):
+    """
+    스냅샷별 편입 비중. equal은 동일 비중, cap은 현재 시가총액을 편입일 주가 비율로 되돌린 추정 시가총액 비중입니다.
+    편입일 가격이 없는 종목은 빼고, 시가총액을 모르는 종목만 남은 스냅샷은 동일 비중으로 둡니다.
+    """
+    valid = picks & ~np.isnan(entry_prices)
+    equal = valid / np.maximum(valid.sum(axis=1, keepdims=True), 1)
+    if weighting != "cap" or market_caps is None:
+        return equal
+    with np.errstate(invalid='ignore', divide='ignore'):
+        caps = np.where(valid, market_caps[None, :] * entry_prices / last_prices[None, :], 0.0)
+    caps = np.nan_to_num(caps, nan=0.0, posinf=0.0)
+    total = caps.sum(axis=1, keepdims=True)
+    return np.where(total > 0, caps / np.where(total > 0, total, 1), equal)
+
+def portfolio_returns(prices, entries, weights):
+    """
+    날짜별 포트폴리오 수익률. 날짜 d에는 d보다 앞서 편입된 마지막 스냅샷을 보유하며,
+    편입 후 비중은 가격 변화에 따라 움직입니다. (첫 편입 전 날짜는 NaN)
+    """
+    days = np.arange(1, len(prices))
+    active = np.searchsorted(entries, days, side='left') - 1
+    returns = np.full(len(prices), np.nan)
+    on = active >= 0
+    d, k = days[on], active[on]
+    w = weights[k]
+    base = prices[entries[k]]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        today = np.nansum(w * prices[d] / base, axis=1)
+        yesterday = np.nansum(w * prices[d - 1] / base, axis=1)
+        returns[d] = np.where(yesterday > 0, today / yesterday - 1, 0.0)
+    return returns
+
+def performance_table(equity):
+    """equity(첫 날 = 1) 열마다 누적/연율 수익률, 연 변동성, 최대 낙폭을 계산합니다."""
+    values = equity.to_numpy(dtype=float)
+    daily = values[1:] / values[:-1] - 1
+    total = values[-1] / values[0] - 1
+    years = max(len(values) - 1, 1) / TRADING_DAYS
+    drawdown = values / np.fmax.accumulate(values, axis=0) - 1
+    return pd.DataFrame({
+        'total_return': total,
+        'annual_return': (1 + total) ** (1 / years) - 1,
+        'volatility': np.nanstd(daily, axis=0, ddof=1) * np.sqrt(TRADING_DAYS) if len(daily) > 1 else np.nan,
+        'max_drawdown': np.nanmin(drawdown, axis=0),
+    }, index=equity.columns)
+
+def run_backtest(history, close, weighting="equal", market_caps=None):
+    """
+    history: load_recommendation_history()의 (timestamp, symbol, name) 행
+    close: 추천 종목과 벤치마크 티커의 (날짜 x 티커) 종가 표
+    market_caps: 종목별 현재 시가총액 Series (weighting="cap"일 때)
+    결과 표들을 dict로 돌려주고, 편입할 수 있는 스냅샷이 없으면 None을 돌려줍니다.
+    """
+    close = close.sort_index().ffill() # 상장폐지/거래정지 종목은 마지막 가격으로 유지
+    symbols = [s for s in dict.fromkeys(history['symbol']) if s in close.columns and s not in BENCHMARKS.values()]
+    entries, picks, snapshots = pick_matrix(history, close.index, symbols)
+    if not len(entries):
+        return None
+
+    prices = close[symbols].to_numpy(dtype=float)
+    entry_prices = prices[entries]
+    caps = market_caps.reindex(symbols).to_numpy(dtype=float) if market_caps is not None else None
+    weights = entry_weights(picks, entry_prices, weighting, caps, prices[-1])
+
+    returns = portfolio_returns(prices, entries, weights)
+    start = entries[0]
+    index = close.index[start:]
+    portfolio = np.cumprod(1 + np.nan_to_num(returns[start:]))
+    equity = pd.DataFrame({"추천 포트폴리오": portfolio}, index=index)
+    for name, symbol in BENCHMARKS.items():
+        if symbol in close.columns:
+            bench = close[symbol].to_numpy(dtype=float)[start:]
+            equity[name] = bench / bench[0]
+
+    # 스냅샷별 보유 구간(편입일 ~ 다음 편입일) 수익률과 같은 구간의 벤치마크 수익률 비교
+    exits = np.append(entries[1:], len(prices) - 1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        pick_returns = prices[exits] / entry_prices - 1
+    bench_symbols = benchmark_of(symbols)
+    bench_returns = np.full(pick_returns.shape, np.nan)
+    for symbol in BENCHMARKS.values():
+        if symbol in close.columns:
+            series = close[symbol].to_numpy(dtype=float)
+            bench_returns[:, bench_symbols == symbol] = (series[exits] / series[entries] - 1)[:, None]
+    scored = picks & ~np.isnan(pick_returns) & ~np.isnan(bench_returns) & (exits > entries)[:, None]
+    hits = scored & (pick_returns > bench_returns)
+
+    k, i = np.nonzero(scored)
+    names = history.drop_duplicates('symbol', keep='last').set_index('symbol')['name']
+    trades = pd.DataFrame({
+        "snapshot": snapshots[k],
+        "entry_date": close.index[entries[k]],
+        "exit_date": close.index[exits[k]],
+        "symbol": np.asarray(symbols, dtype=object)[i],
+        "name": names.reindex(np.asarray(symbols, dtype=object)[i]).to_numpy(),
+        "return": pick_returns[k, i],
+        "benchmark": bench_symbols[i],
+        "benchmark_return": bench_returns[k, i],
+        "hit": hits[k, i],
+    })
+    drawdown = equity / equity.cummax() - 1
+    return {
+        "equity": equity,
+        "drawdown": drawdown,
+        "performance": performance_table(equity),
+        "trades": trades,
+        "hit_rate": hits.sum() / scored.sum() if scored.any() else np.nan,
+        "snapshots": len(entries),
+        "symbols": int(picks.any(axis=0).sum()),
+    }
@@ -0,0 +1,164 @@
+"""
+분석 파이프라인 배치 실행기 (야간 작업/캐시 예열용).
+
+    python batch.py 005930.KS 000660 NVDA        # 종목 직접 지정 (종목명, 6자리 코드도 가능)
+    python batch.py --recommendations           # 오늘의 AI 추천 종목
+    python batch.py --kospi200 --workers 4 --no-ai
+    python batch.py --file symbols.txt          # 한 줄에 한 종목, #으로 시작하는 줄은 무시
+
+일봉(MarketDataStore), 재무제표(financials), AI 리포트(ReportStore)를 웹 앱과 같은 디스크 저장소(APP_DATA_DIR)에
+채워 두므로, 웹 앱은 해당 종목을 처음 열 때도 스크래핑이나 Gemini 생성을 기다리지 않습니다.
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from dotenv import load_dotenv
+from ai_reports import (GEMINI_MODEL, open_report_store, save_generated, analysis_prompt, recommendations_prompt,
+                        parse_recommendations, load_saved_recommendations, save_recommendations)
+from financials import load_statements, build_statement_view
+from market_store import MarketDataStore, download_history
+from replay import install as install_replay
+from stock_info import fetch_naver_info, combine_stock_info, build_analysis_context
+from symbol_index import load_symbol_index, fetch_kospi200
+
+HISTORY_MAX_AGE = 3600 # 웹 앱(load_daily_history)과 같은 기준
+
+_model = None
+_store = None
+
+def init_worker():
+    """작업 프로세스마다 환경변수를 읽고 Gemini 모델과 리포트 저장소를 준비합니다."""
+    global _model, _store
+    load_dotenv()
+    install_replay()
+    _store = open_report_store()
+    api_key = os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY")
+    if api_key:
+        import google.generativeai as genai
+        genai.configure(api_key=api_key)
+        _model = genai.GenerativeModel(GEMINI_MODEL)
+
+def generate(prompt, force=False):
+    """저장소에 오늘 같은 프롬프트의 결과가 있으면 그대로 쓰고(force면 무시), 없으면 생성해 저장합니다."""
+    if not force:
+        cached = _store.get(prompt, GEMINI_MODEL)
+        if cached is not None:
+            return cached
+    if _model is None:
+        raise RuntimeError("GEMINI_API_KEY가 설정되지 않았습니다.")
+    return save_generated(_store, prompt, _model.generate_content(prompt).text)
+
+def fetch_yf_info(symbol):
+    import yfinance as yf
+    try:
+        return yf.Ticker(symbol).info
+    except Exception:
+        return None
+
+def fetch_quote_info(symbol):
+    """웹 앱(get_combined_stock_info)과 같은 규칙의 시세 정보. 국내 종목은 네이버 값에 yfinance 회사명과 업종을 더합니다."""
+    return combine_stock_info(symbol, fetch_naver_info, fetch_yf_info)
+
+def warm_symbol(symbol, name=None, with_ai=True, force=False):
+    """한 종목의 일봉, 재무제표, AI 리포트를 디스크 캐시에 채우고 결과 요약을 돌려줍니다."""
+    started = time.perf_counter()
+    result = {"symbol": symbol, "bars": 0, "statements": False, "report": "-", "errors": []}
+    hist, statements = None, None
+
+    try:
+        hist = MarketDataStore().refresh(symbol, lambda **kw: download_history(symbol, **kw), period="5y", max_age=HISTORY_MAX_AGE)
+        result["bars"] = len(hist)
+    except Exception as e:
+        result["errors"].append(f"history: {e}")
+
+    try:
+        statements = load_statements(symbol)
+        result["statements"] = any(not df.empty for df in statements.values())
+    except Exception as e:
+        result["errors"].append(f"statements: {e}")
+
+    if with_ai:
+        try:
+            # 웹 앱과 같은 회사명과 데이터 블록을 넣어야 같은 프롬프트(같은 저장소 키)가 되어 앱이 이 리포트를 그대로 씀
+            info = fetch_quote_info(symbol)
+            view = build_statement_view(statements) if statements is not None else None
+            context = build_analysis_context(hist, view, info)
+            prompt = analysis_prompt(info.get('longName') if info else name or symbol, symbol, context)
+            if not force and _store.get(prompt, GEMINI_MODEL) is not None:
+                result["report"] = "cached"
+            else:
+                generate(prompt, force=True)
+                result["report"] = "generated"
+        except Exception as e:
+            result["report"] = "failed"
+            result["errors"].append(f"ai: {e}")
+
+    result["seconds"] = time.perf_counter() - started
+    return result
+
+def todays_recommendations():
+    """웹 앱과 같은 날짜별 추천 목록을 쓰고, 없으면 새로 만들어 저장합니다."""
+    current_date = datetime.now().strftime("%Y-%m-%d")
+    items = load_saved_recommendations(current_date)
+    if not items:
+        items = parse_recommendations(generate(recommendations_prompt(current_date)))
+        save_recommendations(current_date, items)
+    return [item['symbol'] for item in items]
+
+def collect_symbols(args):
+    """인자로 받은 종목 목록을 KRX 종목표로 실제 티커로 바꾸고 {티커: 종목명}으로 돌려줍니다."""
+    queries = list(args.symbols)
+    if args.file:
+        with open(args.file, encoding='utf-8') as f:
+            queries += [line.strip() for line in f if line.strip() and not line.startswith('#')]
+    if args.kospi200:
+        queries += fetch_kospi200()
+    if args.recommendations:
+        queries += todays_recommendations()
+
+    index = load_symbol_index()
+    symbols = {}
+    for query in queries:
+        symbol = index.resolve(query) or query.strip()
+        # 종목표에 없는 숫자 티커 처리 (웹 앱과 같은 규칙)
+        if symbol.isdigit() and len(symbol) == 6:
+            symbol += ".KS"
+        symbols.setdefault(symbol, index.name_of(symbol))
+    return symbols
+
+def main():
+    parser = argparse.ArgumentParser(description="일봉/재무제표/AI 리포트를 미리 만들어 디스크 캐시에 저장합니다.")
+    parser.add_argument("symbols", nargs="*", help="종목 티커, 6자리 코드 또는 종목명")
+    parser.add_argument("--file", help="종목 목록 파일")
+    parser.add_argument("--kospi200", action="store_true", help="코스피200 편입 종목 전체")
+    parser.add_argument("--recommendations", action="store_true", help="오늘의 AI 추천 종목")
+    parser.add_argument("--workers", type=int, default=4, help="동시에 처리할 프로세스 수 (Gemini 동시 요청 수이기도 함)")
+    parser.add_argument("--no-ai", action="store_true", help="AI 리포트는 만들지 않음")
+    parser.add_argument("--force", action="store_true", help="캐시에 있어도 AI 리포트를 다시 생성")
+    args = parser.parse_args()
+
+    init_worker()
+    symbols = collect_symbols(args)
+    if not symbols:
+        parser.error("처리할 종목이 없습니다.")
+    if not args.no_ai and _model is None:
+        parser.error("GEMINI_API_KEY가 없습니다. (--no-ai로 데이터만 예열할 수 있습니다)")
+
+    print(f"{len(symbols)}개 종목 처리 시작 (프로세스 {args.workers}개)")
+    started = time.perf_counter()
+    failed = 0
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=init_worker) as executor:
+        futures = [executor.submit(warm_symbol, symbol, name, not args.no_ai, args.force) for symbol, name in symbols.items()]
+        for future in as_completed(futures):
+            r = future.result()
+            failed += bool(r["errors"])
+            print(f"{r['symbol']:<12} 일봉 {r['bars']:>5}  재무제표 {'O' if r['statements'] else 'X'}  "
+                  f"리포트 {r['report']:<9} {r['seconds']:6.1f}s  {'; '.join(r['errors'])}")
+    print(f"완료: {len(symbols) - failed}/{len(symbols)} 성공, {time.perf_counter() - started:.1f}s")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+"""
+앱 전체 벤치마크. Streamlit AppTest로 메인 화면과 분석 화면을 화면 없이 실행하며
+단계별 소요 시간, 외부 호출 수(http/yfinance/gemini), 최대 메모리(tracemalloc)를 출력합니다.
+
+    python benchmarks/bench_app.py --record               # 인터넷이 되는 곳에서 실제 응답을 고정 응답으로 저장
+    python benchmarks/bench_app.py                        # 저장된 고정 응답만으로 실행 (네트워크 불필요)
+    python benchmarks/bench_app.py 005930.KS NVDA --json out.json
+
+각 화면은 처음(빈 캐시) 한 번, 이어서 캐시가 찬 상태로 한 번 더 실행합니다.
+고정 응답 위치는 APP_REPLAY_DIR (기본 benchmarks/fixtures/replay) 입니다. 저장소에 들어 있는 기본 고정 응답은
+make_replay_fixtures.py가 실제 서비스 대신 고정 값 대역으로 기록한 것이라, 실제 응답 크기/내용으로 측정하려면 --record로 다시 저장하세요.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+DEFAULT_SYMBOLS = ["005930.KS"]
+
+def run_stage(name, store, page="main", symbol=None, timeout=120):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=timeout)
+    if page != "main":
+        at.session_state["current_page"] = page
+        at.session_state["search_symbol"] = symbol
+
+    calls_before, misses_before = store.snapshot()
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.reset_peak()
+    started = time.perf_counter()
+    at.run()
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1] if tracing else None
+    calls_after, misses_after = store.snapshot()
+
+    return {
+        "stage": name,
+        "seconds": round(elapsed, 3),
+        "calls": dict(calls_after - calls_before),
+        "misses": dict(misses_after - misses_before),
+        "peak_mb": round(peak / 2 ** 20, 1) if peak is not None else None,
+        "exceptions": [e.value for e in at.exception],
+        "errors": [e.value for e in at.error],
+    }
+
+def print_report(results):
+    print(f"{'stage':<28}{'time(s)':>9}{'http':>7}{'yf':>6}{'gemini':>8}{'peak MB':>10}")
+    for r in results:
+        calls = r["calls"]
+        print(f"{r['stage']:<28}{r['seconds']:>9.2f}{calls.get('http', 0):>7}{calls.get('yfinance', 0):>6}"
+              f"{calls.get('gemini', 0):>8}{'-' if r['peak_mb'] is None else r['peak_mb']:>10}")
+        if r["misses"]:
+            print(f"  ! 고정 응답 없음: {r['misses']}  (--record로 다시 저장하세요)")
+        for message in r["exceptions"] + r["errors"]:
+            print(f"  ! {message}")
+
+def main():
+    parser = argparse.ArgumentParser(description="메인/분석 화면 end-to-end 벤치마크")
+    parser.add_argument("symbols", nargs="*", default=DEFAULT_SYMBOLS, help="분석 화면을 열 종목 (기본 005930.KS)")
+    parser.add_argument("--record", action="store_true", help="실제 서비스에 요청해 고정 응답을 저장")
+    parser.add_argument("--json", help="결과를 JSON으로도 저장할 경로")
+    parser.add_argument("--no-tracemalloc", action="store_true", help="메모리 추적을 끄고 시간만 측정 (추적 자체가 실행을 2~3배 느리게 함)")
+    args = parser.parse_args()
+
+    # 앱을 불러오기 전에 설정해야 합니다. 디스크 캐시는 매번 빈 임시 폴더에서 시작
+    os.environ["APP_REPLAY_MODE"] = "record" if args.record else "replay"
+    os.environ["APP_DATA_DIR"] = tempfile.mkdtemp(prefix="bench-app-")
+    os.environ.setdefault("GEMINI_API_KEY", "replay") # 재생 모드에서는 실제로 쓰이지 않음
+
+    import replay
+    store = replay.install()
+
+    if not args.no_tracemalloc:
+        tracemalloc.start()
+    results = []
+    for state in ("cold", "warm"):
+        results.append(run_stage(f"main ({state})", store))
+    for symbol in args.symbols:
+        for state in ("cold", "warm"):
+            results.append(run_stage(f"analysis {symbol} ({state})", store, page="analysis", symbol=symbol))
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+    print_report(results)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+if __name__ == "__main__":
+    main()
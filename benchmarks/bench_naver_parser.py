@@ -0,0 +1,101 @@
+"""
+네이버 종목 페이지 파서 마이크로 벤치마크.
+
+저장된 HTML 고정 페이지로 BeautifulSoup(html.parser) 방식과 lxml XPath 방식을 비교하고, parse_item_page가 돌려주는
+모든 값이 두 방식에서 같은지 확인합니다. 함께 들어 있는 naver_item_005930.html은 실제 페이지 구조를 흉내 낸 합성 페이지이므로,
+실제 페이지로 확인하려면 --record로 받아 두세요.
+    python benchmarks/bench_naver_parser.py                # fixtures/naver_item_*.html 전부
+    python benchmarks/bench_naver_parser.py --record 000660 # 실제 페이지를 받아 고정 페이지로 저장
+"""
+import argparse
+import glob
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup
+from naver_parser import parse_item_page, parse_market_cap
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+def _bs4_ratio(soup, selector):
+    tag = soup.select_one(selector)
+    try:
+        return float(tag.text.replace('배', '').replace(',', '').strip()) if tag else None
+    except ValueError:
+        return None
+
+def _bs4_int(tag):
+    return int(tag.text.replace(',', '').strip()) if tag else 0
+
+def parse_with_bs4(page):
+    """기존 get_naver_finance_info의 파싱 방식에 새로 읽는 값(PBR, 52주 범위, 거래량)을 더한 비교 기준."""
+    soup = BeautifulSoup(page, 'html.parser')
+    price_tag = soup.select_one(".no_today .blind")
+    price = int(price_tag.text.replace(',', '')) if price_tag else 0
+    diff_tag = soup.select_one(".no_exday .blind")
+    diff = int(diff_tag.text.replace(',', '')) if diff_tag else 0
+    ico = soup.select_one(".no_exday em span")
+    if ico and '상승' not in ico.text and '상한' not in ico.text:
+        diff = -diff
+    mkt_cap_tag = soup.select_one("#_market_sum")
+    mkt_cap = parse_market_cap(mkt_cap_tag.text) if mkt_cap_tag else 0
+    high_low = [0, 0]
+    for th in soup.find_all('th'):
+        if th.get_text(strip=True).startswith('52주최고'):
+            td = th.find_next_sibling('td')
+            high_low = ([_bs4_int(em) for em in td.find_all('em', recursive=False)] + [0, 0])[:2] if td else high_low
+            break
+    volume = 0
+    for td in soup.select("table.no_info td"):
+        if any(span.get_text(strip=True) == '거래량' for span in td.find_all('span')):
+            volume = _bs4_int(td.select_one(".blind"))
+            break
+    return {
+        'currentPrice': price, 'priceDiff': diff, 'marketCap': mkt_cap,
+        'trailingPE': _bs4_ratio(soup, "#_per"), 'priceToBook': _bs4_ratio(soup, "#_pbr"),
+        'fiftyTwoWeekHigh': high_low[0], 'fiftyTwoWeekLow': high_low[1], 'volume': volume,
+        'currency': 'KRW', 'source': 'naver',
+    }
+
+def record(code):
+    from http_client import get_client
+    res = get_client().get(f"https://finance.naver.com/item/main.naver?code={code}")
+    res.raise_for_status()
+    path = os.path.join(FIXTURE_DIR, f"naver_item_{code}.html")
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(res.text)
+    print(f"saved {path} ({len(res.text):,} chars)")
+
+def bench(path, number):
+    with open(path, encoding='utf-8') as f:
+        page = f.read()
+
+    old, new = parse_with_bs4(page), parse_item_page(page)
+    mismatched = sorted(k for k in old.keys() | new.keys() if old.get(k) != new.get(k))
+    if mismatched:
+        raise SystemExit(f"{path}: 파싱 결과 불일치 " + ", ".join(f"{k}: {old.get(k)!r} != {new.get(k)!r}" for k in mismatched))
+
+    old_s = min(timeit.repeat(lambda: parse_with_bs4(page), number=number, repeat=5)) / number
+    new_s = min(timeit.repeat(lambda: parse_item_page(page), number=number, repeat=5)) / number
+    print(f"{os.path.basename(path)} ({len(page) / 1024:.0f} KB)")
+    print(f"  bs4 html.parser : {old_s * 1e3:8.2f} ms")
+    print(f"  lxml xpath      : {new_s * 1e3:8.2f} ms  (x{old_s / new_s:.1f})")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("fixtures", nargs="*", help="HTML 고정 페이지 경로")
+    parser.add_argument("--record", metavar="CODE", help="네이버에서 종목 페이지를 받아 fixtures에 저장")
+    parser.add_argument("-n", "--number", type=int, default=20, help="반복 횟수")
+    args = parser.parse_args()
+
+    if args.record:
+        record(args.record)
+        return
+    for path in args.fixtures or sorted(glob.glob(os.path.join(FIXTURE_DIR, "naver_item_*.html"))):
+        bench(path, args.number)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+앱 시작 시간 벤치마크. 매번 새 파이썬 프로세스에서 메인 화면을 처음 실행(콜드 스타트)하고 한 번 더 실행(재실행)해
+다음을 측정합니다.
+  - 첫 실행 / 재실행 전체 시간
+  - 화면 그리기(render_main_screen)가 시작되기까지 걸린 시간 (import, 설정, CSS 등 스크립트 준비)
+  - 메인 화면만 보는 동안 불러온 무거운 모듈
+AppTest 자체의 실행 비용은 빈 스크립트를 같은 방식으로 실행해 측정하고 준비 시간에서 뺍니다.
+
+    python benchmarks/bench_startup.py            # 5회 반복, 중앙값 출력
+    python benchmarks/bench_startup.py -n 10
+
+외부 호출은 bench_app.py와 같은 고정 응답(APP_REPLAY_DIR)으로 재생합니다.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ["yfinance", "google.generativeai", "bs4", "pyarrow", "lxml", "pandas", "plotly"]
+
+def child():
+    """새 프로세스 안에서 한 번 측정하고 결과를 JSON 한 줄로 출력합니다."""
+    started = time.perf_counter()
+    from streamlit.testing.v1 import AppTest
+    sys.path.insert(0, ROOT)
+    import tracing
+    streamlit_import = time.perf_counter() - started
+
+    # AppTest 실행 비용 기준값
+    empty = AppTest.from_string("import streamlit as st\nst.write('ok')")
+    t = time.perf_counter()
+    empty.run()
+    baseline = time.perf_counter() - t
+
+    def run_once():
+        at = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=120)
+        t, wall_start = time.perf_counter(), time.time()
+        at.run()
+        total = time.perf_counter() - t
+        run = tracing.registry.runs[-1]
+        render = [s for s in run.spans if s.name == "render_main_screen"]
+        prelude = run.started_at + render[0].start - wall_start - baseline if render else float('nan')
+        return total, prelude, [e.value for e in at.exception]
+
+    first, first_prelude, errors = run_once()
+    loaded = [m for m in HEAVY_MODULES if m in sys.modules]
+    rerun, rerun_prelude, _ = run_once()
+    print(json.dumps({
+        "streamlit_import": streamlit_import, "baseline": baseline, "first": first, "first_prelude": first_prelude,
+        "rerun": rerun, "rerun_prelude": rerun_prelude, "loaded": loaded, "errors": errors,
+    }))
+
+def main():
+    parser = argparse.ArgumentParser(description="콜드 스타트/재실행 시간 측정")
+    parser.add_argument("-n", type=int, default=5, help="반복 횟수 (매번 새 프로세스)")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        return child()
+
+    env = dict(os.environ)
+    env.setdefault("APP_REPLAY_MODE", "replay")
+    env.setdefault("GEMINI_API_KEY", "replay")
+    results = []
+    for i in range(args.n):
+        # 디스크 캐시는 한 번 채워 둔 폴더를 공유 (첫 회는 고정 응답에서 채움)
+        env.setdefault("APP_DATA_DIR", tempfile.mkdtemp(prefix="bench-startup-"))
+        out = subprocess.run([sys.executable, __file__, "--child"], env=env, capture_output=True, text=True, cwd=ROOT)
+        lines = [line for line in out.stdout.splitlines() if line.startswith("{")]
+        if not lines:
+            raise SystemExit(f"측정 실패:\n{out.stderr[-2000:]}")
+        results.append(json.loads(lines[-1]))
+
+    # 첫 회는 디스크 캐시를 채우므로 2회 이상이면 제외
+    sample = results[1:] if len(results) > 1 else results
+    def median_ms(key):
+        return statistics.median(r[key] for r in sample) * 1e3
+    print(f"프로세스 {len(sample)}회 중앙값")
+    print(f"  streamlit import       : {median_ms('streamlit_import'):8.0f} ms")
+    print(f"  AppTest 기준값 (빈 앱)  : {median_ms('baseline'):8.0f} ms")
+    print(f"  첫 실행 (콜드)          : {median_ms('first'):8.0f} ms  (화면 그리기 시작까지 {median_ms('first_prelude'):.0f} ms)")
+    print(f"  재실행                  : {median_ms('rerun'):8.0f} ms  (화면 그리기 시작까지 {median_ms('rerun_prelude'):.1f} ms)")
+    print(f"  메인 화면에서 불러온 모듈: {', '.join(sample[-1]['loaded'])}")
+    for message in sample[-1]["errors"]:
+        print(f"  ! {message}")
+
+if __name__ == "__main__":
+    main()
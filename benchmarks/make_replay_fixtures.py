@@ -0,0 +1,160 @@
+"""
+bench_app.py / bench_startup.py가 재생할 기본 고정 응답(benchmarks/fixtures/replay)을 만듭니다.
+
+인터넷 없이도 벤치마크를 돌릴 수 있도록, 실제 서비스 대신 항상 같은 값을 돌려주는 대역(yfinance, Gemini, 네이버/KRX 페이지)을
+붙인 채 bench_app.py --record를 실행합니다. 값은 실제 시세가 아니며 호출 수와 처리 시간 측정용입니다.
+실제 응답으로 바꾸려면 인터넷이 되는 곳에서 python benchmarks/bench_app.py --record 를 실행하세요.
+
+    python benchmarks/make_replay_fixtures.py
+"""
+import os
+import shutil
+import sys
+import zlib
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURE_DIR = os.path.join(ROOT, "benchmarks", "fixtures")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+import numpy as np
+import pandas as pd
+import requests
+
+REPORT = """### 1. 🏢 정성적 기업 분석
+- 메모리 반도체 시장 점유율 1위를 유지하고 있습니다.
+
+### 2. 📊 정량적 재무 분석
+- 영업 이익률이 개선되고 있습니다.
+
+### 3. 🏁 종합 투자 의견
+- **최종 의견: 관망**
+- 업황 회복 속도를 확인할 필요가 있습니다.
+"""
+BRIEFING = "### 오늘의 시장 브리핑\n- 주요 지수가 보합권에서 움직였습니다.\n\n**투자 인사이트:** 변동성에 대비한 분할 매수가 유효합니다.\n"
+RECOMMENDATIONS = [
+    ("삼성전자", "005930.KS"), ("SK하이닉스", "000660.KS"), ("에코프로비엠", "247540.KQ"), ("NVIDIA", "NVDA"), ("Apple", "AAPL"),
+]
+LISTINGS = {
+    "stockMkt": [("삼성전자", "005930"), ("SK하이닉스", "000660")],
+    "kosdaqMkt": [("에코프로비엠", "247540")],
+    "konexMkt": [("코넥스종목", "999990")],
+}
+
+def _seed(symbol):
+    # hash()는 프로세스마다 달라지므로 고정된 값을 씀
+    return zlib.crc32(symbol.encode('utf-8'))
+
+def _tz(symbol):
+    return "Asia/Seoul" if symbol.endswith(('.KS', '.KQ')) or symbol in ("^KS11", "^KQ11") else "America/New_York"
+
+def history(symbol, period=None, start=None):
+    """기록일 전 거래일까지의 5년 일봉. (마지막 봉이 장중 봉이 아니어야 재생하는 날과 AI 프롬프트가 같아짐)"""
+    rng = np.random.default_rng(_seed(symbol))
+    end = pd.Timestamp.today().normalize() - pd.offsets.BDay(1)
+    index = pd.bdate_range(end=end, periods=1300, tz=_tz(symbol))
+    close = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.015, len(index))))
+    if symbol.endswith(('.KS', '.KQ')):
+        close = np.round(close * 700)
+    df = pd.DataFrame({
+        "Open": close * 0.995, "High": close * 1.01, "Low": close * 0.99, "Close": close,
+        "Volume": rng.integers(1e5, 1e7, len(index)).astype(float), "Dividends": 0.0, "Stock Splits": 0.0,
+    }, index=index)
+    if start:
+        return df[df.index >= pd.Timestamp(start).tz_localize(df.index.tz)]
+    return df
+
+class FakeTicker:
+    def __init__(self, symbol, *args, **kwargs):
+        self.ticker = symbol
+
+    def history(self, period=None, start=None, **kwargs):
+        return history(self.ticker, period, start)
+
+    @property
+    def info(self):
+        price = float(history(self.ticker)["Close"].iloc[-1])
+        return {"longName": dict((s, n) for n, s in RECOMMENDATIONS).get(self.ticker, self.ticker), "sector": "Technology",
+                "currentPrice": price, "previousClose": price * 0.99, "marketCap": 4e14, "trailingPE": 15.2,
+                "priceToBook": 1.3, "currency": "KRW" if self.ticker.endswith(('.KS', '.KQ')) else "USD"}
+
+    def _statement(self, rows, quarterly):
+        ends = pd.date_range(end=pd.Timestamp.today() - pd.DateOffset(months=2), periods=4, freq="QE" if quarterly else "YE")[::-1]
+        rng = np.random.default_rng(_seed(self.ticker) + quarterly)
+        base = rng.uniform(2e14, 3e14, len(ends)) / (4 if quarterly else 1)
+        return pd.DataFrame([base * ratio for ratio in rows.values()], index=list(rows), columns=ends)
+
+    @property
+    def financials(self):
+        return self._statement({"Total Revenue": 1.0, "Gross Profit": 0.38, "Operating Income": 0.12, "Net Income": 0.09}, False)
+
+    @property
+    def quarterly_financials(self):
+        return self._statement({"Total Revenue": 1.0, "Gross Profit": 0.37, "Operating Income": 0.11, "Net Income": 0.08}, True)
+
+    @property
+    def balance_sheet(self):
+        return self._statement({"Total Assets": 1.6, "Total Liabilities Net Minority Interest": 0.4, "Stockholders Equity": 1.2,
+                                "Current Assets": 0.7, "Current Liabilities": 0.3}, False)
+
+    @property
+    def quarterly_balance_sheet(self):
+        return self._statement({"Total Assets": 6.4, "Total Liabilities Net Minority Interest": 1.6, "Stockholders Equity": 4.8,
+                                "Current Assets": 2.8, "Current Liabilities": 1.2}, True)
+
+def download(tickers, *args, period=None, start=None, **kwargs):
+    tickers = tickers.split() if isinstance(tickers, str) else list(tickers)
+    frames = {t: history(t, period, start) for t in tickers}
+    for df in frames.values():
+        df.index = df.index.tz_localize(None)
+    return pd.concat(frames, axis=1).swaplevel(0, 1, axis=1).sort_index(axis=1)
+
+def _response(url, body, status=200, encoding='utf-8'):
+    res = requests.Response()
+    res.status_code, res.url, res.encoding = status, url, encoding
+    res._content = body.encode(encoding)
+    return res
+
+def fake_request(self, method, url, **kwargs):
+    """네이버 종목 페이지와 KRX 상장법인 목록만 흉내 내고, 나머지 주소는 404로 돌려줍니다."""
+    if "finance.naver.com/item/main.naver" in url:
+        with open(os.path.join(FIXTURE_DIR, "naver_item_005930.html"), encoding='utf-8') as f:
+            return _response(url, f.read())
+    if "kind.krx.co.kr" in url:
+        market = url.split("marketType=")[-1]
+        rows = "".join(f"<tr><td>{name}</td><td>{code}</td></tr>" for name, code in LISTINGS.get(market, []))
+        return _response(url, f"<table><tr><th>회사명</th><th>종목코드</th></tr>{rows}</table>", encoding='cp949')
+    return _response(url, "", status=404)
+
+class _Reply:
+    def __init__(self, text):
+        self.text = text
+
+def fake_generate(self, prompt, stream=False, **kwargs):
+    if "JSON" in prompt:
+        text = str([{"name": n, "symbol": s, "reason": "실적 개선 기대"} for n, s in RECOMMENDATIONS]).replace("'", '"')
+    elif "브리핑" in prompt:
+        text = BRIEFING
+    else:
+        text = REPORT
+    if stream:
+        return iter([_Reply(text[i:i + 40]) for i in range(0, len(text), 40)])
+    return _Reply(text)
+
+def main():
+    import yfinance as yf
+    import google.generativeai as genai
+    # 기록 계층(replay.install)이 감싸기 전에 대역을 붙여 둠
+    yf.Ticker, yf.download = FakeTicker, download
+    genai.GenerativeModel.generate_content = fake_generate
+    requests.Session.request = fake_request
+
+    os.environ.setdefault("GEMINI_API_KEY", "fixture")
+    import replay
+    shutil.rmtree(os.getenv("APP_REPLAY_DIR", replay.DEFAULT_REPLAY_DIR), ignore_errors=True)
+    import bench_app
+    sys.argv = [sys.argv[0], "--record", "--no-tracemalloc"]
+    bench_app.main()
+
+if __name__ == "__main__":
+    main()
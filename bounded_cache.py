@@ -0,0 +1,211 @@
+import functools
+import sys
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from singleflight import SingleFlight
+
+CATEGORY_MAX_RATIO = 0.5 # 고유값이 행 수의 절반 이하인 문자열 열/인덱스만 범주형으로 바꿈
+
+def estimate_size(value):
+    """값이 차지하는 메모리를 바이트 단위로 추정합니다. (DataFrame은 문자열 내용까지 포함)"""
+    if value is None:
+        return 0
+    if isinstance(value, (pd.DataFrame, pd.Series, pd.Index)):
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum() if hasattr(usage, 'sum') else usage)
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value)
+    return sys.getsizeof(value)
+
+def _float32_safe(values):
+    values = values[np.isfinite(values)]
+    if not len(values):
+        return True
+    # 값이 정확히 보존될 때만 (원화 가격, 거래량처럼 정수 값인 열). 소수 값은 표에 오차가 보이므로 그대로 둠
+    with np.errstate(over='ignore', invalid='ignore'):
+        return bool(np.array_equal(values.astype(np.float32), values))
+
+def _is_text(dtype):
+    return dtype == object or isinstance(dtype, pd.StringDtype)
+
+def _compact_labels(labels):
+    if _is_text(labels.dtype) and len(labels) and labels.nunique() <= len(labels) * CATEGORY_MAX_RATIO:
+        return labels.astype('category')
+    return labels
+
+def compact_frame(df):
+    """
+    DataFrame을 작게 만듭니다. 값이 그대로 보존되는 float64 열은 float32로,
+    정수 열은 값이 들어가는 가장 작은 정수형으로, 중복이 많은 문자열 열과 인덱스는 범주형으로 바꿉니다.
+    """
+    columns = {}
+    for name, col in df.items():
+        if col.dtype == np.float64 and _float32_safe(col.to_numpy()):
+            col = col.astype(np.float32)
+        elif col.dtype.kind in 'iu':
+            col = pd.to_numeric(col, downcast='integer' if col.dtype.kind == 'i' else 'unsigned')
+        elif _is_text(col.dtype):
+            col = _compact_labels(col)
+        columns[name] = col
+    out = pd.DataFrame(columns, index=df.index) if columns else df.copy()
+    if not isinstance(out.index, pd.MultiIndex):
+        out.index = _compact_labels(out.index)
+    out.attrs = dict(df.attrs)
+    return out
+
+def compact(value):
+    """캐시에 넣을 값 안의 DataFrame을 compact_frame으로 줄입니다. (dict/list는 안쪽까지)"""
+    if isinstance(value, pd.DataFrame):
+        return compact_frame(value)
+    if isinstance(value, dict):
+        return {k: compact(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [compact(v) for v in value]
+    return value
+
+class _Entry:
+    __slots__ = ("value", "size", "expires_at", "hits")
+
+    def __init__(self, value, size, expires_at):
+        self.value = value
+        self.size = size
+        self.expires_at = expires_at
+        self.hits = 0
+
+class BoundedCache:
+    """
+    전체 크기가 max_bytes를 넘지 않도록 오래 안 쓴(lru) 또는 적게 쓴(lfu) 항목부터 내보내는 메모리 캐시입니다.
+    종목 수가 늘어도 메모리 사용량이 상한 안에 머물고, 적중/미스/퇴출 수를 집계합니다.
+    """
+
+    def __init__(self, max_bytes=256 * 2 ** 20, policy="lru"):
+        if policy not in ("lru", "lfu"):
+            raise ValueError(f"알 수 없는 교체 정책: {policy}")
+        self.max_bytes = max_bytes
+        self.policy = policy
+        self._lock = threading.Lock()
+        self._items = OrderedDict() # 최근에 쓴 항목이 뒤쪽
+        self._bytes = 0
+        self._flight = SingleFlight()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "rejected": 0}
+
+    def lookup(self, key, count=True):
+        """(적중 여부, 값)을 돌려줍니다. None도 정상 값으로 저장될 수 있어 적중 여부를 따로 알려줍니다."""
+        now = time.time()
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is not None and entry.expires_at is not None and now >= entry.expires_at:
+                self._remove(key)
+                self._stats["expirations"] += 1
+                entry = None
+            if entry is None:
+                self._stats["misses"] += count
+                return False, None
+            entry.hits += 1
+            self._items.move_to_end(key)
+            self._stats["hits"] += count
+            return True, entry.value
+
+    def get(self, key, default=None):
+        hit, value = self.lookup(key)
+        return value if hit else default
+
+    def set(self, key, value, ttl=None):
+        """값을 저장합니다. 혼자서 상한을 넘는 값은 저장하지 않습니다."""
+        size = estimate_size(value) + estimate_size(key)
+        with self._lock:
+            if key in self._items:
+                self._remove(key)
+            if size > self.max_bytes:
+                self._stats["rejected"] += 1
+                return
+            self._items[key] = _Entry(value, size, time.time() + ttl if ttl else None)
+            self._bytes += size
+            self._evict()
+
+    def _remove(self, key):
+        self._bytes -= self._items.pop(key).size
+
+    def _evict(self):
+        # 만료된 항목을 먼저 치우고, 그래도 넘치면 정책에 따라 하나씩 내보냄
+        if self._bytes <= self.max_bytes:
+            return
+        now = time.time()
+        for key in [k for k, e in self._items.items() if e.expires_at is not None and now >= e.expires_at]:
+            self._remove(key)
+            self._stats["expirations"] += 1
+        while self._bytes > self.max_bytes:
+            if self.policy == "lru":
+                key = next(iter(self._items))
+            else:
+                # 적중 수가 같으면 앞쪽(오래 안 쓴) 항목이 먼저 선택됨
+                key = min(self._items, key=lambda k: self._items[k].hits)
+            self._remove(key)
+            self._stats["evictions"] += 1
+
+    def clear(self, prefix=None):
+        """전부 비우거나, 키 튜플의 첫 값이 prefix인 항목만 비웁니다."""
+        with self._lock:
+            for key in [k for k in self._items if prefix is None or (isinstance(k, tuple) and k[:1] == (prefix,))]:
+                self._remove(key)
+
+    def memoize(self, ttl=None):
+        """
+        st.cache_data처럼 인자별로 결과를 저장하는 데코레이터입니다.
+        DataFrame은 compact()로 줄여 저장하고, 같은 인자로 동시에 들어온 미스는 한 번만 실행합니다.
+        저장된 DataFrame은 호출자끼리 공유하므로 바꾸지 말아야 합니다. (dict는 얕은 복사본을 돌려줌)
+        """
+        def decorator(fn):
+            namespace = f"{fn.__module__}.{fn.__qualname__}"
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                key = (namespace, args, tuple(sorted(kwargs.items())))
+                hit, value = self.lookup(key)
+                if not hit:
+                    def load():
+                        # 기다리는 동안 다른 호출이 채웠을 수 있음 (같은 미스를 두 번 세지 않음)
+                        hit, value = self.lookup(key, count=False)
+                        if hit:
+                            return value
+                        value = compact(fn(*args, **kwargs))
+                        self.set(key, value, ttl)
+                        return value
+                    value = self._flight.do(key, load)
+                return dict(value) if isinstance(value, dict) else value
+
+            wrapper.clear = lambda: self.clear(namespace)
+            return wrapper
+        return decorator
+
+    def stats(self):
+        with self._lock:
+            return {**self._stats, "entries": len(self._items), "bytes": self._bytes, "max_bytes": self.max_bytes}
+
+    def prometheus_text(self, name="data"):
+        """집계값을 Prometheus text exposition 형식으로 돌려줍니다."""
+        stats = self.stats()
+        metrics = [
+            ("app_cache_requests_total", "counter", "Cache lookups by result.",
+             [(',result="hit"', stats["hits"]), (',result="miss"', stats["misses"])]),
+            ("app_cache_evictions_total", "counter", "Entries removed to stay under the byte budget.", [("", stats["evictions"])]),
+            ("app_cache_expirations_total", "counter", "Entries removed after their TTL.", [("", stats["expirations"])]),
+            ("app_cache_rejected_total", "counter", "Values larger than the whole budget that were not stored.", [("", stats["rejected"])]),
+            ("app_cache_entries", "gauge", "Entries currently stored.", [("", stats["entries"])]),
+            ("app_cache_bytes", "gauge", "Estimated bytes currently stored.", [("", stats["bytes"])]),
+            ("app_cache_max_bytes", "gauge", "Configured byte budget.", [("", stats["max_bytes"])]),
+        ]
+        lines = []
+        for metric, kind, help_text, samples in metrics:
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} {kind}")
+            for extra, value in samples:
+                lines.append(f'{metric}{{cache="{name}"{extra}}} {value:g}')
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+
+MAX_CANDLES = 300 # 이보다 봉이 많으면 주봉/월봉으로 묶어서 전송
+MAX_LINE_POINTS = 500 # 선 차트 최대 점 수 (LTTB)
+SCATTERGL_THRESHOLD = 1000 # 이보다 점이 많으면 WebGL(Scattergl)로 그림
+
+CANDLE_RULES = [(None, 1, "일봉"), ("W-FRI", 5, "주봉"), ("ME", 21, "월봉")]
+
+def lttb_indices(x, y, n_out):
+    """Largest-Triangle-Three-Buckets로 선 모양을 유지하는 n_out개 점의 위치를 고릅니다."""
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    # 처음과 끝 점은 고정, 나머지를 n_out-2개 구간으로 나눔
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    selected = np.empty(n_out, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+    prev = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # 다음 구간의 평균점
+        nxt_lo, nxt_hi = hi, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[nxt_lo:nxt_hi].mean()
+        avg_y = y[nxt_lo:nxt_hi].mean()
+        # 이전 선택점, 다음 구간 평균점과 만드는 삼각형 넓이가 가장 큰 점 선택
+        area = np.abs((x[prev] - avg_x) * (y[lo:hi] - y[prev]) - (x[prev] - x[lo:hi]) * (avg_y - y[prev]))
+        prev = lo + int(np.nanargmax(area)) if np.isfinite(area).any() else lo
+        selected[i + 1] = prev
+    return selected
+
+def downsample_line(df, column, max_points=MAX_LINE_POINTS):
+    """DatetimeIndex 표를 column 값 기준 LTTB로 줄입니다. 점이 적으면 그대로 돌려줍니다."""
+    if len(df) <= max_points:
+        return df
+    x = df.index.asi8 if isinstance(df.index, pd.DatetimeIndex) else np.arange(len(df))
+    return df.iloc[lttb_indices(x, df[column].to_numpy(), max_points)]
+
+def choose_candle_rule(n_bars, max_candles=MAX_CANDLES):
+    """봉 수에 맞춰 (리샘플 규칙, 이름)을 고릅니다. 규칙이 None이면 일봉 그대로."""
+    for rule, bars_per_candle, label in CANDLE_RULES:
+        if n_bars / bars_per_candle <= max_candles:
+            return rule, label
+    return CANDLE_RULES[-1][0], CANDLE_RULES[-1][2]
+
+def aggregate_ohlc(hist, rule):
+    """일봉을 주/월 단위 OHLCV로 묶습니다. 각 봉의 날짜는 그 구간의 마지막 거래일입니다."""
+    if rule is None or hist.empty:
+        return hist
+    resampler = hist.resample(rule)
+    out = pd.DataFrame({
+        'Open': resampler['Open'].first(),
+        'High': resampler['High'].max(),
+        'Low': resampler['Low'].min(),
+        'Close': resampler['Close'].last(),
+        'Volume': resampler['Volume'].sum(),
+        'date': hist.index.to_series().resample(rule).last(),
+    }).dropna(subset=['Close'])
+    return out.set_index('date').rename_axis(hist.index.name)
+
+def decimate_candles(hist, max_candles=MAX_CANDLES):
+    """구간 길이에 맞춰 일/주/월봉을 골라 묶고 (묶은 표, 봉 이름)을 돌려줍니다."""
+    rule, label = choose_candle_rule(len(hist), max_candles)
+    return aggregate_ohlc(hist, rule), label
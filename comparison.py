@@ -0,0 +1,115 @@
+"""
+여러 종목 비교: 공통 달력 정렬, 기준화 수익률, 이동 상관계수, 공분산 행렬.
+
+종목 수가 많아도(50개 이상) 화면 조작마다 다시 계산할 수 있도록 종목별 반복 없이 (날짜 x 종목) 배열 연산으로 계산합니다.
+"""
+import numpy as np
+import pandas as pd
+
+TRADING_DAYS = 252
+MAX_FILL_DAYS = 5 # 휴장일 공백은 채우되, 이보다 긴 공백(거래정지 등)은 비워 둠
+
+def align_calendar(close, max_gap=MAX_FILL_DAYS):
+    """
+    시장마다 휴장일이 달라 생긴 빈 날짜를 직전 종가로 채워, 모든 종목 거래일의 합집합인 하나의 달력에 맞춥니다.
+    상장 전 구간은 비워 둡니다. (휴장일에는 수익률 0으로 계산됨)
+    """
+    close = close.sort_index().dropna(how='all')
+    return close.ffill(limit=max_gap)
+
+def normalized_prices(close):
+    """종목별 첫 거래일 종가를 100으로 맞춘 가격 추이를 돌려줍니다."""
+    values = close.to_numpy(dtype=float)
+    valid = ~np.isnan(values)
+    first = values[valid.argmax(axis=0), np.arange(values.shape[1])]
+    return pd.DataFrame(values / first * 100, index=close.index, columns=close.columns)
+
+def log_returns(close):
+    values = close.to_numpy(dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = np.diff(np.log(values), axis=0)
+    return pd.DataFrame(returns, index=close.index[1:], columns=close.columns)
+
+def _pair_sums(x, mask):
+    # 두 종목이 모두 값이 있는 날만 모은 합계들 (행렬곱 한 번에 모든 쌍을 계산)
+    m = mask.astype(float)
+    x0 = np.where(mask, x, 0.0)
+    n = m.T @ m
+    sx = x0.T @ m # [i, j]: j도 값이 있는 날의 i 합계
+    sxx = (x0 * x0).T @ m
+    sxy = x0.T @ x0
+    return n, sx, sxx, sxy
+
+def covariance_matrix(returns, min_periods=20, annualize=True):
+    """
+    종목 쌍마다 둘 다 거래된 날만 써서 공분산과 상관계수 행렬을 계산합니다. (상장일이 달라도 전체 구간을 버리지 않음)
+    공통 거래일이 min_periods보다 적은 쌍은 NaN입니다.
+    """
+    x = returns.to_numpy(dtype=float)
+    mask = ~np.isnan(x)
+    n, sx, sxx, sxy = _pair_sums(x, mask)
+    sy, syy = sx.T, sxx.T
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cov = (sxy - sx * sy / n) / (n - 1)
+        var_x = (sxx - sx * sx / n) / (n - 1)
+        var_y = (syy - sy * sy / n) / (n - 1)
+        corr = cov / np.sqrt(var_x * var_y)
+    too_few = n < min_periods
+    cov[too_few] = np.nan
+    corr[too_few] = np.nan
+    np.fill_diagonal(corr, np.where(np.diag(too_few), np.nan, 1.0))
+    if annualize:
+        cov = cov * TRADING_DAYS
+    columns = returns.columns
+    return pd.DataFrame(cov, index=columns, columns=columns), pd.DataFrame(np.clip(corr, -1, 1), index=columns, columns=columns)
+
+def _rolling_sum(a, window):
+    # 앞쪽 window-1개 행은 그때까지의 합 (min_periods 판단은 호출하는 쪽에서)
+    c = np.cumsum(np.vstack([np.zeros((1, a.shape[1])), a]), axis=0)
+    out = c[1:].copy()
+    out[window:] -= c[1:-window]
+    return out
+
+def rolling_correlation(returns, reference, window=60, min_periods=None):
+    """각 종목과 reference 종목의 window일 이동 상관계수를 누적합으로 한 번에 계산합니다."""
+    min_periods = min_periods or window * 2 // 3
+    x = returns.to_numpy(dtype=float)
+    y = returns[reference].to_numpy(dtype=float)[:, None]
+    mask = ~np.isnan(x) & ~np.isnan(y)
+    x0 = np.where(mask, x, 0.0)
+    y0 = np.where(mask, y, 0.0)
+    n = _rolling_sum(mask.astype(float), window)
+    sx, sy = _rolling_sum(x0, window), _rolling_sum(y0, window)
+    sxx, syy, sxy = _rolling_sum(x0 * x0, window), _rolling_sum(y0 * y0, window), _rolling_sum(x0 * y0, window)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        corr = (n * sxy - sx * sy) / np.sqrt((n * sxx - sx * sx) * (n * syy - sy * sy))
+    corr[~(n >= min_periods)] = np.nan
+    return pd.DataFrame(np.clip(corr, -1, 1), index=returns.index, columns=returns.columns).drop(columns=reference)
+
+def summary_table(close, returns):
+    """종목별 기간 수익률, 연 변동성, 거래일 수를 돌려줍니다."""
+    values = close.to_numpy(dtype=float)
+    valid = ~np.isnan(values)
+    cols = np.arange(values.shape[1])
+    first = values[valid.argmax(axis=0), cols]
+    last = values[len(values) - 1 - valid[::-1].argmax(axis=0), cols]
+    return pd.DataFrame({
+        'return': last / first - 1,
+        'volatility': np.nanstd(returns.to_numpy(dtype=float), axis=0, ddof=1) * np.sqrt(TRADING_DAYS),
+        'days': valid.sum(axis=0),
+    }, index=close.columns)
+
+def build_comparison(close, reference=None, window=60):
+    """정렬된 종가 표에서 비교 화면에 쓰는 표를 모두 만듭니다. 값이 전혀 없는 종목은 빠집니다."""
+    close = close.dropna(axis=1, how='all')
+    returns = log_returns(close)
+    cov, corr = covariance_matrix(returns)
+    reference = reference if reference in close.columns else close.columns[0]
+    return {
+        "normalized": normalized_prices(close),
+        "summary": summary_table(close, returns),
+        "covariance": cov,
+        "correlation": corr,
+        "reference": reference,
+        "rolling_correlation": rolling_correlation(returns, reference, window),
+    }
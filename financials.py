@@ -0,0 +1,165 @@
+import os
+import re
+import time
+import numpy as np
+import pandas as pd
+from storage import data_path, atomic_write
+
+STATEMENT_MAX_AGE = 86400 # 재무제표는 하루 한 번만 새로 받음
+AMOUNT_UNITS = ((1e12, "조"), (1e8, "억"))
+YOY_TOLERANCE = pd.Timedelta(days=20) # 결산일이 해마다 조금씩 다른 회사(52/53주 회계연도)도 전년 동기로 인정
+
+# 저장 이름 -> yfinance Ticker 속성
+STATEMENTS = {
+    "income": "financials",
+    "quarterly_income": "quarterly_financials",
+    "balance": "balance_sheet",
+    "quarterly_balance": "quarterly_balance_sheet",
+}
+
+KOR_LABELS = {
+    "Total Revenue": "총 매출",
+    "Operating Revenue": "영업 수익",
+    "Cost Of Revenue": "매출 원가",
+    "Gross Profit": "매출 총이익",
+    "Operating Expense": "영업 비용",
+    "Operating Income": "영업 이익",
+    "Net Income": "당기 순이익",
+    "Net Income Common Stockholders": "당기 순이익(보통주)",
+    "EBITDA": "EBITDA",
+    "EBIT": "EBIT",
+    "Total Assets": "총 자산",
+    "Total Liabilities Net Minority Interest": "총 부채",
+    "Total Equity Gross Minority Interest": "총 자본",
+    "Total Stockholders Equity": "주주 지분",
+    "Stockholders Equity": "주주 지분",
+    "Retained Earnings": "이익 잉여금",
+    "Common Stock": "보통주",
+    "Cash And Cash Equivalents": "현금 및 현금성 자산",
+    "Inventory": "재고 자산",
+    "Total Current Assets": "유동 자산",
+    "Current Assets": "유동 자산",
+    "Total Non Current Assets": "비유동 자산",
+    "Total Current Liabilities": "유동 부채",
+    "Current Liabilities": "유동 부채",
+    "Total Non Current Liabilities": "비유동 부채",
+    "Long Term Debt": "장기 부채",
+    "Short Term Debt": "단기 부채",
+    "Research And Development": "연구 개발비",
+    "Selling General And Administrative": "판매비 및 관리비"
+}
+
+def _safe_name(symbol):
+    return re.sub(r'[^0-9A-Za-z._-]', '_', symbol)
+
+def _numeric(df):
+    """yfinance 재무제표(행=항목, 열=결산일)를 숫자형으로 맞추고 결산일 오름차순으로 정렬합니다."""
+    if df is None or df.empty:
+        return pd.DataFrame()
+    df = df.apply(pd.to_numeric, errors='coerce')
+    df.columns = pd.to_datetime(df.columns)
+    return df.sort_index(axis=1)
+
+def fetch_statements(symbol):
+    """연간/분기 손익계산서와 대차대조표 네 가지를 받아 옵니다."""
+    import yfinance as yf
+    ticker = yf.Ticker(symbol)
+    return {name: _numeric(getattr(ticker, attr)) for name, attr in STATEMENTS.items()}
+
+def load_statements(symbol, max_age=STATEMENT_MAX_AGE):
+    """디스크에 저장한 재무제표를 읽고, max_age초가 지났으면 다시 받아 저장합니다."""
+    paths = {name: data_path("financials", _safe_name(symbol), f"{name}.parquet") for name in STATEMENTS}
+
+    def read_stored():
+        # Parquet 열 이름은 문자열이어야 하므로 (결산일 x 항목)으로 뒤집어 저장
+        return {name: pd.read_parquet(path).T for name, path in paths.items()}
+
+    fresh = all(os.path.exists(p) and time.time() - os.path.getmtime(p) < max_age for p in paths.values())
+    if fresh:
+        return read_stored()
+    try:
+        statements = fetch_statements(symbol)
+        for name, df in statements.items():
+            atomic_write(paths[name], lambda tmp, df=df: df.T.to_parquet(tmp))
+        return statements
+    except Exception as e:
+        print(f"Financial statements fetch error for {symbol}: {e}")
+        if all(os.path.exists(p) for p in paths.values()):
+            return read_stored()
+        raise
+
+def format_amounts(df):
+    """금액 표 전체를 배열 연산으로 조/억 단위 문자열로 바꿉니다. 값이 없는 칸은 빈 문자열입니다."""
+    values = df.to_numpy(dtype=float)
+    magnitude = np.abs(values)
+    conditions = [magnitude >= scale for scale, _ in AMOUNT_UNITS]
+    scale = np.select(conditions, [scale for scale, _ in AMOUNT_UNITS], 1.0)
+    suffix = np.select(conditions, [unit for _, unit in AMOUNT_UNITS], "")
+    # 실수 문자열 변환은 느려서, 0.1 단위 정수로 반올림한 뒤 정수부/소수부 문자열을 이어 붙임
+    tenths = np.round(np.nan_to_num(magnitude / scale) * 10).astype(np.int64)
+    text = np.char.add(np.char.add((tenths // 10).astype(str), "."), (tenths % 10).astype(str)).astype(object)
+    # 1억 미만 값(주당 값 등)은 드물어서 소수점을 그대로 살려 하나씩 변환
+    small = (scale == 1) & ~np.isnan(values)
+    text[small] = [str(float(v)) for v in magnitude[small]]
+    text = np.char.add(np.where(values < 0, "-", ""), np.char.add(text.astype(str), suffix))
+    text[np.isnan(values)] = ""
+    return pd.DataFrame(text, index=df.index, columns=df.columns)
+
+def _display(df):
+    """항목명을 한글로, 결산일을 'YYYY.MM' 형식으로 바꿉니다. (최신 결산일이 오른쪽)"""
+    return df.set_axis(df.index.map(lambda idx: KOR_LABELS.get(idx, idx)), axis=0) \
+             .set_axis(df.columns.strftime('%Y.%m'), axis=1)
+
+def _row(df, *names):
+    """후보 항목명 중 처음 있는 행을 돌려줍니다. 없으면 NaN 행."""
+    for name in names:
+        if name in df.index:
+            return df.loc[name]
+    return pd.Series(np.nan, index=df.columns)
+
+def yoy_prior(series, tolerance=YOY_TOLERANCE):
+    """
+    각 결산일의 1년 전 결산 값을 결산일 기준으로 찾습니다. (분기가 빠진 표에서도 열 위치가 아니라 날짜로 맞춤)
+    1년 전 ± tolerance 안에 결산이 없으면 NaN입니다.
+    """
+    ordered = series[~series.index.duplicated()].sort_index()
+    idx = ordered.index.get_indexer(series.index - pd.DateOffset(years=1), method='nearest', tolerance=tolerance)
+    return pd.Series(np.where(idx >= 0, ordered.to_numpy(dtype=float)[idx], np.nan), index=series.index)
+
+def ratio_table(income, balance):
+    """손익계산서와 대차대조표로 이익률, 부채/유동 비율, 전년 동기 대비 성장률(%)을 계산합니다."""
+    if income.empty:
+        return pd.DataFrame()
+    balance = balance.reindex(columns=income.columns)
+    revenue = _row(income, "Total Revenue", "Operating Revenue")
+    operating = _row(income, "Operating Income", "EBIT")
+    net = _row(income, "Net Income", "Net Income Common Stockholders")
+    equity = _row(balance, "Total Equity Gross Minority Interest", "Stockholders Equity", "Total Stockholders Equity")
+
+    def growth(series):
+        # 전년 동기와 비교, 적자에서의 변화도 부호가 맞도록 절댓값으로 나눔
+        prior = yoy_prior(series)
+        return (series - prior) / prior.abs() * 100
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratios = pd.DataFrame({
+            "매출 총이익률(%)": _row(income, "Gross Profit") / revenue * 100,
+            "영업 이익률(%)": operating / revenue * 100,
+            "순이익률(%)": net / revenue * 100,
+            "부채 비율(%)": _row(balance, "Total Liabilities Net Minority Interest") / equity * 100,
+            "유동 비율(%)": _row(balance, "Current Assets", "Total Current Assets")
+                          / _row(balance, "Current Liabilities", "Total Current Liabilities") * 100,
+            "매출 성장률(YoY, %)": growth(revenue),
+            "영업이익 성장률(YoY, %)": growth(operating),
+            "순이익 성장률(YoY, %)": growth(net),
+        }).T
+    return ratios.replace([np.inf, -np.inf], np.nan).round(1)
+
+def build_statement_view(statements):
+    """화면에 보여줄 재무제표(한글 항목, 조/억 단위)와 재무 비율 표를 한 번에 만듭니다."""
+    view = {name: _display(format_amounts(df)) if not df.empty else df for name, df in statements.items()}
+    for name, income, balance in (("ratios", "income", "balance"),
+                                  ("quarterly_ratios", "quarterly_income", "quarterly_balance")):
+        ratios = ratio_table(statements[income], statements[balance])
+        view[name] = ratios.set_axis(ratios.columns.strftime('%Y.%m'), axis=1) if not ratios.empty else ratios
+    return view
@@ -0,0 +1,161 @@
+import random
+import threading
+import time
+from urllib.parse import urlparse
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_TIMEOUT = (3.05, 10) # (연결, 읽기) 제한 시간 (초)
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+# 호스트별 (동시 요청 수, 초당 요청 수) 제한 - 차단을 피하기 위해 스크래핑 대상은 보수적으로 설정
+HOST_LIMITS = {
+    "finance.naver.com": (4, 5.0),
+    "polling.finance.naver.com": (2, 2.0),
+    "kind.krx.co.kr": (2, 1.0),
+}
+DEFAULT_HOST_LIMIT = (8, 10.0)
+
+class CircuitOpenError(requests.RequestException):
+    """연속 실패로 호스트 차단기가 열려 있어 요청을 보내지 않았을 때 발생합니다."""
+
+class _HostPolicy:
+    """호스트 하나의 동시성 제한, 토큰 버킷 속도 제한, 회로 차단기 상태입니다."""
+
+    def __init__(self, concurrency, rate, failure_threshold, cooldown):
+        self.slots = threading.BoundedSemaphore(concurrency)
+        self.rate = rate
+        # 버킷 크기가 1보다 작으면 토큰이 1개까지 차지 않아 초당 1회 미만 제한에서 영원히 기다리게 됨
+        self.capacity = max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False # 반열림 상태에서 시험 요청이 진행 중인지
+        self.lock = threading.Lock()
+
+    def acquire_token(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def check_circuit(self, host):
+        """요청을 보내도 되는지 확인하고, 반열림 상태의 시험 요청으로 들여보냈으면 True를 돌려줍니다."""
+        with self.lock:
+            if self.opened_at is None:
+                return False
+            if self.probing or time.monotonic() - self.opened_at < self.cooldown:
+                raise CircuitOpenError(f"Circuit open for {host}")
+            # 쿨다운이 지나면 반열림: 요청 하나만 시험 삼아 보내고, 그 결과가 나올 때까지 나머지는 계속 거절합니다.
+            self.probing = True
+            return True
+
+    def record(self, ok, probe=False):
+        with self.lock:
+            if probe:
+                self.probing = False
+            if ok:
+                self.failures = 0
+                self.opened_at = None
+            elif probe:
+                # 시험 요청이 실패하면 다시 열고 쿨다운을 처음부터 셈
+                self.opened_at = time.monotonic()
+            else:
+                self.failures += 1
+                if self.failures >= self.failure_threshold:
+                    self.opened_at = time.monotonic()
+
+    def end_probe(self):
+        """결과를 기록하지 못하고 끝난 시험 요청(예상 못 한 예외)은 실패로 보고 다시 엽니다. 반열림에 묶이지 않게 합니다."""
+        with self.lock:
+            if self.probing:
+                self.probing = False
+                self.opened_at = time.monotonic()
+
+class HttpClient:
+    """커넥션 풀을 공유하고, 호스트별 동시성/속도 제한, 재시도, 회로 차단을 적용하는 HTTP 클라이언트입니다."""
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT, max_retries=3, backoff_base=0.5, backoff_max=8.0,
+                 pool_size=32, failure_threshold=5, cooldown=30.0, host_limits=None):
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.host_limits = dict(HOST_LIMITS, **(host_limits or {}))
+        self._policies = {}
+        self._policies_lock = threading.Lock()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=len(self.host_limits) + 4, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({'User-Agent': 'Mozilla/5.0'})
+
+    def _policy(self, host):
+        with self._policies_lock:
+            if host not in self._policies:
+                concurrency, rate = self.host_limits.get(host, DEFAULT_HOST_LIMIT)
+                self._policies[host] = _HostPolicy(concurrency, rate, self.failure_threshold, self.cooldown)
+            return self._policies[host]
+
+    def _backoff(self, attempt, retry_after=None):
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), self.backoff_max)
+        # 지수 백오프 + 전체 지터
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def request(self, method, url, timeout=None, **kwargs):
+        host = urlparse(url).hostname
+        policy = self._policy(host)
+        probe = policy.check_circuit(host)
+        if not probe:
+            return self._send(policy, probe, method, url, timeout, **kwargs)
+        try:
+            return self._send(policy, probe, method, url, timeout, **kwargs)
+        finally:
+            policy.end_probe()
+
+    def _send(self, policy, probe, method, url, timeout, **kwargs):
+        res, error = None, None
+        for attempt in range(self.max_retries + 1):
+            policy.acquire_token()
+            with policy.slots:
+                try:
+                    res, error = self.session.request(method, url, timeout=timeout or self.timeout, **kwargs), None
+                except (requests.ConnectionError, requests.Timeout) as e:
+                    res, error = None, e
+            if res is not None and res.status_code not in RETRY_STATUS:
+                policy.record(True, probe)
+                return res
+            if attempt < self.max_retries:
+                time.sleep(self._backoff(attempt, res.headers.get('Retry-After') if res is not None else None))
+
+        policy.record(False, probe)
+        if res is not None:
+            return res
+        raise error
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_client():
+    """프로세스 전체가 공유하는 HttpClient를 돌려줍니다."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient()
+        return _client
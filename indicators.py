@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+
+SMA_WINDOWS = (20, 60, 120)
+BB_WINDOW, BB_K = 20, 2
+RSI_PERIOD = 14
+MACD_FAST, MACD_SLOW, MACD_SIGNAL = 12, 26, 9
+ATR_PERIOD = 14
+
+# 이동 구간 지표를 이어 계산할 때 필요한 과거 봉 수
+LOOKBACK = max(SMA_WINDOWS + (BB_WINDOW,))
+
+COLUMNS = [f'sma{w}' for w in SMA_WINDOWS] + [
+    'bb_mid', 'bb_upper', 'bb_lower',
+    'avg_gain', 'avg_loss', 'rsi',
+    'ema_fast', 'ema_slow', 'macd', 'macd_signal', 'macd_hist',
+    'atr',
+]
+
+def _rolling_mean(x, window):
+    out = np.full(len(x), np.nan)
+    if len(x) >= window:
+        cs = np.concatenate(([0.0], np.cumsum(x)))
+        out[window - 1:] = (cs[window:] - cs[:-window]) / window
+    return out
+
+def _ewm(x, alpha, seed=np.nan):
+    """adjust=False 지수평활. seed가 있으면 직전 평활값에서 이어서 계산합니다."""
+    if np.isnan(seed):
+        return pd.Series(x).ewm(alpha=alpha, adjust=False).mean().to_numpy()
+    return pd.Series(np.concatenate(([seed], x))).ewm(alpha=alpha, adjust=False).mean().to_numpy()[1:]
+
+def _rolling_part(close):
+    out = {f'sma{w}': _rolling_mean(close, w) for w in SMA_WINDOWS}
+    mid = _rolling_mean(close, BB_WINDOW)
+    std = np.sqrt(np.clip(_rolling_mean(close ** 2, BB_WINDOW) - mid ** 2, 0, None))
+    out['bb_mid'] = mid
+    out['bb_upper'] = mid + BB_K * std
+    out['bb_lower'] = mid - BB_K * std
+    return out
+
+def _recursive_part(close, high, low, prev_close=np.nan, state=None):
+    """RSI, MACD, ATR처럼 직전 값에 의존하는 지표를 계산합니다. state는 직전 봉의 지표 값입니다."""
+    state = state or {}
+    prior_close = np.concatenate(([prev_close], close[:-1]))
+
+    delta = close - prior_close
+    avg_gain = _ewm(np.clip(delta, 0, None), 1 / RSI_PERIOD, state.get('avg_gain', np.nan))
+    avg_loss = _ewm(np.clip(-delta, 0, None), 1 / RSI_PERIOD, state.get('avg_loss', np.nan))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = 100 - 100 / (1 + avg_gain / avg_loss)
+
+    ema_fast = _ewm(close, 2 / (MACD_FAST + 1), state.get('ema_fast', np.nan))
+    ema_slow = _ewm(close, 2 / (MACD_SLOW + 1), state.get('ema_slow', np.nan))
+    macd = ema_fast - ema_slow
+    macd_signal = _ewm(macd, 2 / (MACD_SIGNAL + 1), state.get('macd_signal', np.nan))
+
+    true_range = np.fmax(high - low, np.fmax(np.abs(high - prior_close), np.abs(low - prior_close)))
+    atr = _ewm(true_range, 1 / ATR_PERIOD, state.get('atr', np.nan))
+
+    return {
+        'avg_gain': avg_gain, 'avg_loss': avg_loss, 'rsi': rsi,
+        'ema_fast': ema_fast, 'ema_slow': ema_slow,
+        'macd': macd, 'macd_signal': macd_signal, 'macd_hist': macd - macd_signal,
+        'atr': atr,
+    }
+
+def _arrays(hist):
+    return tuple(hist[c].to_numpy(dtype=float) for c in ('Close', 'High', 'Low'))
+
+def compute_indicators(hist, prev=None):
+    """
+    일봉(Open/High/Low/Close/Volume)에서 이동평균, 볼린저 밴드, RSI, MACD, ATR을 배열 연산으로 계산합니다.
+    prev가 같은 종목의 이전 결과이면 새로 붙은 봉만 이어서 계산합니다. (마지막 봉은 장중 값이었을 수 있어 다시 계산)
+    """
+    if hist.empty:
+        return pd.DataFrame(index=hist.index, columns=COLUMNS, dtype=float)
+
+    start = 0
+    if prev is not None and 1 < len(prev) <= len(hist) and hist.index[len(prev) - 1] == prev.index[-1]:
+        start = len(prev) - 1
+
+    close, high, low = _arrays(hist)
+    if start == 0:
+        values = {**_rolling_part(close), **_recursive_part(close, high, low)}
+        return pd.DataFrame(values, index=hist.index)[COLUMNS]
+
+    # 이동 구간 지표는 필요한 과거 봉만 붙여 계산하고, 재귀 지표는 직전 봉의 상태에서 이어 계산
+    lookback_start = max(0, start - LOOKBACK)
+    rolling = {k: v[start - lookback_start:] for k, v in _rolling_part(close[lookback_start:]).items()}
+    state = dict(zip(COLUMNS, prev.iloc[start - 1].to_numpy()))
+    recursive = _recursive_part(close[start:], high[start:], low[start:], close[start - 1], state)
+    tail = pd.DataFrame({**rolling, **recursive}, index=hist.index[start:])[COLUMNS]
+    return pd.concat([prev.iloc[:start], tail])
+
+def volume_profile(hist, bins=24):
+    """가격대별 거래량 분포를 (가격대 중앙값, 거래량) 표로 돌려줍니다."""
+    if hist.empty:
+        return pd.DataFrame(columns=['price', 'volume'])
+    typical = ((hist['High'] + hist['Low'] + hist['Close']) / 3).to_numpy()
+    volume, edges = np.histogram(typical, bins=bins, weights=hist['Volume'].to_numpy())
+    return pd.DataFrame({'price': (edges[:-1] + edges[1:]) / 2, 'volume': volume})
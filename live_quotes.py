@@ -0,0 +1,152 @@
+"""
+장중 실시간 시세 공유 폴러.
+
+모든 세션이 지금 화면에 띄운 종목을 등록(watch)하면, 백그라운드 스레드 하나가 interval초마다
+등록된 종목 전체(중복 제거)를 묶음 요청으로 조회합니다. 값이 바뀐 종목에만 버전 번호를 붙여 두므로
+각 세션은 마지막으로 본 버전 이후 바뀐 값(changes)만 받아 갑니다. 조회 비용은 세션 수와 무관하게 종목 수에만 비례합니다.
+"""
+import threading
+import time
+from http_client import get_client
+
+NAVER_REALTIME_URL = "https://polling.finance.naver.com/api/realtime?query=SERVICE_ITEM:{codes}"
+NAVER_REALTIME_CHUNK = 50 # 한 번에 조회할 종목 수
+DEFAULT_INTERVAL = 5
+WATCH_TIMEOUT = 60 # 이 시간 동안 등록을 갱신하지 않은 세션(창을 닫은 세션)의 종목은 조회에서 뺌
+
+def _quote(price, prev_close):
+    change = price - prev_close if prev_close else 0.0
+    return {
+        'price': float(price),
+        'change': float(change),
+        'change_pct': float(change / prev_close * 100) if prev_close else 0.0,
+    }
+
+def parse_naver_realtime(payload):
+    """네이버 실시간 시세 응답에서 {6자리 코드: 시세}를 뽑습니다."""
+    quotes = {}
+    for area in (payload.get('result') or {}).get('areas', []):
+        for data in area.get('datas', []):
+            try:
+                price = float(data['nv'])
+                if 'sv' in data:
+                    prev_close = float(data['sv'])
+                else:
+                    # 전일비(cv)는 부호 없이 오고 등락 구분(rf)이 4, 5이면 하락
+                    sign = -1 if str(data.get('rf')) in ('4', '5') else 1
+                    prev_close = price - sign * abs(float(data['cv']))
+            except (KeyError, TypeError, ValueError):
+                continue
+            quotes[data['cd']] = _quote(price, prev_close)
+    return quotes
+
+def fetch_naver_realtime(symbols):
+    """국내 종목(.KS/.KQ)의 장중 시세를 네이버 실시간 시세 API로 묶어서 조회합니다."""
+    codes = {symbol.split('.')[0]: symbol for symbol in symbols}
+    quotes = {}
+    code_list = list(codes)
+    for i in range(0, len(code_list), NAVER_REALTIME_CHUNK):
+        chunk = code_list[i:i + NAVER_REALTIME_CHUNK]
+        res = get_client().get(NAVER_REALTIME_URL.format(codes=",".join(chunk)))
+        for code, quote in parse_naver_realtime(res.json()).items():
+            if code in codes:
+                quotes[codes[code]] = quote
+    return quotes
+
+def fetch_yf_quotes(symbols):
+    """해외 종목과 지수의 장중 시세. 최근 일봉(오늘 봉은 장중 값)을 yf.download 한 번으로 받습니다."""
+    from market_store import download_closes
+    close = download_closes(symbols, period="5d")
+    quotes = {}
+    for symbol in close.columns:
+        series = close[symbol].dropna()
+        if len(series) >= 2:
+            quotes[symbol] = _quote(series.iloc[-1], series.iloc[-2])
+    return quotes
+
+def fetch_quotes(symbols):
+    """국내 종목은 네이버, 나머지(와 네이버에서 못 받은 종목)는 yfinance로 조회합니다."""
+    krx = [s for s in symbols if s.endswith(('.KS', '.KQ'))]
+    quotes = {}
+    if krx:
+        try:
+            quotes.update(fetch_naver_realtime(krx))
+        except Exception as e:
+            print(f"Naver realtime error: {e}")
+    rest = [s for s in symbols if s not in quotes]
+    if rest:
+        quotes.update(fetch_yf_quotes(rest))
+    return quotes
+
+class QuotePoller:
+    """여러 세션이 보고 있는 종목의 시세를 한 스레드에서 주기적으로 조회하고, 바뀐 값만 버전별로 내어 줍니다."""
+
+    def __init__(self, fetch=fetch_quotes, interval=DEFAULT_INTERVAL, watch_timeout=WATCH_TIMEOUT):
+        self.fetch = fetch
+        self.interval = interval
+        self.watch_timeout = watch_timeout
+        self._lock = threading.Lock()
+        self._watchers = {} # 세션 ID -> (종목 집합, 마지막 등록 시각)
+        self._quotes = {} # 종목 -> (버전, 시세)
+        self._version = 0
+        self._thread = None
+        self.stats = {"polls": 0, "errors": 0, "symbols": 0, "seconds": 0.0}
+
+    def watch(self, session_id, symbols):
+        """세션이 보고 있는 종목을 등록(갱신)하고, 폴링 스레드가 없으면 시작합니다."""
+        with self._lock:
+            self._watchers[session_id] = (frozenset(symbols), time.time())
+        self.start()
+
+    def unwatch(self, session_id):
+        with self._lock:
+            self._watchers.pop(session_id, None)
+
+    def watched_symbols(self):
+        """등록이 만료되지 않은 세션들이 보고 있는 종목의 합집합입니다."""
+        now = time.time()
+        with self._lock:
+            for session_id in [s for s, (_, seen) in self._watchers.items() if now - seen > self.watch_timeout]:
+                del self._watchers[session_id]
+            return sorted(set().union(*(symbols for symbols, _ in self._watchers.values())))
+
+    def poll_once(self):
+        symbols = self.watched_symbols()
+        if not symbols:
+            return 0
+        started = time.perf_counter()
+        try:
+            quotes = self.fetch(symbols)
+        except Exception as e:
+            self.stats["errors"] += 1
+            print(f"Quote poll error: {e}")
+            return 0
+        changed = 0
+        with self._lock:
+            for symbol, quote in quotes.items():
+                current = self._quotes.get(symbol)
+                if current is None or current[1] != quote:
+                    self._version += 1
+                    self._quotes[symbol] = (self._version, quote)
+                    changed += 1
+            self.stats["polls"] += 1
+            self.stats["symbols"] = len(symbols)
+            self.stats["seconds"] += time.perf_counter() - started
+        return changed
+
+    def changes(self, since=0, symbols=None):
+        """since 버전 이후 바뀐 시세 {종목: 시세}와 현재 버전을 돌려줍니다. symbols를 주면 그 종목만."""
+        with self._lock:
+            items = self._quotes.items() if symbols is None else ((s, self._quotes[s]) for s in symbols if s in self._quotes)
+            return {symbol: quote for symbol, (version, quote) in items if version > since}, self._version
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            def loop():
+                while True:
+                    self.poll_once()
+                    time.sleep(self.interval)
+            self._thread = threading.Thread(target=loop, name="quote-poller", daemon=True)
+        self._thread.start()
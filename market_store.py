@@ -0,0 +1,174 @@
+import os
+import re
+import threading
+import time
+import pandas as pd
+from storage import DATA_DIR, atomic_write
+
+YF_CHUNK_SIZE = 200 # yf.download 한 번에 받을 종목 수
+EVENT_COLUMNS = ("Dividends", "Stock Splits")
+SEAM_RTOL = 1e-4 # 겹치는 봉의 종가가 이보다 더 다르면 과거 봉의 수정주가 기준이 바뀐 것으로 봄
+
+def needs_readjust(stored, fresh, seam):
+    """
+    이어 받은 봉에 저장본에 없던 배당/분할이 있거나, 겹치는 완성 봉(seam)의 종가가 저장본과 다르면 True.
+    수정주가는 배당/분할 때마다 과거 봉 전체가 다시 계산되므로, 이때는 이어 붙이지 말고 전체를 다시 받아야 합니다.
+    """
+    known = stored.reindex(fresh.index)
+    for column in EVENT_COLUMNS:
+        if column in fresh:
+            new = fresh[column].fillna(0)
+            old = known[column].fillna(0) if column in known else 0
+            if ((new != 0) & (new != old)).any():
+                return True
+    if seam in fresh.index and seam in stored.index:
+        old, new = float(stored.at[seam, 'Close']), float(fresh.at[seam, 'Close'])
+        return abs(new - old) > SEAM_RTOL * abs(old)
+    return False
+
+class MarketDataStore:
+    """종목별 일봉을 Parquet 파일로 보관하고, 갱신 시 마지막 저장일 이후 구간만 이어 받습니다."""
+
+    def __init__(self, root=None):
+        self.root = root or os.path.join(DATA_DIR, "market")
+        os.makedirs(self.root, exist_ok=True)
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    def _path(self, symbol):
+        # ^KS11 같은 지수 티커도 파일명으로 쓸 수 있게 정리
+        safe = re.sub(r'[^0-9A-Za-z._-]', '_', symbol)
+        return os.path.join(self.root, f"{safe}.parquet")
+
+    def _lock(self, symbol):
+        with self._locks_guard:
+            return self._locks.setdefault(symbol, threading.Lock())
+
+    def load(self, symbol):
+        """저장된 일봉을 읽습니다. 없으면 빈 DataFrame을 돌려줍니다."""
+        path = self._path(symbol)
+        if not os.path.exists(path):
+            return pd.DataFrame()
+        try:
+            return pd.read_parquet(path)
+        except Exception as e:
+            print(f"Market store read error for {symbol}: {e}")
+            return pd.DataFrame()
+
+    def age(self, symbol):
+        """마지막 저장 이후 지난 시간(초)입니다. 저장된 적이 없으면 None."""
+        path = self._path(symbol)
+        if not os.path.exists(path):
+            return None
+        return time.time() - os.path.getmtime(path)
+
+    def save(self, symbol, df):
+        atomic_write(self._path(symbol), lambda tmp: df.to_parquet(tmp))
+
+    def refresh(self, symbol, fetch, period="5y", max_age=3600):
+        """
+        저장본이 max_age초보다 오래됐으면 이어 받아 저장한 뒤 전체 일봉을 돌려줍니다.
+        fetch(period=..., start=...)는 yfinance history와 같은 형식의 DataFrame을 돌려줘야 합니다.
+        """
+        with self._lock(symbol):
+            stored = self.load(symbol)
+            age = self.age(symbol)
+            if not stored.empty and age is not None and age < max_age:
+                return stored
+
+            base = stored # 이어 붙일 저장본 (전체를 다시 받으면 비움)
+            try:
+                if stored.empty:
+                    fresh = fetch(period=period)
+                else:
+                    # 마지막 봉은 장중 값일 수 있으므로 그 날짜부터 다시 받아 덮어쓰고,
+                    # 수정주가 기준이 바뀌었는지 보려고 그 앞의 완성 봉(seam)도 함께 받습니다.
+                    seam = stored.index[-2] if len(stored) > 1 else stored.index[-1]
+                    fresh = fetch(start=seam.strftime('%Y-%m-%d'))
+                    if fresh is not None and not fresh.empty:
+                        if stored.index.tz is not None and fresh.index.tz is not None:
+                            fresh.index = fresh.index.tz_convert(stored.index.tz)
+                        if needs_readjust(stored, fresh, seam):
+                            print(f"Market store re-adjusting {symbol}: dividend/split since last save")
+                            fresh = fetch(start=stored.index[0].strftime('%Y-%m-%d'))
+                            base = pd.DataFrame()
+            except Exception as e:
+                print(f"Market store fetch error for {symbol}: {e}")
+                return stored
+
+            if fresh is None or fresh.empty:
+                return stored
+
+            if base.empty:
+                merged = fresh.sort_index()
+                # 전체를 새로 받으면 과거 봉의 수정주가가 바뀌었을 수 있으므로, 이어 계산한 지표를 버릴 기준으로 받은 시각을 남김
+                merged.attrs = {'adjusted_at': pd.Timestamp.now().isoformat()}
+            else:
+                merged = pd.concat([base, fresh])
+                merged = merged[~merged.index.duplicated(keep='last')].sort_index()
+                merged.attrs = dict(base.attrs)
+
+            try:
+                self.save(symbol, merged)
+            except Exception as e:
+                print(f"Market store write error for {symbol}: {e}")
+            return merged
+
+def download_history(symbol, period=None, start=None):
+    """yfinance 일봉을 받습니다. MarketDataStore.refresh의 fetch로 사용합니다."""
+    import yfinance as yf # 저장본이 최신이면 필요 없으므로 받을 때만 불러옴
+    ticker = yf.Ticker(symbol)
+    if start:
+        return ticker.history(start=start)
+    return ticker.history(period=period)
+
+def _trading_dates(index):
+    # 거래소마다 시간대가 달라 현지 날짜만 남김
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return index.normalize()
+
+def download_closes(symbols, period="1y", start=None, chunk_size=YF_CHUNK_SIZE):
+    """
+    여러 종목의 수정 종가를 yf.download 묶음 호출로 받아 (날짜 x 티커) 표로 돌려줍니다.
+    start를 주면 period 대신 그 날짜부터 받습니다. 인덱스는 시간대 없는 날짜이고, 받지 못한 종목은 빈 열로 남깁니다.
+    """
+    import yfinance as yf
+    symbols = list(dict.fromkeys(symbols))
+    frames = []
+    for i in range(0, len(symbols), chunk_size):
+        chunk = symbols[i:i + chunk_size]
+        span = {"start": start} if start else {"period": period}
+        data = yf.download(chunk, **span, interval="1d", auto_adjust=True, progress=False, threads=True)
+        if data.empty:
+            continue
+        frames.append(data['Close'] if isinstance(data.columns, pd.MultiIndex) else data[['Close']].set_axis(chunk, axis=1))
+    if not frames:
+        return pd.DataFrame(columns=symbols, dtype=float)
+    close = pd.concat(frames, axis=1)
+    close.index = _trading_dates(close.index)
+    return close.groupby(level=0).last().reindex(columns=symbols)
+
+def load_closes(symbols, start, max_age=3600, store=None):
+    """
+    여러 종목의 start 이후 종가 표를 만듭니다. 일봉 저장소에 최근 max_age초 안에 받은 일봉이 있으면 그대로 쓰고,
+    없거나 오래된 종목만 download_closes 묶음 호출 한 번으로 받습니다. (받은 값은 저장소에 쓰지 않음)
+    """
+    store = store or MarketDataStore()
+    start = pd.Timestamp(start).normalize()
+    columns, missing = {}, []
+    for symbol in dict.fromkeys(symbols):
+        age = store.age(symbol)
+        stored = store.load(symbol) if age is not None and age < max_age else pd.DataFrame()
+        if stored.empty or 'Close' not in stored:
+            missing.append(symbol)
+            continue
+        close = stored['Close'].set_axis(_trading_dates(stored.index))
+        columns[symbol] = close.groupby(level=0).last()
+    if missing:
+        fetched = download_closes(missing, start=start.strftime('%Y-%m-%d'))
+        columns.update({symbol: fetched[symbol] for symbol in missing})
+    if not columns:
+        return pd.DataFrame()
+    close = pd.DataFrame(columns).sort_index()
+    return close[close.index >= start]
@@ -0,0 +1,80 @@
+from lxml import html as lxml_html
+
+def _has_class(name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+# 필요한 값만 XPath로 바로 찾습니다. (BeautifulSoup 트리 전체를 순회하지 않음)
+XPATH_PRICE = f"//p[{_has_class('no_today')}]//span[{_has_class('blind')}]/text()"
+XPATH_DIFF = f"//p[{_has_class('no_exday')}]//span[{_has_class('blind')}]/text()"
+XPATH_DIFF_ICO = f"//p[{_has_class('no_exday')}]//em/span[1]/text()"
+XPATH_MARKET_SUM = "//*[@id='_market_sum']//text()"
+XPATH_PER = "//*[@id='_per']//text()"
+XPATH_PBR = "//*[@id='_pbr']//text()"
+XPATH_52W = "//th[starts-with(normalize-space(.), '52주최고')]/following-sibling::td[1]/em/text()"
+XPATH_VOLUME = f"//table[{_has_class('no_info')}]//td[.//span[normalize-space(.)='거래량']]//span[{_has_class('blind')}]/text()"
+
+def _first(tree, xpath):
+    values = tree.xpath(xpath)
+    return values[0].strip() if values else None
+
+def _to_int(text):
+    if not text:
+        return 0
+    try:
+        return int(text.replace(',', '').strip())
+    except ValueError:
+        return 0
+
+def parse_market_cap(text):
+    """'419조 723' 또는 '8,500' 형식의 시가총액(억원 단위) 문자열을 원 단위로 바꿉니다."""
+    mkt_cap_str = text.replace(',', '').replace('억원', '').replace('원', '').strip()
+    mkt_cap = 0
+    if '조' in mkt_cap_str:
+        parts = mkt_cap_str.split('조')
+        mkt_cap += int(parts[0].strip()) * 1e12
+        if parts[1].strip():
+            mkt_cap += int(parts[1].strip()) * 1e8
+    elif mkt_cap_str:
+        mkt_cap = int(mkt_cap_str) * 1e8
+    return mkt_cap
+
+def _ratio(tree, xpath):
+    """PER/PBR 같은 배수 값을 float로 돌려줍니다. 값이 없거나('N/A', '-') 숫자가 아니면 None."""
+    text = ''.join(tree.xpath(xpath)).replace('배', '').replace(',', '').strip()
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+def parse_item_page(page):
+    """네이버 종목 메인 페이지 HTML에서 시세와 밸류에이션 값을 뽑아 yfinance info와 같은 키로 돌려줍니다."""
+    tree = lxml_html.fromstring(page)
+
+    # 주가
+    price = _to_int(_first(tree, XPATH_PRICE))
+
+    # 전일비 (하락/하한이면 음수)
+    diff = _to_int(_first(tree, XPATH_DIFF))
+    ico = _first(tree, XPATH_DIFF_ICO)
+    if ico and '상승' not in ico and '상한' not in ico:
+        diff = -diff
+
+    # 시가총액
+    mkt_cap = parse_market_cap(''.join(tree.xpath(XPATH_MARKET_SUM)))
+
+    # 52주 최고/최저
+    high_low = [_to_int(v) for v in tree.xpath(XPATH_52W)]
+    high_52w, low_52w = (high_low + [0, 0])[:2]
+
+    return {
+        'currentPrice': price,
+        'priceDiff': diff,
+        'marketCap': mkt_cap,
+        'trailingPE': _ratio(tree, XPATH_PER),
+        'priceToBook': _ratio(tree, XPATH_PBR),
+        'fiftyTwoWeekHigh': high_52w,
+        'fiftyTwoWeekLow': low_52w,
+        'volume': _to_int(_first(tree, XPATH_VOLUME)),
+        'currency': 'KRW',
+        'source': 'naver'
+    }
@@ -0,0 +1,172 @@
+"""
+AI 프롬프트에 넣을 시장 데이터 요약 블록.
+
+앱이 이미 받아 둔 일봉(수익률, 변동성, 낙폭), 재무 비율, 시세/밸류에이션 값을 토큰 예산 안의 짧은 "항목: 값" 줄로 압축합니다.
+값은 마지막으로 끝난 거래일 기준이고 표시 자릿수로 반올림하므로, 같은 날 같은 종목은 같은 블록(같은 프롬프트 해시)이 되어
+이전에 생성한 리포트를 그대로 다시 쓸 수 있습니다.
+"""
+from datetime import date
+import numpy as np
+import pandas as pd
+
+TRADING_DAYS = 252
+ANALYSIS_TOKEN_BUDGET = 400
+BRIEFING_TOKEN_BUDGET = 300
+# 거래일 수가 시장마다 달라(1년: 코스피 약 247일, 미국 252일) 달력 기간으로 기준 봉을 찾음
+RETURN_WINDOWS = (("1주", pd.DateOffset(weeks=1)), ("1개월", pd.DateOffset(months=1)), ("3개월", pd.DateOffset(months=3)),
+                  ("6개월", pd.DateOffset(months=6)), ("1년", pd.DateOffset(years=1)))
+VOLATILITY_WINDOW = 60
+# 지수가 여럿이라 브리핑에는 지수마다 이 항목만 넣음
+MARKET_ITEMS = ("종가", "전일 대비", "1주 수익률", "1개월 수익률", "1년 수익률", f"연 변동성({VOLATILITY_WINDOW}일)", "52주 고가 대비")
+
+def estimate_tokens(text):
+    """토큰 수를 보수적으로 어림합니다. (한글 등 비ASCII 문자는 1자당 1토큰, ASCII는 4자당 1토큰)"""
+    wide = sum(1 for ch in text if ord(ch) > 127)
+    return wide + (len(text) - wide + 3) // 4
+
+def _pct(value):
+    return f"{value * 100:+.1f}%"
+
+def _price(value):
+    return f"{value:,.0f}" if abs(value) >= 1000 else f"{value:,.2f}"
+
+def _amount(value):
+    for scale, unit in ((1e12, "조"), (1e8, "억")):
+        if abs(value) >= scale:
+            return f"{value / scale:,.1f}{unit}"
+    return f"{value:,.0f}"
+
+def _number(value):
+    # yfinance info에는 숫자 대신 문자열('Infinity' 등)이 오는 값도 있음
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return value if np.isfinite(value) else None
+
+def completed_bars(hist, today=None):
+    """오늘(장중에 계속 바뀌는) 봉을 빼고 끝난 거래일의 일봉만 남깁니다."""
+    if hist.empty:
+        return hist
+    index = hist.index.tz_localize(None) if getattr(hist.index, 'tz', None) is not None else hist.index
+    today = pd.Timestamp(today or date.today())
+    return hist[index.normalize() < today]
+
+def price_stats(hist):
+    """
+    종가 추이를 (항목, 값) 목록으로 요약합니다. 중요한 항목이 앞쪽이라 예산이 모자라면 뒤쪽부터 빠집니다.
+    hist는 completed_bars로 자른 일봉이어야 같은 날 같은 결과가 나옵니다.
+    """
+    series = hist['Close'].dropna() if 'Close' in hist else pd.Series(dtype=float)
+    if len(series) < 2:
+        return []
+    close, dates = series.to_numpy(dtype=float), series.index
+    last = close[-1]
+
+    def start_of(offset):
+        # 기간 시작일 이후 첫 봉의 위치. 일봉이 그 기간을 다 담고 있지 않으면 None
+        start = dates[-1] - offset
+        return dates.searchsorted(start) if dates[0] <= start else None
+
+    items = [("기준일", dates[-1].strftime('%Y-%m-%d')), ("종가", _price(last)), ("전일 대비", _pct(last / close[-2] - 1))]
+    for label, offset in RETURN_WINDOWS:
+        i = start_of(offset)
+        if i is not None:
+            items.append((f"{label} 수익률", _pct(last / close[i] - 1)))
+
+    year = close[start_of(pd.DateOffset(years=1)) or 0:]
+    returns = np.diff(np.log(close[-VOLATILITY_WINDOW - 1:]))
+    if len(returns) > 1:
+        items.append((f"연 변동성({VOLATILITY_WINDOW}일)", f"{np.std(returns, ddof=1) * np.sqrt(TRADING_DAYS) * 100:.1f}%"))
+    items.append(("최대 낙폭(1년)", _pct((year / np.maximum.accumulate(year) - 1).min())))
+    items.append(("52주 고가 대비", _pct(last / year.max() - 1)))
+    items.append(("52주 저가 대비", _pct(last / year.min() - 1)))
+
+    if 'Volume' in hist:
+        volume = hist['Volume'].to_numpy(dtype=float)[-20:]
+        if len(volume) and volume.mean() > 0:
+            items.append(("거래량(20일 평균 대비)", f"{volume[-1] / volume.mean():.2f}배"))
+    return items
+
+def ratio_stats(ratios, previous=True):
+    """재무 비율 표(항목 x 'YYYY.MM')에서 최근 결산 값을 (항목, 값) 목록으로 뽑습니다. previous면 직전 값도 함께."""
+    if ratios is None or ratios.empty:
+        return []
+    ratios = ratios[sorted(ratios.columns)]
+    items = []
+    for label, row in ratios.iterrows():
+        row = row.dropna()
+        if row.empty:
+            continue
+        name = label.replace("(%)", "").replace(", %)", ")")
+        text = f"{row.iloc[-1]:.1f}%"
+        if previous and len(row) > 1:
+            text += f"(직전 {row.iloc[-2]:.1f}%)"
+        items.append((name, text))
+    return items
+
+def quote_stats(info, reference_close=None):
+    """
+    시세 정보(네이버/yfinance info)의 업종과 밸류에이션 값을 (항목, 값) 목록으로 뽑습니다.
+    현재가에 비례하는 PER, PBR, 시가총액은 reference_close(마지막 거래일 종가) 기준으로 환산해 장중에도 값이 흔들리지 않게 합니다.
+    """
+    if not info:
+        return []
+    price = _number(info.get('currentPrice') or info.get('regularMarketPrice'))
+    scale = reference_close / price if price and reference_close else 1.0
+    items = []
+    if info.get('sector') and info.get('sector') != 'N/A':
+        items.append(("업종", info['sector']))
+    market_cap = _number(info.get('marketCap'))
+    if market_cap and market_cap > 0:
+        items.append(("시가총액", _amount(market_cap * scale)))
+    for key, label in (('trailingPE', "PER"), ('forwardPE', "선행 PER"), ('priceToBook', "PBR")):
+        value = _number(info.get(key))
+        if value is not None:
+            items.append((label, f"{value * scale:.1f}배"))
+    dividend = _number(info.get('dividendYield'))
+    if dividend is not None:
+        items.append(("배당수익률", f"{dividend:.2f}%"))
+    if info.get('currency'):
+        items.append(("통화", info['currency']))
+    return items
+
+def build_block(sections, budget=ANALYSIS_TOKEN_BUDGET):
+    """
+    (제목, 항목 목록) 섹션들을 "제목: 항목 값 | 항목 값" 줄로 만들어 budget 토큰 안에 담습니다.
+    섹션은 앞쪽이 우선이고, 예산이 모자라면 섹션 안의 뒤쪽 항목부터 빠집니다.
+    """
+    lines = []
+    used = 0
+    for title, items in sections:
+        parts = []
+        for label, value in items:
+            candidate = f"{title}: " + " | ".join(parts + [f"{label} {value}"])
+            if used + estimate_tokens(candidate) + 1 > budget:
+                break
+            parts.append(f"{label} {value}")
+        if parts:
+            line = f"{title}: " + " | ".join(parts)
+            lines.append(line)
+            used += estimate_tokens(line) + 1
+    return "\n".join(lines)
+
+def analysis_context(hist, view=None, info=None, budget=ANALYSIS_TOKEN_BUDGET, today=None):
+    """기업 분석 프롬프트용 블록. 시세 요약, 밸류에이션, 연간/분기 재무 비율 순으로 예산을 씁니다."""
+    hist = completed_bars(hist, today)
+    reference = float(hist['Close'].dropna().iloc[-1]) if 'Close' in hist and hist['Close'].notna().any() else None
+    view = view or {}
+    return build_block([
+        ("주가", price_stats(hist)),
+        ("밸류에이션", quote_stats(info, reference)),
+        ("연간 재무 비율", ratio_stats(view.get('ratios'))),
+        ("최근 분기 비율", ratio_stats(view.get('quarterly_ratios'), previous=False)),
+    ], budget)
+
+def market_context(histories, budget=BRIEFING_TOKEN_BUDGET, today=None):
+    """시장 브리핑 프롬프트용 블록. {지수 이름: 일봉}마다 MARKET_ITEMS만 한 줄씩 넣습니다."""
+    sections = []
+    for name, hist in histories.items():
+        items = price_stats(completed_bars(hist, today))
+        sections.append((name, [(label, value) for label, value in items if label in MARKET_ITEMS]))
+    return build_block(sections, budget)
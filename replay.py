@@ -0,0 +1,244 @@
+"""
+외부 호출 기록/재생 계층.
+
+APP_REPLAY_MODE=record 이면 HttpClient(네이버/KRX), yfinance, Gemini 응답을 APP_REPLAY_DIR에 고정 응답으로 저장하고,
+APP_REPLAY_MODE=replay 이면 네트워크 없이 저장된 응답만으로 동작합니다. (기본값 off: 아무것도 바꾸지 않음)
+"""
+import hashlib
+import importlib.abc
+import importlib.machinery
+import inspect
+import json
+import os
+import pickle
+import re
+import sys
+import threading
+from collections import Counter
+from datetime import date
+from storage import atomic_write
+
+DEFAULT_REPLAY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks", "fixtures", "replay")
+
+# 추천 프롬프트나 이어 받기 시작일처럼 날짜가 들어간 요청도 다른 날 재생할 수 있도록, 키의 날짜는 기준일로부터의 일수로 바꿈
+# (날짜를 지우면 start/end만 다른 요청이 서로의 응답을 재생하게 됨)
+_DATE_PATTERN = re.compile(r'\d{4}-\d{2}-\d{2}')
+MANIFEST = "manifest.json"
+
+def relative_dates(text, reference):
+    """text 안의 YYYY-MM-DD 날짜를 reference 기준 일수(<d-3> 등)로 바꿉니다."""
+    def offset(match):
+        try:
+            return f"<d{(date.fromisoformat(match.group()) - reference).days:+d}>"
+        except ValueError:
+            return match.group()
+    return _DATE_PATTERN.sub(offset, text)
+
+class ReplayMissError(RuntimeError):
+    """재생 모드에서 저장된 응답이 없는 요청입니다."""
+
+class ReplayStore:
+    """경계(http/yfinance/gemini)별 요청 키를 해시해 pickle 파일로 응답을 기록하거나 재생합니다."""
+
+    def __init__(self, root, mode):
+        self.root = root
+        self.mode = mode
+        self.calls = Counter()
+        self.misses = Counter()
+        self._lock = threading.Lock()
+        self.recorded_on = self._read_manifest() if mode == "replay" else date.today()
+        if mode == "record":
+            manifest = {"recorded_on": self.recorded_on.isoformat()}
+            def write(tmp):
+                with open(tmp, 'w', encoding='utf-8') as f:
+                    json.dump(manifest, f)
+            atomic_write(os.path.join(root, MANIFEST), write)
+
+    def _read_manifest(self):
+        try:
+            with open(os.path.join(self.root, MANIFEST), encoding='utf-8') as f:
+                return date.fromisoformat(json.load(f)["recorded_on"])
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _path(self, boundary, key, reference):
+        digest = hashlib.sha1(relative_dates(repr(key), reference).encode('utf-8')).hexdigest()
+        return os.path.join(self.root, boundary, f"{digest}.pkl")
+
+    def _replay_path(self, boundary, key):
+        # 오늘 날짜에서 나온 값(추천 프롬프트 날짜)은 오늘 기준, 저장된 일봉에서 나온 값(이어 받기 시작일)은 기록일 기준으로 맞음
+        for reference in dict.fromkeys(r for r in (date.today(), self.recorded_on) if r is not None):
+            path = self._path(boundary, key, reference)
+            if os.path.exists(path):
+                return path
+        return None
+
+    def call(self, boundary, key, fn):
+        """record이면 fn()을 실제로 호출해 저장하고, replay이면 저장된 값을 돌려줍니다."""
+        with self._lock:
+            self.calls[boundary] += 1
+        if self.mode == "replay":
+            path = self._replay_path(boundary, key)
+            if path is None:
+                with self._lock:
+                    self.misses[boundary] += 1
+                raise ReplayMissError(f"{boundary} 고정 응답 없음: {key!r}")
+            with open(path, 'rb') as f:
+                return pickle.load(f)
+        path = self._path(boundary, key, self.recorded_on)
+        value = fn()
+        def write(tmp):
+            with open(tmp, 'wb') as f:
+                pickle.dump(value, f)
+        atomic_write(path, write)
+        return value
+
+    def snapshot(self):
+        """(호출 수, 누락 수) 사본을 돌려줍니다. 벤치마크에서 구간별 차이를 계산할 때 사용합니다."""
+        with self._lock:
+            return Counter(self.calls), Counter(self.misses)
+
+# --- 경계별 패치 ---
+
+class _Reply:
+    """generate_content 응답처럼 .text만 가진 객체입니다."""
+    def __init__(self, text):
+        self.text = text
+
+def _patch_http(store):
+    import requests
+    from http_client import HttpClient
+    original = HttpClient.request
+
+    def snapshot(res):
+        return {'status_code': res.status_code, 'url': res.url, 'headers': dict(res.headers),
+                'encoding': res.encoding, 'content': res.content}
+
+    def request(self, method, url, timeout=None, **kwargs):
+        key = (method, url, kwargs.get('params'), kwargs.get('data'))
+        saved = store.call("http", key, lambda: snapshot(original(self, method, url, timeout=timeout, **kwargs)))
+        res = requests.Response()
+        res.status_code, res.url, res.encoding = saved['status_code'], saved['url'], saved['encoding']
+        res.headers.update(saved['headers'])
+        res._content = saved['content']
+        return res
+
+    HttpClient.request = request
+
+def _patch_yfinance(store):
+    import yfinance as yf
+    real_ticker, real_download = yf.Ticker, yf.download
+
+    class ReplayTicker:
+        """yf.Ticker 대신 쓰이며, 속성/메서드 결과를 종목별로 기록하거나 재생합니다."""
+
+        def __init__(self, ticker, *args, **kwargs):
+            self.ticker = ticker
+            self._init = (args, kwargs)
+            self._real = None
+
+        def _ticker(self):
+            if self._real is None:
+                self._real = real_ticker(self.ticker, *self._init[0], **self._init[1])
+            return self._real
+
+        def __getattr__(self, name):
+            attr = inspect.getattr_static(real_ticker, name, None)
+            if isinstance(attr, property):
+                return store.call("yfinance", ("Ticker", self.ticker, name), lambda: getattr(self._ticker(), name))
+            if callable(attr):
+                def method(*args, **kwargs):
+                    key = ("Ticker", self.ticker, name, args, sorted(kwargs.items()))
+                    return store.call("yfinance", key, lambda: getattr(self._ticker(), name)(*args, **kwargs))
+                return method
+            return getattr(self._ticker(), name)
+
+    def download(tickers, *args, **kwargs):
+        key = ("download", tuple(tickers) if isinstance(tickers, (list, tuple)) else tickers, args, sorted(kwargs.items()))
+        return store.call("yfinance", key, lambda: real_download(tickers, *args, **kwargs))
+
+    yf.Ticker, yf.download = ReplayTicker, download
+
+def _patch_gemini(store):
+    import google.generativeai as genai
+    original = genai.GenerativeModel.generate_content
+
+    def chunk_texts(response):
+        texts = []
+        for chunk in response:
+            try:
+                texts.append(chunk.text)
+            except ValueError:
+                # 텍스트 없이 종료 정보만 담긴 조각
+                continue
+        return texts
+
+    def generate_content(self, contents, *args, stream=False, **kwargs):
+        # 스트리밍 여부와 상관없이 조각 목록으로 저장해 두고, 요청 방식에 맞춰 돌려줌
+        key = (getattr(self, 'model_name', ''), contents)
+        texts = store.call("gemini", key,
+                           lambda: chunk_texts(original(self, contents, *args, stream=True, **kwargs)) if stream
+                           else [original(self, contents, *args, **kwargs).text])
+        if stream:
+            return iter([_Reply(t) for t in texts])
+        return _Reply(''.join(texts))
+
+    genai.GenerativeModel.generate_content = generate_content
+
+class _PatchOnImport(importlib.abc.MetaPathFinder):
+    """아직 import되지 않은 모듈은 처음 import되는 순간에 패치합니다. (앱의 지연 import를 그대로 유지)"""
+
+    def __init__(self, patches):
+        self.patches = patches # 모듈 이름 -> 패치 함수
+
+    def find_spec(self, name, path, target=None):
+        if name not in self.patches:
+            return None
+        spec = importlib.machinery.PathFinder.find_spec(name, path)
+        if spec is None or spec.loader is None:
+            return None
+        patch = self.patches.pop(name)
+        exec_module = spec.loader.exec_module
+        def exec_and_patch(module):
+            exec_module(module)
+            patch()
+        spec.loader.exec_module = exec_and_patch
+        return spec
+
+def _patch_when_imported(patches):
+    pending = {}
+    for name, patch in patches.items():
+        if name in sys.modules:
+            patch()
+        else:
+            pending[name] = patch
+    if pending:
+        sys.meta_path.insert(0, _PatchOnImport(pending))
+
+_store = None
+_install_lock = threading.Lock()
+
+def install(mode=None, root=None):
+    """
+    mode가 record/replay이면 외부 호출 경계를 한 번만 패치하고 ReplayStore를 돌려줍니다. off이면 None.
+    인자를 생략하면 APP_REPLAY_MODE, APP_REPLAY_DIR 환경변수를 읽습니다.
+    """
+    global _store
+    mode = (mode or os.getenv("APP_REPLAY_MODE", "off")).lower()
+    root = root or os.getenv("APP_REPLAY_DIR", DEFAULT_REPLAY_DIR)
+    if mode not in ("record", "replay"):
+        return None
+    with _install_lock:
+        if _store is None:
+            store = ReplayStore(root, mode)
+            _patch_http(store)
+            _patch_when_imported({
+                "yfinance": lambda: _patch_yfinance(store),
+                "google.generativeai": lambda: _patch_gemini(store),
+            })
+            _store = store
+            print(f"Replay layer active: mode={mode}, dir={root}")
+        return _store
+
+def get_store():
+    return _store
@@ -0,0 +1,117 @@
+"""
+AI 생성 결과를 보관하는 SQLite 저장소.
+
+키는 (프롬프트 해시, 모델 이름, 날짜 구간)이라 같은 날 같은 프롬프트는 어느 프로세스/레플리카에서 요청해도 한 번만 생성합니다.
+DB 파일을 공유 볼륨(APP_DATA_DIR 또는 APP_REPORT_DB)에 두면 재시작과 레플리카 수에 상관없이 생성 횟수가 서로 다른 리포트 수만큼으로 줄어듭니다.
+항목마다 TTL이 있고, 전체 크기가 max_bytes를 넘으면 오래 안 쓴 항목부터 지웁니다.
+"""
+import hashlib
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reports (
+    prompt_hash TEXT NOT NULL,
+    model TEXT NOT NULL,
+    bucket TEXT NOT NULL,
+    text TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    used_at REAL NOT NULL,
+    PRIMARY KEY (prompt_hash, model, bucket)
+);
+CREATE INDEX IF NOT EXISTS reports_used_at ON reports (used_at);
+"""
+
+def prompt_hash(prompt):
+    return hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+
+def date_bucket(now=None):
+    """하루 단위 구간. 프롬프트가 같아도 날짜가 바뀌면 새로 생성합니다."""
+    return (now or datetime.now()).strftime("%Y-%m-%d")
+
+class ReportStore:
+    """
+    프롬프트별 AI 생성 결과를 SQLite 파일에 TTL 동안 보관합니다.
+    여러 프로세스가 같은 파일을 열어도 되며, 쓰기는 트랜잭션 단위로 원자적으로 반영됩니다.
+    """
+
+    def __init__(self, path, ttl=86400, max_bytes=256 * 2 ** 20, timeout=30):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+        self._connect().executescript(SCHEMA)
+
+    def _connect(self):
+        # sqlite3 연결은 스레드 간에 공유하지 않으므로 스레드마다 하나씩 엶
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            conn.execute(f"PRAGMA busy_timeout = {int(self.timeout * 1000)}")
+            self._local.conn = conn
+        return conn
+
+    def _count(self, name, n=1):
+        with self._lock:
+            self._stats[name] += n
+
+    def get(self, prompt, model, bucket=None, count=True):
+        """저장된 생성 결과를 돌려줍니다. 없거나 만료됐으면 None. (count=False면 적중/미스를 세지 않음)"""
+        key = (prompt_hash(prompt), model, bucket or date_bucket())
+        now = time.time()
+        conn = self._connect()
+        row = conn.execute("SELECT text FROM reports WHERE prompt_hash = ? AND model = ? AND bucket = ? AND expires_at > ?",
+                           (*key, now)).fetchone()
+        if row is None:
+            self._count("misses", count)
+            return None
+        conn.execute("UPDATE reports SET used_at = ? WHERE prompt_hash = ? AND model = ? AND bucket = ?", (now, *key))
+        self._count("hits", count)
+        return row[0]
+
+    def set(self, prompt, model, text, bucket=None, ttl=None):
+        """생성 결과를 저장하고, 만료된 항목과 크기 상한을 넘는 오래된 항목을 지웁니다."""
+        now = time.time()
+        size = len(text.encode('utf-8'))
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("INSERT OR REPLACE INTO reports VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                         (prompt_hash(prompt), model, bucket or date_bucket(), text, size, now, now + (ttl or self.ttl), now))
+            evicted = self._evict(conn, now)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        self._count("writes")
+        self._count("evictions", evicted)
+
+    def _evict(self, conn, now):
+        evicted = conn.execute("DELETE FROM reports WHERE expires_at <= ?", (now,)).rowcount
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM reports").fetchone()[0]
+        if total <= self.max_bytes:
+            return evicted
+        # 오래 안 쓴 항목부터 넘친 만큼 지움
+        overflow = total - self.max_bytes
+        freed = 0
+        doomed = []
+        for rowid, size in conn.execute("SELECT rowid, size FROM reports ORDER BY used_at"):
+            if freed >= overflow:
+                break
+            doomed.append((rowid,))
+            freed += size
+        conn.executemany("DELETE FROM reports WHERE rowid = ?", doomed)
+        return evicted + len(doomed)
+
+    def stats(self):
+        conn = self._connect()
+        entries, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM reports").fetchone()
+        with self._lock:
+            return {**self._stats, "entries": entries, "bytes": size, "max_bytes": self.max_bytes}
@@ -0,0 +1,125 @@
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+from lxml import html as lxml_html
+from http_client import get_client
+from market_store import download_closes
+from storage import data_path, atomic_write
+
+# 네이버 시가총액 순위 페이지 (sosok=0 코스피, 1 코스닥) - 한 페이지 50종목
+NAVER_MARKET_SUM_URL = "https://finance.naver.com/sise/sise_market_sum.naver?sosok={sosok}&page={page}"
+NAVER_MARKETS = {"KOSPI": (0, ".KS"), "KOSDAQ": (1, ".KQ")}
+
+SNAPSHOT_MAX_AGE = 86400 # 하루 한 번 재생성
+TRADING_DAYS = 252
+
+SNAPSHOT_COLUMNS = ['code', 'name', 'market', 'symbol', 'price', 'change_pct', 'market_cap', 'per', 'roe', 'volume', 'return_1y', 'volatility']
+
+def _number(text):
+    text = (text or '').replace(',', '').replace('%', '').strip()
+    try:
+        return float(text)
+    except ValueError:
+        return np.nan
+
+def parse_market_sum_page(page):
+    """시가총액 순위 페이지에서 종목 행과 마지막 페이지 번호를 뽑습니다."""
+    tree = lxml_html.fromstring(page)
+    rows = []
+    for tr in tree.xpath("//table[contains(@class, 'type_2')]//tr[td/a[contains(@class, 'tltle')]]"):
+        link = tr.xpath(".//a[contains(@class, 'tltle')]")[0]
+        cells = [''.join(td.itertext()).strip() for td in tr.xpath("./td")]
+        # N, 종목명, 현재가, 전일비, 등락률, 액면가, 시가총액(억), 상장주식수, 외국인비율, 거래량, PER, ROE
+        rows.append({
+            'code': re.search(r'code=(\d{6})', link.get('href')).group(1),
+            'name': link.text_content().strip(),
+            'price': _number(cells[2]),
+            'change_pct': _number(cells[4]),
+            'market_cap': _number(cells[6]) * 1e8,
+            'volume': _number(cells[9]),
+            'per': _number(cells[10]),
+            'roe': _number(cells[11]),
+        })
+    last = tree.xpath("//td[contains(@class, 'pgRR')]/a/@href")
+    last_page = int(re.search(r'page=(\d+)', last[0]).group(1)) if last else 1
+    return rows, last_page
+
+def sweep_naver_snapshot(workers=4):
+    """코스피/코스닥 전체 종목의 현재가, 시가총액, PER을 시가총액 순위 페이지로 한 번에 모읍니다."""
+    client = get_client()
+
+    def fetch(market, sosok, page):
+        res = client.get(NAVER_MARKET_SUM_URL.format(sosok=sosok, page=page))
+        res.raise_for_status()
+        rows, last_page = parse_market_sum_page(res.text)
+        for row in rows:
+            row['market'] = market
+        return rows, last_page
+
+    frames = []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for market, (sosok, suffix) in NAVER_MARKETS.items():
+            first_rows, last_page = fetch(market, sosok, 1)
+            rest = executor.map(lambda p: fetch(market, sosok, p)[0], range(2, last_page + 1))
+            df = pd.DataFrame([row for rows in [first_rows, *rest] for row in rows])
+            df['symbol'] = df['code'] + suffix
+            frames.append(df)
+    return pd.concat(frames, ignore_index=True).drop_duplicates('code')
+
+def batch_price_stats(symbols, period="1y"):
+    """yf.download 묶음 호출로 받은 종가로 종목별 기간 수익률과 연율화 변동성을 계산합니다."""
+    close = download_closes(symbols, period=period).dropna(axis=1, how='all')
+    if close.empty:
+        return pd.DataFrame(columns=['return_1y', 'volatility'])
+    first = close.bfill().iloc[0]
+    last = close.ffill().iloc[-1]
+    log_ret = np.log(close / close.shift(1))
+    return pd.DataFrame({
+        'return_1y': last / first - 1,
+        'volatility': log_ret.std() * np.sqrt(TRADING_DAYS),
+    })
+
+def build_snapshot():
+    snapshot = sweep_naver_snapshot()
+    stats = batch_price_stats(snapshot['symbol'].tolist())
+    snapshot = snapshot.join(stats, on='symbol')
+    return snapshot.reindex(columns=SNAPSHOT_COLUMNS)
+
+def load_snapshot(max_age=SNAPSHOT_MAX_AGE):
+    """디스크의 전 종목 스냅샷을 읽고, max_age초가 지났으면 다시 만들어 저장합니다."""
+    path = data_path("screener_snapshot.parquet")
+    if os.path.exists(path) and time.time() - os.path.getmtime(path) < max_age:
+        return pd.read_parquet(path)
+    try:
+        snapshot = build_snapshot()
+        atomic_write(path, lambda tmp: snapshot.to_parquet(tmp, index=False))
+        return snapshot
+    except Exception as e:
+        print(f"Screener snapshot build error: {e}")
+        if os.path.exists(path):
+            return pd.read_parquet(path)
+        raise
+
+def screen(df, per_min=None, per_max=None, cap_min=None, cap_max=None, return_min=None,
+           volatility_max=None, markets=None, sort_by='market_cap', ascending=False, limit=None):
+    """스냅샷 표에 조건을 벡터 연산으로 적용해 걸러내고 정렬합니다. (값이 None인 조건은 무시)"""
+    mask = np.ones(len(df), dtype=bool)
+    if per_min is not None:
+        mask &= (df['per'] >= per_min).to_numpy()
+    if per_max is not None:
+        mask &= (df['per'] <= per_max).to_numpy()
+    if cap_min is not None:
+        mask &= (df['market_cap'] >= cap_min).to_numpy()
+    if cap_max is not None:
+        mask &= (df['market_cap'] < cap_max).to_numpy()
+    if return_min is not None:
+        mask &= (df['return_1y'] >= return_min).to_numpy()
+    if volatility_max is not None:
+        mask &= (df['volatility'] <= volatility_max).to_numpy()
+    if markets:
+        mask &= df['market'].isin(markets).to_numpy()
+    result = df[mask].sort_values(sort_by, ascending=ascending, na_position='last')
+    return result.head(limit) if limit else result
@@ -0,0 +1,57 @@
+import threading
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    """같은 키로 동시에 들어온 호출을 하나의 실행으로 합치고, 나머지 호출자는 그 결과를 기다려 함께 받습니다."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+class GenerationGate:
+    """프로세스 전체의 AI 생성 요청을 키별로 합치고, 동시에 나가는 요청 수를 제한합니다."""
+
+    def __init__(self, max_concurrency=4):
+        self.max_concurrency = max_concurrency
+        self._flight = SingleFlight()
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+
+    def run(self, key, fn):
+        def guarded():
+            # 한도를 넘는 요청은 할당량 오류 대신 여기서 순서를 기다립니다.
+            with self._slots:
+                return fn()
+        return self._flight.do(key, guarded)
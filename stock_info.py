@@ -0,0 +1,66 @@
+"""
+종목 시세 정보와 AI 분석 프롬프트용 데이터 블록을 만드는 공용 규칙.
+
+웹 앱과 batch.py가 같은 규칙으로 회사명과 데이터 블록을 만들어야 같은 프롬프트(같은 리포트 저장소 키)가 되어,
+배치가 미리 만든 리포트를 앱이 그대로 씁니다.
+"""
+import pandas as pd
+from http_client import get_client
+from naver_parser import parse_item_page
+from prompt_context import analysis_context
+
+QUOTE_REQUEST_TIMEOUT = (3, 5) # 요청별 (연결, 읽기) 제한 시간 (초)
+
+def is_domestic(symbol):
+    """국내 주식(.KS, .KQ) 티커인지 확인합니다."""
+    return '.KS' in symbol or '.KQ' in symbol
+
+def naver_code(symbol):
+    """티커에서 6자리 종목코드만 뽑습니다. (예: 005930.KS -> 005930) 없으면 None."""
+    code = ''.join(filter(str.isdigit, symbol))
+    return code if len(code) == 6 else None
+
+def load_naver_info(symbol, timeout=QUOTE_REQUEST_TIMEOUT):
+    """네이버 증시에서 국내 주식 정보를 긁어옵니다. 종목코드가 없으면 None, 요청이 실패하면 예외."""
+    code = naver_code(symbol)
+    if not code: return None
+
+    url = f"https://finance.naver.com/item/main.naver?code={code}"
+    res = get_client().get(url, timeout=timeout)
+    # 재시도 후에도 429/5xx면 마지막 응답이 그대로 오므로, 빈 값으로 파싱하지 않도록 실패로 처리
+    res.raise_for_status()
+    # 주가, 전일비, 시가총액, PER/PBR, 52주 범위, 거래량을 한 번에 파싱
+    return parse_item_page(res.text)
+
+def fetch_naver_info(symbol, timeout=QUOTE_REQUEST_TIMEOUT):
+    """load_naver_info와 같되 실패하면 None을 돌려줍니다."""
+    try:
+        return load_naver_info(symbol, timeout)
+    except Exception as e:
+        print(f"Naver Scrape Error for {symbol}: {e}")
+        return None
+
+def combine_stock_info(symbol, naver_info, yf_info):
+    """
+    네이버를 우선하고, 실패하거나 해외 주식이면 yfinance를 사용합니다.
+    naver_info, yf_info는 티커를 받아 정보 dict(실패하면 None)를 돌려주는 함수로, 앱은 캐싱된 조회 함수를 넘깁니다.
+    """
+    if is_domestic(symbol):
+        naver = naver_info(symbol)
+        if naver:
+            # yfinance는 회사명 등을 위해 보조적으로 사용
+            info = yf_info(symbol)
+            if info:
+                naver['longName'] = info.get('longName', symbol)
+                naver['sector'] = info.get('sector', 'N/A')
+                naver['previousClose'] = info.get('previousClose', naver['currentPrice'] - naver['priceDiff'])
+            return naver
+
+    return yf_info(symbol)
+
+def build_analysis_context(hist, view, info):
+    """
+    분석 프롬프트용 데이터 블록을 만듭니다.
+    일봉(hist)이나 재무제표 표(view)를 못 받았으면 None을 넘기며, 그때도 남은 섹션(시세 요약, 밸류에이션)은 넣습니다.
+    """
+    return analysis_context(hist if hist is not None else pd.DataFrame(), view, info)
@@ -0,0 +1,24 @@
+import os
+import tempfile
+
+# 재시작/재배포 후에도 유지되는 로컬 데이터 경로 (APP_DATA_DIR 환경변수로 공유 볼륨 지정 가능)
+DATA_DIR = os.getenv("APP_DATA_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".app_data"))
+
+def data_path(*parts):
+    """DATA_DIR 아래 경로를 만들고, 상위 폴더가 없으면 생성합니다."""
+    path = os.path.join(DATA_DIR, *parts)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return path
+
+def atomic_write(path, write_fn):
+    """임시 파일에 쓴 뒤 교체하여, 쓰는 도중에 읽는 쪽이 깨진 파일을 보지 않도록 합니다."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+    os.close(fd)
+    try:
+        write_fn(tmp_path)
+        os.replace(tmp_path, path)
+    except:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
@@ -0,0 +1,100 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from singleflight import SingleFlight
+
+class _Entry:
+    def __init__(self, loader, ttl, hot):
+        self.loader = loader
+        self.ttl = ttl
+        self.hot = hot
+        self.value = None
+        self.fetched_at = None
+        self.last_access = time.time()
+        self.refreshing = False
+
+class SWRCache:
+    """
+    만료가 가까운 값은 백그라운드에서 다시 받아두고, 읽는 쪽에는 항상 마지막 정상 값을 바로 돌려주는 캐시입니다.
+    (stale-while-revalidate) 처음 한 번만 호출자가 직접 기다립니다.
+    """
+
+    def __init__(self, refresh_ahead=0.1, workers=4, poll_interval=30, hot_idle_limit=6 * 3600):
+        self.refresh_ahead = refresh_ahead # TTL의 마지막 10% 구간에 미리 갱신
+        self.poll_interval = poll_interval
+        self.hot_idle_limit = hot_idle_limit # 오래 아무도 안 보는 키는 예약 갱신을 멈춤
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._flight = SingleFlight()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="swr")
+        self._scheduler = None
+
+    def _is_due(self, entry, now):
+        return now - entry.fetched_at >= entry.ttl * (1 - self.refresh_ahead)
+
+    def get(self, key, loader, ttl, hot=False):
+        """key의 값을 돌려줍니다. hot=True이면 스케줄러가 만료 전에 미리 갱신합니다."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = _Entry(loader, ttl, hot)
+            entry.loader, entry.ttl, entry.hot = loader, ttl, entry.hot or hot
+            entry.last_access = now
+            has_value = entry.fetched_at is not None
+
+        if not has_value:
+            # 최초 적재: 같은 키를 동시에 요청한 세션은 한 번의 로딩을 함께 기다림
+            return self._flight.do(key, lambda: self._load(entry))
+
+        if self._is_due(entry, now):
+            self._schedule(entry)
+        return entry.value
+
+    def _load(self, entry):
+        value = entry.loader()
+        with self._lock:
+            entry.value, entry.fetched_at = value, time.time()
+        return value
+
+    def _schedule(self, entry):
+        with self._lock:
+            if entry.refreshing:
+                return
+            entry.refreshing = True
+        self._executor.submit(self._refresh, entry)
+
+    def _refresh(self, entry):
+        try:
+            self._load(entry)
+        except Exception as e:
+            # 실패하면 이전 값을 계속 제공하고 다음 주기에 다시 시도
+            print(f"Background refresh error: {e}")
+        finally:
+            with self._lock:
+                entry.refreshing = False
+
+    def refresh_due(self):
+        """만료가 가까운 hot 키를 모두 백그라운드 갱신 대기열에 넣습니다."""
+        now = time.time()
+        with self._lock:
+            due = [e for e in self._entries.values()
+                   if e.hot and e.fetched_at is not None and not e.refreshing
+                   and now - e.last_access < self.hot_idle_limit and self._is_due(e, now)]
+        for entry in due:
+            self._schedule(entry)
+        return len(due)
+
+    def start(self):
+        """hot 키를 주기적으로 확인하는 백그라운드 스케줄러를 시작합니다."""
+        if self._scheduler is not None:
+            return
+        def loop():
+            while True:
+                time.sleep(self.poll_interval)
+                try:
+                    self.refresh_due()
+                except Exception as e:
+                    print(f"Refresh scheduler error: {e}")
+        self._scheduler = threading.Thread(target=loop, name="swr-scheduler", daemon=True)
+        self._scheduler.start()
@@ -0,0 +1,104 @@
+import io
+import os
+import re
+import time
+import pandas as pd
+from http_client import get_client
+from storage import data_path, atomic_write
+
+# KRX KIND 상장법인 목록 (시장별 다운로드)
+KRX_LIST_URL = 'http://kind.krx.co.kr/corpgeneral/corpList.do?method=download&searchType=13&marketType={market_type}'
+
+# 시장 구분: (KIND marketType, yfinance 접미사)
+# 야후 파이낸스에는 코넥스 구분이 없어 .KQ로 두며, 시세는 네이버 조회로 보완됩니다.
+MARKETS = {
+    "KOSPI": ("stockMkt", ".KS"),
+    "KOSDAQ": ("kosdaqMkt", ".KQ"),
+    "KONEX": ("konexMkt", ".KQ"),
+}
+
+# 네이버 코스피200 편입 종목 목록 (페이지당 10~20종목)
+KOSPI200_URL = "https://finance.naver.com/sise/entryJongmok.naver?type=KPI200&page={page}"
+
+REBUILD_INTERVAL = 86400 # 24시간마다 재생성
+
+def download_listings():
+    """KRX에서 시장별 전체 종목 리스트를 받아 (name, code, market, symbol) 표로 만듭니다."""
+    frames = []
+    for market, (market_type, suffix) in MARKETS.items():
+        res = get_client().get(KRX_LIST_URL.format(market_type=market_type), timeout=(3.05, 15))
+        res.raise_for_status()
+        res.encoding = 'cp949' # KRX는 보통 CP949 사용
+        df = pd.read_html(io.StringIO(res.text), header=0)[0][['회사명', '종목코드']]
+        df.columns = ['name', 'code']
+        df['name'] = df['name'].astype(str).str.strip()
+        # 종목코드 6자리 보존
+        df['code'] = df['code'].astype(str).str.zfill(6)
+        df['market'] = market
+        df['symbol'] = df['code'] + suffix
+        frames.append(df)
+    return pd.concat(frames, ignore_index=True).drop_duplicates('code')
+
+class SymbolIndex:
+    """종목명/종목코드를 실제 시장 접미사가 붙은 티커로 바꾸는 메모리 조회 테이블입니다."""
+
+    def __init__(self, table):
+        self.table = table.reset_index(drop=True)
+        names = self.table['name']
+        symbols = self.table['symbol']
+        self._by_name = dict(zip(names, symbols))
+        self._by_lower = dict(zip(names.str.lower(), symbols))
+        self._by_code = dict(zip(self.table['code'], symbols))
+        self._market = dict(zip(symbols, self.table['market']))
+        self._name = dict(zip(symbols, names))
+
+    def __len__(self):
+        return len(self.table)
+
+    def resolve(self, query):
+        """종목명, 6자리 코드, 또는 접미사가 틀린 티커를 올바른 티커로 바꿉니다. 모르면 None."""
+        q = query.strip()
+        if q in self._by_name:
+            return self._by_name[q]
+        if q.lower() in self._by_lower:
+            return self._by_lower[q.lower()]
+        code = q.split('.')[0]
+        if code.isdigit() and len(code) == 6:
+            return self._by_code.get(code)
+        return None
+
+    def market_of(self, symbol):
+        return self._market.get(symbol)
+
+    def name_of(self, symbol):
+        return self._name.get(symbol)
+
+def load_symbol_index(max_age=REBUILD_INTERVAL):
+    """디스크에 저장된 종목표를 읽고, max_age초가 지났으면 KRX에서 다시 만들어 저장합니다."""
+    path = data_path("krx_symbols.parquet")
+    is_fresh = os.path.exists(path) and time.time() - os.path.getmtime(path) < max_age
+    if not is_fresh:
+        try:
+            table = download_listings()
+            atomic_write(path, lambda tmp: table.to_parquet(tmp, index=False))
+            return SymbolIndex(table)
+        except Exception as e:
+            print(f"Error loading KRX symbols: {e}")
+    if os.path.exists(path):
+        # 재생성에 실패하면 마지막 저장본을 그대로 사용
+        return SymbolIndex(pd.read_parquet(path))
+    return SymbolIndex(pd.DataFrame(columns=['name', 'code', 'market', 'symbol']))
+
+def fetch_kospi200(max_pages=30):
+    """코스피200 편입 종목 티커(.KS) 목록을 네이버 편입 종목 페이지에서 모읍니다."""
+    symbols = []
+    for page in range(1, max_pages + 1):
+        res = get_client().get(KOSPI200_URL.format(page=page))
+        res.raise_for_status()
+        codes = [c for c in dict.fromkeys(re.findall(r'/item/main\.naver\?code=(\d{6})', res.text))
+                 if c + ".KS" not in symbols]
+        if not codes:
+            # 마지막 페이지를 넘기면 같은 목록이 반복되거나 비어 있음
+            break
+        symbols.extend(c + ".KS" for c in codes)
+    return symbols
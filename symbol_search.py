@@ -0,0 +1,126 @@
+import re
+import numpy as np
+import pandas as pd
+
+# 한글 음절 -> 초성 변환표 (가~힣 11,172자)
+CHOSUNG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+_CHOSUNG_TABLE = {0xAC00 + i: CHOSUNG[i // 588] for i in range(11172)}
+
+# 순위 점수: 정확 일치 > 접두어 > 초성 접두어 > 부분 일치 > 오타 허용(바이그램 유사도, 1 미만)
+EXACT_SCORE = 4.0
+PREFIX_SCORE = 3.0
+CHOSUNG_SCORE = 2.5
+SUBSTRING_SCORE = 2.0
+FUZZY_THRESHOLD = 0.4
+
+# 해외/지수 티커 모양의 입력 (AAPL, BRK-B, ^GSPC, KRW=X, 005930.KS)
+TICKER_PATTERN = re.compile(r'[A-Za-z0-9.\-^=]+')
+
+def normalize(text):
+    return ''.join(str(text).lower().split())
+
+def to_chosung(text):
+    return text.translate(_CHOSUNG_TABLE)
+
+def looks_like_ticker(query):
+    """한글 종목명이 아니라 티커를 직접 입력한 것으로 보이면 True."""
+    q = query.strip()
+    return '.' in q or '^' in q or bool(TICKER_PATTERN.fullmatch(q))
+
+def search_target(query, resolved, suggestions):
+    """
+    '분석 시작'을 눌렀을 때 이동할 티커를 정합니다. 종목표에 없는 티커 모양의 입력은 후보가 있어도 그대로 넘기고,
+    한글/초성 입력이 정확히 맞는 종목 없이 후보만 있으면 후보 중에서 고르도록 None을 돌려줍니다.
+    """
+    if resolved:
+        return resolved
+    if not suggestions or looks_like_ticker(query):
+        return query.strip()
+    return None
+
+def _bigrams(key):
+    return [key[i:i + 2] for i in range(len(key) - 1)] or [key]
+
+def _prefix_range(sorted_keys, prefix):
+    lo = np.searchsorted(sorted_keys, prefix, side='left')
+    hi = np.searchsorted(sorted_keys, prefix + '\uffff', side='left')
+    return lo, hi
+
+class SymbolSearch:
+    """KRX 종목표 위에서 접두어, 초성, 오타 허용 검색을 하는 인덱스입니다."""
+
+    def __init__(self, table):
+        table = table.reset_index(drop=True)
+        self.names = table['name'].to_numpy(dtype=object)
+        self.symbols = table['symbol'].to_numpy(dtype=object)
+        self.markets = table['market'].to_numpy(dtype=object)
+
+        keys = table['name'].str.lower().str.replace(r'\s+', '', regex=True)
+        self._keys = keys.to_numpy(dtype=object)
+        self._name_len = keys.str.len().to_numpy()
+
+        # 접두어 검색용 정렬 배열 (이름 / 초성 / 종목코드)
+        self._name_sorted, self._name_ids = self._sorted(keys)
+        self._chosung_sorted, self._chosung_ids = self._sorted(keys.str.translate(_CHOSUNG_TABLE))
+        self._code_sorted, self._code_ids = self._sorted(table['code'].astype(str))
+
+        # 바이그램 역색인: 바이그램 -> 종목 번호 배열
+        grams = keys.map(_bigrams).explode()
+        pairs = pd.DataFrame({'gram': grams.to_numpy(), 'id': grams.index.to_numpy()}).drop_duplicates()
+        self._gram_ids = {g: ids.to_numpy() for g, ids in pairs.groupby('gram')['id']}
+        self._gram_counts = pairs.groupby('id').size().reindex(range(len(table)), fill_value=1).to_numpy()
+
+    @staticmethod
+    def _sorted(series):
+        order = np.argsort(series.to_numpy(dtype=object), kind='stable')
+        return series.to_numpy(dtype=object)[order], order
+
+    def __len__(self):
+        return len(self.names)
+
+    def search(self, query, limit=10):
+        """검색어와 가까운 종목을 점수순으로 돌려줍니다. [{name, symbol, market, score}, ...]"""
+        q = normalize(query)
+        if not q or not len(self):
+            return []
+        scores = {}
+
+        def bump(ids, score):
+            for i in ids:
+                if scores.get(i, 0) < score:
+                    scores[i] = score
+
+        # 1) 이름 접두어 (정확 일치 포함)
+        lo, hi = _prefix_range(self._name_sorted, q)
+        ids = self._name_ids[lo:hi]
+        bump(ids, PREFIX_SCORE)
+        bump([i for i in ids if self._keys[i] == q], EXACT_SCORE)
+
+        # 2) 종목코드 접두어
+        if q.isdigit():
+            lo, hi = _prefix_range(self._code_sorted, q)
+            bump(self._code_ids[lo:hi], PREFIX_SCORE)
+
+        # 3) 초성 검색 (예: ㅅㅅㅈㅈ -> 삼성전자)
+        if all(c in CHOSUNG for c in q):
+            lo, hi = _prefix_range(self._chosung_sorted, q)
+            bump(self._chosung_ids[lo:hi], CHOSUNG_SCORE)
+
+        # 4) 바이그램 겹침으로 부분 일치 / 오타 허용 후보 찾기
+        q_grams = list(dict.fromkeys(_bigrams(q)))
+        hits = [self._gram_ids[g] for g in q_grams if g in self._gram_ids]
+        if hits:
+            counts = np.bincount(np.concatenate(hits), minlength=len(self))
+            candidates = np.nonzero(counts)[0]
+            dice = 2 * counts[candidates] / (len(q_grams) + self._gram_counts[candidates])
+            for i, d in zip(candidates, dice):
+                if counts[i] == len(q_grams) and q in self._keys[i]:
+                    bump([i], SUBSTRING_SCORE)
+                elif d >= FUZZY_THRESHOLD:
+                    bump([i], float(d))
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], self._name_len[item[0]]))[:limit]
+        return [
+            {'name': self.names[i], 'symbol': self.symbols[i], 'market': self.markets[i], 'score': score}
+            for i, score in ranked
+        ]
@@ -0,0 +1,23 @@
+import pandas as pd
+from symbol_search import SymbolSearch, search_target
+
+TABLE = pd.DataFrame({
+    'name': ["APS", "DMS", "삼성전자", "삼성SDI"],
+    'symbol': ["054620.KQ", "068790.KQ", "005930.KS", "006400.KS"],
+    'market': ["KOSDAQ", "KOSDAQ", "KOSPI", "KOSPI"],
+    'code': ["054620", "068790", "005930", "006400"],
+})
+
+def test_foreign_ticker_navigates_despite_fuzzy_hits():
+    index = SymbolSearch(TABLE)
+    for query in ("AAPL", "MSFT", "^GSPC", "BRK-B"):
+        suggestions = index.search(query, limit=5)
+        assert search_target(query, None, suggestions) == query
+    assert index.search("AAPL", limit=5) # 오타 후보는 제안으로만 보여 줌
+
+def test_korean_query_with_candidates_asks_to_choose():
+    index = SymbolSearch(TABLE)
+    assert search_target("삼성전저", None, index.search("삼성전저", limit=5)) is None
+    assert search_target("ㅅㅅㅈ", None, index.search("ㅅㅅㅈ", limit=5)) is None
+    assert search_target("삼성전자", "005930.KS", []) == "005930.KS"
+    assert search_target("없는회사", None, []) == "없는회사"
@@ -0,0 +1,260 @@
+"""
+스크립트 실행(run) 단위 구간 계측.
+
+traced로 감싼 데이터 조회/그리기 함수마다 소요 시간, 캐시 적중 여부, 결과 크기를 span으로 남기고,
+프로세스 전체 누적값은 Prometheus 텍스트 형식으로 내보낼 수 있습니다.
+"""
+import contextvars
+import functools
+import itertools
+import json
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+RECENT_RUNS = 20 # 관리자 패널에서 볼 수 있는 최근 실행 수
+
+_current_run = contextvars.ContextVar("trace_run", default=None)
+_current_span = contextvars.ContextVar("trace_span", default=None)
+_in_script = contextvars.ContextVar("trace_in_script", default=False) # fragment가 스크립트 실행 안에서 불렸는지
+_run_ids = itertools.count(1)
+
+class Span:
+    __slots__ = ("name", "depth", "start", "duration", "cache", "size", "error", "thread")
+
+    def __init__(self, name, depth, start, cache=None):
+        self.name = name
+        self.depth = depth
+        self.start = start
+        self.duration = 0.0
+        self.cache = cache # None(캐시 없음) / "hit" / "miss"
+        self.size = None # 결과 크기 (바이트, 추정치)
+        self.error = False
+        self.thread = threading.current_thread().name
+
+    def to_dict(self):
+        return {
+            "name": self.name, "depth": self.depth,
+            "start_ms": round(self.start * 1e3, 2), "duration_ms": round(self.duration * 1e3, 2),
+            "cache": self.cache, "size": self.size, "error": self.error, "thread": self.thread,
+        }
+
+class RunTrace:
+    """한 번의 스크립트 실행 동안 끝난 span을 모읍니다. (작업 스레드에서도 추가되므로 잠금 사용)"""
+
+    def __init__(self, label="", detail=False):
+        self.id = next(_run_ids)
+        self.label = label
+        self.detail = detail # True이면 차트 직렬화 크기처럼 재는 데 비용이 드는 값도 기록
+        self.started_at = time.time()
+        self._t0 = time.perf_counter()
+        self._lock = threading.Lock()
+        self.spans = []
+
+    def elapsed(self):
+        return time.perf_counter() - self._t0
+
+    def add(self, span):
+        with self._lock:
+            self.spans.append(span)
+
+    def to_dict(self):
+        with self._lock:
+            spans = sorted(self.spans, key=lambda s: s.start)
+        return {
+            "run_id": self.id, "label": self.label, "started_at": self.started_at,
+            "elapsed_ms": round(self.elapsed() * 1e3, 2), "spans": [s.to_dict() for s in spans],
+        }
+
+class Registry:
+    """프로세스 전체의 span 이름별 누적 통계와 최근 실행 목록입니다."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+        self.runs = deque(maxlen=RECENT_RUNS)
+
+    def record(self, span):
+        with self._lock:
+            stat = self._stats.setdefault(span.name, {"count": 0, "seconds": 0.0, "max": 0.0,
+                                                      "hit": 0, "miss": 0, "errors": 0, "bytes": 0})
+            stat["count"] += 1
+            stat["seconds"] += span.duration
+            stat["max"] = max(stat["max"], span.duration)
+            if span.cache:
+                stat[span.cache] += 1
+            if span.error:
+                stat["errors"] += 1
+            if span.size:
+                stat["bytes"] += span.size
+
+    def add_run(self, run):
+        with self._lock:
+            self.runs.append(run)
+
+    def stats(self):
+        with self._lock:
+            return {name: dict(stat) for name, stat in self._stats.items()}
+
+    def prometheus_text(self):
+        """누적 통계를 Prometheus text exposition 형식으로 돌려줍니다."""
+        stats = self.stats()
+        metrics = [
+            ("app_span_duration_seconds", "summary", "Time spent in traced fetchers and renderers.",
+             lambda n, s: [("_count", "", s["count"]), ("_sum", "", s["seconds"])]),
+            ("app_span_duration_seconds_max", "gauge", "Slowest single call since process start.",
+             lambda n, s: [("", "", s["max"])]),
+            ("app_span_cache_total", "counter", "Cache lookups by result.",
+             lambda n, s: [("", ',result="hit"', s["hit"]), ("", ',result="miss"', s["miss"])] if s["hit"] or s["miss"] else []),
+            ("app_span_errors_total", "counter", "Calls that raised an exception.",
+             lambda n, s: [("", "", s["errors"])]),
+            ("app_span_payload_bytes_total", "counter", "Approximate size of returned payloads.",
+             lambda n, s: [("", "", s["bytes"])]),
+        ]
+        lines = []
+        for metric, kind, help_text, samples in metrics:
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} {kind}")
+            for name in sorted(stats):
+                label = name.replace('\\', '\\\\').replace('"', '\\"')
+                for suffix, extra, value in samples(name, stats[name]):
+                    lines.append(f'{metric}{suffix}{{span="{label}"{extra}}} {value:g}')
+        return "\n".join(lines) + "\n"
+
+registry = Registry()
+
+def start_run(label="", detail=False):
+    """현재 스레드(스크립트 실행)의 새 RunTrace를 시작합니다."""
+    run = RunTrace(label, detail)
+    _current_run.set(run)
+    _current_span.set(None)
+    registry.add_run(run)
+    return run
+
+def current_run():
+    return _current_run.get()
+
+@contextmanager
+def span(name, cached=False):
+    """구간 하나를 계측합니다. cached=True이면 mark_miss()가 불리지 않는 한 캐시 적중으로 기록합니다."""
+    run = _current_run.get()
+    parent = _current_span.get()
+    s = Span(name, parent.depth + 1 if parent else 0, run.elapsed() if run else 0.0, "hit" if cached else None)
+    token = _current_span.set(s)
+    started = time.perf_counter()
+    try:
+        yield s
+    except Exception:
+        s.error = True
+        raise
+    finally:
+        s.duration = time.perf_counter() - started
+        _current_span.reset(token)
+        if run is not None:
+            run.add(s)
+        registry.record(s)
+
+def mark_miss():
+    """현재 구간을 캐시 미스로 표시합니다. (캐시된 함수 본문이 실제로 실행될 때 호출)"""
+    s = _current_span.get()
+    if s is not None and s.cache is not None:
+        s.cache = "miss"
+
+def as_miss(loader):
+    """SWR 캐시 로더처럼 캐시에 값이 없을 때만 불리는 함수를 감싸, 불리면 캐시 미스로 기록합니다."""
+    @functools.wraps(loader)
+    def wrapper(*args, **kwargs):
+        mark_miss()
+        return loader(*args, **kwargs)
+    return wrapper
+
+def bind(fn):
+    """현재 실행/구간 문맥을 복사해, 작업 스레드에서 실행돼도 같은 RunTrace에 기록되도록 합니다."""
+    ctx = contextvars.copy_context()
+    return functools.wraps(fn)(lambda *args, **kwargs: ctx.run(fn, *args, **kwargs))
+
+def payload_size(value):
+    """결과 크기를 바이트 단위로 대략 추정합니다. (DataFrame은 메모리 사용량, 문자열은 UTF-8 길이)"""
+    if value is None:
+        return 0
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode('utf-8'))
+    if hasattr(value, 'memory_usage'):
+        usage = value.memory_usage(index=True)
+        return int(usage.sum() if hasattr(usage, 'sum') else usage)
+    if isinstance(value, dict):
+        return sum(payload_size(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(payload_size(v) for v in value)
+    return sys.getsizeof(value)
+
+def figure_size(fig):
+    """Plotly 그림의 JSON 크기. 직렬화를 한 번 더 하므로 상세 계측(detail) 실행에서만 잽니다."""
+    run = _current_run.get()
+    if run is None or not run.detail:
+        return None
+    return len(fig.to_json())
+
+def traced(name=None, cache=None, cached=False):
+    """
+    함수 호출을 span으로 계측하는 데코레이터입니다.
+    cache에 st.cache_data(...) 같은 캐싱 데코레이터를 넘기면 안쪽에 적용하고, 본문이 실행된 호출만 미스로 기록합니다.
+    직접 관리하는 캐시(SWR, 리포트 캐시)는 cached=True로 두고 미스 경로에서 mark_miss()/as_miss()를 부릅니다.
+    """
+    def decorator(fn):
+        span_name = name or fn.__name__
+        target = cache(as_miss(fn)) if cache is not None else fn
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(span_name, cached=cached or cache is not None) as s:
+                result = target(*args, **kwargs)
+                s.size = payload_size(result)
+                return result
+
+        if hasattr(target, 'clear'):
+            wrapper.clear = target.clear
+        return wrapper
+    return decorator
+
+def fragment(wrap):
+    """
+    st.fragment 같은 fragment 데코레이터(wrap)를 계측용으로 감쌉니다. wrap에 넘길 옵션(run_every 등)은 키워드로 받습니다.
+    스크립트 실행 중에 불리면 그 실행의 span으로 남기고, fragment만 다시 실행될 때(입력, run_every 주기)는
+    "{함수 이름}:fragment" 이름의 새 RunTrace를 시작해 이전 스크립트 실행에 span이 계속 쌓이지 않게 합니다.
+    """
+    def decorator(fn=None, **options):
+        if fn is None:
+            return lambda f: decorator(f, **options)
+
+        @functools.wraps(fn)
+        def body(*args, **kwargs):
+            if _in_script.get():
+                return fn(*args, **kwargs)
+            parent = _current_run.get()
+            run_token, span_token = _current_run.set(None), _current_span.set(None)
+            try:
+                start_run(f"{fn.__name__}:fragment", detail=parent.detail if parent else False)
+                return fn(*args, **kwargs)
+            finally:
+                _current_run.reset(run_token)
+                _current_span.reset(span_token)
+
+        wrapped = wrap(body, **options)
+
+        @functools.wraps(fn)
+        def call(*args, **kwargs):
+            token = _in_script.set(True)
+            try:
+                return wrapped(*args, **kwargs)
+            finally:
+                _in_script.reset(token)
+        return call
+    return decorator
+
+def run_to_json(run):
+    return json.dumps(run.to_dict(), ensure_ascii=False, indent=2)